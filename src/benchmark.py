@@ -0,0 +1,199 @@
+"""
+Modo de Benchmark
+Roda o jogo sem janela e sem som (drivers dummy do SDL), com uma partida
+roteirizada e determinística, e mede o desempenho quadro a quadro.
+
+    python src/benchmark.py --frames 600 --seed 0
+
+O roteiro clica em NOVO JOGO no primeiro quadro e depois segura a seta
+para cima, vira para a esquerda a cada poucos segundos e dispara o sonar
+periodicamente. Entrada, relógio e sorteios vêm do roteiro: o relógio
+avança exatamente um passo de simulação por quadro (sem o limite de FPS,
+o quadro seguinte começa assim que o anterior termina), get_ticks conta
+esse tempo virtual e o random é semeado, então duas execuções com a
+mesma semente jogam a mesma partida e só o tempo medido muda.
+
+O relatório traz os quadros por segundo reais e o tempo médio de cada
+fase do quadro (timing.PhaseTimer, marcado no laço do main); os
+primeiros `--warmup` quadros (caches sendo preenchidos) ficam de fora.
+"""
+import argparse
+import json
+import os
+import random
+import runpy
+import time
+
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+import numpy as np
+import pygame
+
+import menu
+import timing
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_PATH = os.path.join(SRC_DIR, 'main.py')
+# Mesmo passo do main (SIM_STEP_MS).
+STEP_MS = 1000 / 60
+TURN_EVERY = 180
+TURN_FRAMES = 60
+SONAR_EVERY = 240
+
+
+class _ScenarioEnd(Exception):
+    pass
+
+
+class _ScenarioClock:
+    """Relógio do roteiro: cada tick avança um passo de simulação, sem esperar."""
+
+    def __init__(self, scenario):
+        self.scenario = scenario
+
+    def tick(self, framerate=0):
+        self.scenario.virtual_ms += STEP_MS
+        return STEP_MS
+
+    def get_fps(self):
+        return self.scenario.fps()
+
+
+class _ScriptedKeys:
+    def __init__(self, pressed):
+        self.pressed = pressed
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+class Scenario:
+    """Entrada roteirizada da partida e contagem dos quadros."""
+
+    def __init__(self, frames, warmup):
+        self.frames = frames
+        self.warmup = warmup
+        self.frame = -1
+        self.virtual_ms = 0.0
+        self.started = None
+        self.finished = None
+        self.timer = timing.get_frame_timer()
+
+    def fps(self):
+        if self.started is None or self.frame <= self.warmup:
+            return 0.0
+        return (self.frame - self.warmup) / (time.perf_counter() - self.started)
+
+    def _new_game_button(self):
+        button = next(btn for btn in menu.buttons if btn['text'] == "NOVO JOGO")
+        return button['x'] + button['w'] // 2, button['y'] + button['h'] // 2
+
+    def mouse_pos(self):
+        if self.frame <= 0 and menu.buttons:
+            return self._new_game_button()
+        return (0, 0)
+
+    def get_ticks(self):
+        return int(self.virtual_ms)
+
+    def events(self):
+        """Eventos do quadro; chamado uma vez por volta do laço do main."""
+        pygame.event.pump()
+        self.frame += 1
+        if self.frame == self.warmup:
+            self.timer.reset()
+            self.started = time.perf_counter()
+        if self.frame == self.frames + self.warmup:
+            self.finished = time.perf_counter()
+            raise _ScenarioEnd
+
+        if self.frame == 0:
+            return [pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=self._new_game_button())]
+        if self.frame % SONAR_EVERY == 0:
+            return [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)]
+        return []
+
+    def keys(self):
+        pressed = {pygame.K_UP}
+        if self.frame % TURN_EVERY < TURN_FRAMES:
+            pressed.add(pygame.K_LEFT)
+        return _ScriptedKeys(pressed)
+
+    def install(self):
+        pygame.event.get = self.events
+        pygame.key.get_pressed = self.keys
+        pygame.mouse.get_pos = self.mouse_pos
+        pygame.time.get_ticks = self.get_ticks
+        pygame.time.Clock = lambda: _ScenarioClock(self)
+
+
+def _count(minimum):
+    """Tipo do argparse: inteiro >= `minimum`."""
+    def parse(text):
+        value = int(text)
+        if value < minimum:
+            raise argparse.ArgumentTypeError(f"deve ser >= {minimum}: {value}")
+        return value
+    return parse
+
+
+def run(frames, seed=0, warmup=60):
+    """
+    Joga `frames` quadros medidos (depois de `warmup` de aquecimento) e
+    retorna o relatório: quadros, segundos, FPS e ms médios por fase.
+    """
+    if frames < 1 or warmup < 0:
+        raise ValueError(f"frames deve ser >= 1 e warmup >= 0 (frames={frames}, warmup={warmup})")
+    random.seed(seed)
+    np.random.seed(seed)
+    scenario = Scenario(frames, warmup)
+    scenario.timer.enabled = True
+    scenario.install()
+
+    cwd = os.getcwd()
+    os.chdir(os.path.dirname(SRC_DIR))
+    try:
+        runpy.run_path(MAIN_PATH, run_name='__main__')
+    except (_ScenarioEnd, SystemExit):
+        pass
+    finally:
+        os.chdir(cwd)
+        pygame.quit()
+
+    if scenario.finished is None:
+        # O main saiu (sys.exit) antes do último quadro do roteiro.
+        raise RuntimeError(f"a partida terminou no quadro {scenario.frame}, "
+                           f"antes dos {warmup + frames} quadros do roteiro")
+    seconds = scenario.finished - scenario.started
+    return {
+        'frames': frames,
+        'seed': seed,
+        'seconds': seconds,
+        'fps': frames / seconds,
+        'phases_ms': scenario.timer.report(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sem janela de Echoes of the Deep")
+    parser.add_argument('--frames', type=_count(1), default=600, help="quadros medidos")
+    parser.add_argument('--warmup', type=_count(0), default=60, help="quadros iniciais fora da medição")
+    parser.add_argument('--seed', type=int, default=0, help="semente do random")
+    parser.add_argument('--json', metavar='ARQUIVO', help="também grava o relatório em JSON")
+    args = parser.parse_args(argv)
+
+    result = run(args.frames, args.seed, args.warmup)
+
+    print(f"{result['frames']} quadros em {result['seconds']:.2f} s: {result['fps']:.1f} FPS "
+          f"({1000 / result['fps']:.2f} ms/quadro), semente {result['seed']}")
+    for phase, ms in result['phases_ms'].items():
+        print(f"  {phase:<12}{ms:8.2f} ms")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
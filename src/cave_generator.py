@@ -0,0 +1,389 @@
+"""
+Módulo Gerador de Cavernas
+Gera níveis de caverna de qualquer tamanho com autômatos celulares em
+NumPy sobre uma grade de células (cell_size x cell_size pixels).
+
+Etapas:
+1. ruído aleatório de rocha/água com a borda sempre em rocha;
+2. suavização pela regra 4-5 (rocha se >= 5 vizinhos de rocha), a grade
+   inteira por iteração;
+3. reparo de conectividade: regiões de água pequenas viram rocha e as
+   demais são ligadas à maior por túneis em L;
+4. remoção de cantos em xadrez (água que só se toca pela diagonal), para
+   que cada contorno seja um laço simples;
+5. contornos por célula em blocos de chunk x chunk células,
+   simplificados (vértices colineares removidos) e com as ilhas de rocha
+   ligadas ao contorno externo por pontes de largura zero. Cada região de
+   água de um bloco vira uma zona, preenchida por paridade como as zonas
+   desenhadas à mão.
+
+A grade de ocupação é a grade de células ampliada, que coincide com
+build_occupancy_grid das zonas geradas sem precisar rasterizá-las.
+"""
+import numpy as np
+
+import level_format
+
+DEFAULT_CELL_SIZE = 16
+DEFAULT_FILL = 0.45
+DEFAULT_ITERATIONS = 5
+DEFAULT_MIN_REGION = 40
+DEFAULT_CHUNK = 64
+TUNNEL_WIDTH = 2
+
+WATER_COLOR = (15, 40, 70)
+
+DEFAULT_ENTITIES = {
+    'jellyfish': (3, 0.3),
+    'water_bomb': (3, 0.35),
+    'giant_tentacles': (1, 0.5),
+    'research_capsule': (2, 0.4),
+}
+
+
+def _rock_neighbours(rock):
+    """Número de vizinhos de rocha (8-vizinhança); fora da grade conta como rocha."""
+    padded = np.pad(rock, 1, constant_values=True).astype(np.uint8)
+    rows, cols = rock.shape
+    total = np.zeros(rock.shape, dtype=np.uint8)
+    for dy in (0, 1, 2):
+        for dx in (0, 1, 2):
+            if dy == 1 and dx == 1:
+                continue
+            total += padded[dy:dy + rows, dx:dx + cols]
+    return total
+
+
+def smooth_cells(rock, iterations=DEFAULT_ITERATIONS):
+    """Regra 4-5 aplicada à grade inteira a cada iteração."""
+    for _ in range(iterations):
+        neighbours = _rock_neighbours(rock)
+        rock = (neighbours >= 5) | (rock & (neighbours == 4))
+        rock[0, :] = rock[-1, :] = True
+        rock[:, 0] = rock[:, -1] = True
+    return rock
+
+
+def label_regions(water):
+    """
+    Rótulo da região de água (4-conexa) de cada célula, -1 na rocha.
+    As linhas são quebradas em trechos contínuos; trechos de linhas
+    vizinhas que se sobrepõem são unidos por propagação do menor rótulo
+    com saltos de ponteiro, tudo em operações de array.
+    """
+    rows, cols = water.shape
+    edges = np.diff(water.astype(np.int8), axis=1, prepend=0, append=0)
+    run_row, run_start = np.nonzero(edges == 1)
+    _, run_end = np.nonzero(edges == -1)
+
+    key_start = run_row * cols + run_start
+    key_end = run_row * cols + run_end
+    first = np.searchsorted(key_end, (run_row + 1) * cols + run_start, side='right')
+    last = np.searchsorted(key_start, (run_row + 1) * cols + run_end, side='left')
+    count = np.maximum(last - first, 0)
+    pair_a = np.repeat(np.arange(len(run_start)), count)
+    pair_b = np.repeat(first, count) + (np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count))
+
+    labels = np.arange(len(run_start))
+    while True:
+        low = np.minimum(labels[pair_a], labels[pair_b])
+        new = labels.copy()
+        np.minimum.at(new, pair_a, low)
+        np.minimum.at(new, pair_b, low)
+        new = new[new]
+        if np.array_equal(new, labels):
+            break
+        labels = new
+
+    cell_labels = np.full(water.shape, -1, dtype=np.int64)
+    run_lengths = run_end - run_start
+    flat = np.repeat(run_row * cols + run_start, run_lengths) + (
+        np.arange(run_lengths.sum()) - np.repeat(np.cumsum(run_lengths) - run_lengths, run_lengths))
+    cell_labels.flat[flat] = np.repeat(labels, run_lengths)
+    return cell_labels
+
+
+def _carve(water, r0, c0, r1, c1):
+    """Túnel em L de (r0, c0) até (r1, c1): horizontal e depois vertical."""
+    rows, cols = water.shape
+    lo_c, hi_c = sorted((c0, c1))
+    lo_r, hi_r = sorted((r0, r1))
+    water[max(1, r0):min(rows - 1, r0 + TUNNEL_WIDTH), max(1, lo_c):min(cols - 1, hi_c + TUNNEL_WIDTH)] = True
+    water[max(1, lo_r):min(rows - 1, hi_r + TUNNEL_WIDTH), max(1, c1):min(cols - 1, c1 + TUNNEL_WIDTH)] = True
+
+
+def connect_regions(water, min_region=DEFAULT_MIN_REGION):
+    """
+    Deixa uma única região de água: regiões menores que `min_region`
+    células viram rocha e as outras são ligadas à maior por um túnel até a
+    célula mais próxima dela.
+    """
+    water = water.copy()
+    labels = label_regions(water)
+    ids, sizes = np.unique(labels[labels >= 0], return_counts=True)
+    if len(ids) == 0:
+        return water
+
+    main = ids[np.argmax(sizes)]
+    water[np.isin(labels, ids[sizes < min_region])] = False
+
+    main_r, main_c = np.nonzero(labels == main)
+    for region in ids[(sizes >= min_region) & (ids != main)].tolist():
+        region_r, region_c = np.nonzero(labels == region)
+        middle = len(region_r) // 2
+        r0, c0 = int(region_r[middle]), int(region_c[middle])
+        nearest = np.argmin((main_r - r0) ** 2 + (main_c - c0) ** 2)
+        _carve(water, r0, c0, int(main_r[nearest]), int(main_c[nearest]))
+    return water
+
+
+def remove_diagonal_pinches(water):
+    """
+    Abre em água a rocha dos blocos 2x2 em xadrez, onde dois contornos
+    se tocariam num vértice. Repete até não sobrar nenhum.
+    """
+    water = water.copy()
+    while True:
+        a = water[:-1, :-1]
+        b = water[:-1, 1:]
+        c = water[1:, :-1]
+        d = water[1:, 1:]
+        pinch = ((a & d & ~b & ~c) | (b & c & ~a & ~d))
+        if not pinch.any():
+            return water
+        r, col = np.nonzero(pinch)
+        for dr, dc in ((0, 0), (0, 1), (1, 0), (1, 1)):
+            water[r + dr, col + dc] = True
+        water[0, :] = water[-1, :] = False
+        water[:, 0] = water[:, -1] = False
+
+
+def _boundary_edges(water, chunk):
+    """
+    Arestas entre água e rocha, orientadas para que cada vértice tenha uma
+    única aresta de saída. As linhas entre blocos de `chunk` x `chunk`
+    células também contam como borda, para que cada bloco tenha as suas
+    próprias zonas. Retorna (x0, y0, x1, y1, bloco) em unidades de célula.
+    """
+    rows, cols = water.shape
+    padded = np.pad(water, 1, constant_values=False)
+    inner = padded[1:-1, 1:-1]
+    row_cut = (np.arange(rows) % chunk == 0)[:, None]
+    row_cut_below = (np.arange(1, rows + 1) % chunk == 0)[:, None]
+    col_cut = (np.arange(cols) % chunk == 0)[None, :]
+    col_cut_right = (np.arange(1, cols + 1) % chunk == 0)[None, :]
+    chunks_per_row = (cols + chunk - 1) // chunk
+
+    parts = []
+    for border, (ax, ay, bx, by) in (
+        (~padded[:-2, 1:-1] | row_cut, (1, 0, 0, 0)),        # acima: para a esquerda
+        (~padded[2:, 1:-1] | row_cut_below, (0, 1, 1, 1)),   # abaixo: para a direita
+        (~padded[1:-1, :-2] | col_cut, (0, 0, 0, 1)),        # à esquerda: para baixo
+        (~padded[1:-1, 2:] | col_cut_right, (1, 1, 1, 0)),   # à direita: para cima
+    ):
+        r, c = np.nonzero(inner & border)
+        block = (r // chunk) * chunks_per_row + c // chunk
+        parts.append(np.stack((c + ax, r + ay, c + bx, r + by, block), axis=1))
+    return np.concatenate(parts)
+
+
+def _trace_loops(edges, rows, cols):
+    """
+    Encadeia as arestas em laços e remove os vértices colineares.
+    Retorna os laços e o bloco de cada um.
+    """
+    stride = (rows + 1) * (cols + 1)
+    start_id = edges[:, 4] * stride + edges[:, 1] * (cols + 1) + edges[:, 0]
+    end_id = edges[:, 4] * stride + edges[:, 3] * (cols + 1) + edges[:, 2]
+    order = np.argsort(start_id)
+    following = order[np.searchsorted(start_id[order], end_id)].tolist()
+
+    visited = bytearray(len(edges))
+    loops = []
+    blocks = []
+    for first in range(len(edges)):
+        if visited[first]:
+            continue
+        chain = []
+        e = first
+        while not visited[e]:
+            visited[e] = 1
+            chain.append(e)
+            e = following[e]
+        points = edges[chain, :2]
+        before = np.roll(points, 1, axis=0)
+        after = np.roll(points, -1, axis=0)
+        cross = (points[:, 0] - before[:, 0]) * (after[:, 1] - points[:, 1]) - \
+                (points[:, 1] - before[:, 1]) * (after[:, 0] - points[:, 0])
+        loops.append(points[cross != 0])
+        blocks.append(int(edges[first, 4]))
+    return loops, blocks
+
+
+def _signed_area(points):
+    x = points[:, 0]
+    y = points[:, 1]
+    return 0.5 * float(np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y))
+
+
+def _bridge_holes(loops, blocks):
+    """
+    Liga cada ilha (laço interno) ao laço do mesmo bloco imediatamente
+    acima dela por uma ponte vertical que sai do meio da primeira célula
+    da sua aresta de cima. Retorna os laços externos e, para cada laço, as pontes por
+    aresta: {índice da aresta: [(x do encontro, laço filho)]}.
+    """
+    areas = np.array([_signed_area(loop) for loop in loops])
+    outers = np.flatnonzero(areas < 0).tolist()
+    holes = np.flatnonzero(areas > 0).tolist()
+    bridges = [dict() for _ in loops]
+    if not holes:
+        return outers, bridges, {}
+
+    seg_loop, seg_block, seg_index, seg_y, seg_lo, seg_hi = [], [], [], [], [], []
+    for i, loop in enumerate(loops):
+        after = np.roll(loop, -1, axis=0)
+        horizontal = np.flatnonzero(loop[:, 1] == after[:, 1])
+        seg_loop.append(np.full(len(horizontal), i))
+        seg_block.append(np.full(len(horizontal), blocks[i]))
+        seg_index.append(horizontal)
+        seg_y.append(loop[horizontal, 1])
+        seg_lo.append(np.minimum(loop[horizontal, 0], after[horizontal, 0]))
+        seg_hi.append(np.maximum(loop[horizontal, 0], after[horizontal, 0]))
+    seg_loop, seg_block, seg_index, seg_y, seg_lo, seg_hi = (
+        np.concatenate(a) for a in (seg_loop, seg_block, seg_index, seg_y, seg_lo, seg_hi))
+
+    starts = {}
+    for hole in holes:
+        loop = loops[hole]
+        after = np.roll(loop, -1, axis=0)
+        top = loop[:, 1].min()
+        top_edges = np.flatnonzero((loop[:, 1] == top) & (after[:, 1] == top))
+        k = int(top_edges[0])
+        x = min(loop[k, 0], after[k, 0]) + 0.5
+
+        hit = np.flatnonzero((seg_block == blocks[hole]) & (seg_y < top) & (seg_lo < x) & (seg_hi > x))
+        best = hit[np.argmax(seg_y[hit])]
+        parent = int(seg_loop[best])
+        bridges[parent].setdefault(int(seg_index[best]), []).append((x, hole))
+        starts[hole] = (k, x, float(top))
+    return outers, bridges, starts
+
+
+def _emit_zone(loops, bridges, starts, outer):
+    """
+    Vértices da zona do laço externo `outer`, percorrendo as ilhas pelas
+    pontes (ida e volta pelo mesmo segmento, que se cancelam na paridade).
+    """
+    out = []
+
+    def walk(loop_id, start_edge, start_point):
+        loop = loops[loop_id].tolist()
+        n = len(loop)
+        edge_bridges = bridges[loop_id]
+        if start_point is not None:
+            out.append(start_point)
+        for step in range(n):
+            k = (start_edge + step) % n
+            a = loop[k]
+            if step > 0 or start_point is None:
+                out.append((a[0], a[1]))
+            hits = sorted(edge_bridges.get(k, ()), key=lambda h: abs(h[0] - a[0]))
+            for x, child in hits:
+                if step == 0 and start_point is not None and abs(x - a[0]) < abs(start_point[0] - a[0]):
+                    continue
+                visit(x, a[1], child)
+        if start_point is not None:
+            k = start_edge
+            a = loop[k]
+            out.append((a[0], a[1]))
+            hits = sorted(edge_bridges.get(k, ()), key=lambda h: abs(h[0] - a[0]))
+            for x, child in hits:
+                if abs(x - a[0]) < abs(start_point[0] - a[0]):
+                    visit(x, a[1], child)
+            out.append(start_point)
+
+    def visit(x, y, child):
+        out.append((x, y))
+        k, child_x, child_y = starts[child]
+        walk(child, k, (child_x, child_y))
+        out.append((x, y))
+
+    walk(outer, 0, None)
+    return out
+
+
+def cells_to_zones(water, chunk=DEFAULT_CHUNK):
+    """
+    Zonas (listas de vértices em unidades de célula) das regiões de água,
+    uma por região conexa dentro de cada bloco de `chunk` x `chunk`
+    células. Zonas menores deixam o desenho por tiles pular o que está
+    fora da tela; os cortes entre blocos ficam na cor da água.
+    """
+    rows, cols = water.shape
+    loops, blocks = _trace_loops(_boundary_edges(water, chunk), rows, cols)
+    outers, bridges, starts = _bridge_holes(loops, blocks)
+    return [_emit_zone(loops, bridges, starts, outer) for outer in outers]
+
+
+def _interior_cells(water):
+    """Células de água cujas 8 vizinhas também são água."""
+    return water & (_rock_neighbours(~water) == 0)
+
+
+def level_lines(water, cell_size, spawn, entities, chunk=DEFAULT_CHUNK):
+    """Linhas do arquivo de nível (formato de level_format) da caverna gerada."""
+    rows, cols = water.shape
+    lines = [f"size {cols * cell_size} {rows * cell_size}", f"spawn {spawn[0]} {spawn[1]}"]
+    r, g, b = WATER_COLOR
+    for zone in cells_to_zones(water, chunk):
+        coords = ' '.join(f"{x * cell_size:.10g} {y * cell_size:.10g}" for x, y in zone)
+        lines.append(f"zone {r} {g} {b} {coords}")
+    for kind, x, y, scale in entities:
+        lines.append(f"entity {kind} {x} {y} {scale}")
+    return lines
+
+
+def generate_cave(width, height, cell_size=DEFAULT_CELL_SIZE, seed=None, fill=DEFAULT_FILL,
+                  iterations=DEFAULT_ITERATIONS, min_region=DEFAULT_MIN_REGION,
+                  entities=DEFAULT_ENTITIES, chunk=DEFAULT_CHUNK):
+    """
+    Gera uma caverna de width x height pixels.
+    Retorna (nível, grade de ocupação (altura, largura), linhas do arquivo
+    de nível); as linhas podem ser gravadas num .lvl para reabrir depois.
+    `entities`: tipo -> (quantidade, escala), espalhadas pela água.
+    """
+    rng = np.random.default_rng(seed)
+    rows = max(3, height // cell_size)
+    cols = max(3, width // cell_size)
+
+    rock = rng.random((rows, cols)) < fill
+    rock[0, :] = rock[-1, :] = True
+    rock[:, 0] = rock[:, -1] = True
+    rock = smooth_cells(rock, iterations)
+
+    water = connect_regions(~rock, min_region)
+    water = remove_diagonal_pinches(water)
+
+    interior_r, interior_c = np.nonzero(_interior_cells(water))
+    if len(interior_r) == 0:
+        interior_r, interior_c = np.nonzero(water)
+    if len(interior_r) == 0:
+        raise ValueError("caverna gerada sem água; aumente o tamanho ou reduza fill")
+
+    def center(i):
+        return (int(interior_c[i]) * cell_size + cell_size // 2,
+                int(interior_r[i]) * cell_size + cell_size // 2)
+
+    spawn = center(int(np.argmin((interior_c - cols * 0.1) ** 2 + (interior_r - rows * 0.5) ** 2)))
+    placed = []
+    for kind, (count, scale) in entities.items():
+        for i in rng.integers(0, len(interior_r), size=count).tolist():
+            x, y = center(i)
+            placed.append((kind, x, y, scale))
+
+    lines = level_lines(water, cell_size, spawn, placed, chunk)
+    level = level_format.parse_level(lines)
+
+    occupancy = np.repeat(np.repeat(water, cell_size, axis=0), cell_size, axis=1)
+    return level, occupancy, lines
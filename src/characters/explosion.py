@@ -1,7 +1,7 @@
 import math
 import random
 from primitives import drawCircle, drawPolygon, scanline_fill
-from transforms import apply_transform, get_rotation_matrix, get_translation_matrix
+from transforms import apply_transform, get_rotation_matrix, get_translation_matrix, mat_mul
 
 class ExplosionParticle:
     def __init__(self, x, y):
@@ -72,10 +72,10 @@ def draw_explosion(surface, explosion, camera_x=0, camera_y=0):
         drawCircle(surface, int(px), int(py), p.radius, (255, 150, 50))
 
     for f in explosion['fragments']:
-        rotated = apply_transform(f.points, get_rotation_matrix(f.rotation))
         fx = f.x - camera_x
         fy = f.y - camera_y
-        transformed = apply_transform(rotated, get_translation_matrix(fx, fy))
+        matrix = mat_mul(get_translation_matrix(fx, fy), get_rotation_matrix(f.rotation))
+        transformed = apply_transform(f.points, matrix)
  
         drawPolygon(surface, transformed, (160, 160, 160))
         scanline_fill(surface, transformed, (160, 160, 160))
@@ -1,58 +1,7 @@
 import math
-import random
-from primitives import drawPolygon, drawCircle, DrawLineBresenham, drawEllipse, scanline_fill
-from transforms import get_rotation_matrix, get_translation_matrix, mat_mul, apply_transform
-
-
-def create_jellyfish(x, y, scale=1.0):
-    return {
-        'x': x,
-        'y': y,
-        'target_x': x,
-        'target_y': y,
-        'speed': 0.5,
-        'time': random.uniform(0, math.pi * 2),
-        'pulse': 0,
-        'pulse_speed': 0.08,
-        'tentacle_phase': random.uniform(0, math.pi * 2),
-        'direction_timer': 0,
-        'direction_interval': random.randint(120, 240),
-        'scale': scale
-    }
-
-
-def update_jellyfish(jf, bounds_width, bounds_height, is_in_map_func=None):
-    jf['time'] += 0.02
-    jf['pulse'] += jf['pulse_speed']
-    jf['tentacle_phase'] += 0.05
-    
-    jf['direction_timer'] += 1
-    if jf['direction_timer'] >= jf['direction_interval']:
-        jf['direction_timer'] = 0
-        jf['direction_interval'] = random.randint(120, 240)
-        for _ in range(10):
-            margin = 100
-            new_target_x = random.randint(margin, bounds_width - margin)
-            new_target_y = random.randint(margin, bounds_height - margin)
-            if is_in_map_func is None or is_in_map_func(new_target_x, new_target_y):
-                jf['target_x'] = new_target_x
-                jf['target_y'] = new_target_y
-                break
-    
-    dx = jf['target_x'] - jf['x']
-    dy = jf['target_y'] - jf['y']
-    dist = math.sqrt(dx * dx + dy * dy)
-    
-    if dist > 5:
-        new_x = jf['x'] + (dx / dist) * jf['speed']
-        new_y = jf['y'] + (dy / dist) * jf['speed']
-        if is_in_map_func is None or is_in_map_func(new_x, new_y):
-            jf['x'] = new_x
-            jf['y'] = new_y
-    
-    float_y = jf['y'] + math.sin(jf['time']) * 0.3
-    if is_in_map_func is None or is_in_map_func(jf['x'], float_y):
-        jf['y'] = float_y
+import numpy as np
+from primitives import drawPolygon, drawCircle, drawEllipse, scanline_fill, draw_lines
+from transforms import get_rotation_matrix, get_translation_matrix, mat_mul, apply_transform_array
 
 
 def get_dome_outline(jf):
@@ -139,25 +88,36 @@ def get_tentacle_points(jf, tentacle_index, num_tentacles):
     return points
 
 
+def transform_jellyfish(jf, matrix, num_tentacles=7):
+    """
+    Transforma a cúpula e todos os tentáculos numa única chamada.
+    Retorna (cúpula (n, 2), tentáculos (num_tentacles, pontos, 2)).
+    """
+    dome_points = get_dome_outline(jf)
+    points = list(dome_points)
+    for i in range(num_tentacles):
+        points.extend(get_tentacle_points(jf, i, num_tentacles))
+    
+    transformed = apply_transform_array(points, matrix)
+    num_dome = len(dome_points)
+    return transformed[:num_dome], transformed[num_dome:].reshape(num_tentacles, -1, 2)
+
+
+def get_tentacle_segments(tentacles):
+    """Segmentos (N, 4) entre pontos consecutivos de cada tentáculo."""
+    return np.concatenate((tentacles[:, :-1], tentacles[:, 1:]), axis=2).reshape(-1, 4)
+
+
 def draw_jellyfish(surface, jf, color):
     x = int(jf['x'])
     y = int(jf['y'])
     
     matrix = get_translation_matrix(x, y)
     
-    dome_points = get_dome_outline(jf)
-    transformed_dome = apply_transform(dome_points, matrix)
+    transformed_dome, transformed_tentacles = transform_jellyfish(jf, matrix)
     drawPolygon(surface, transformed_dome, color)
     
-    num_tentacles = 7
-    for i in range(num_tentacles):
-        tentacle_points = get_tentacle_points(jf, i, num_tentacles)
-        transformed_tentacle = apply_transform(tentacle_points, matrix)
-        
-        for j in range(len(transformed_tentacle) - 1):
-            p1 = transformed_tentacle[j]
-            p2 = transformed_tentacle[j + 1]
-            DrawLineBresenham(surface, int(p1[0]), int(p1[1]), int(p2[0]), int(p2[1]), color)
+    draw_lines(surface, get_tentacle_segments(transformed_tentacles), color)
 
 
 def get_bioluminescent_color(jf, base_intensity=1.0):
@@ -182,23 +142,15 @@ def draw_jellyfish_bioluminescent(surface, jf):
     
     glow_color = get_bioluminescent_color(jf, 1.0)
     
-    dome_points = get_dome_outline(jf)
-    transformed_dome = apply_transform(dome_points, matrix)
+    transformed_dome, transformed_tentacles = transform_jellyfish(jf, matrix)
     drawPolygon(surface, transformed_dome, glow_color)
     
-    num_tentacles = 7
-    for i in range(num_tentacles):
-        tentacle_points = get_tentacle_points(jf, i, num_tentacles)
-        transformed_tentacle = apply_transform(tentacle_points, matrix)
-        
-        num_segments = len(transformed_tentacle) - 1
-        for j in range(num_segments):
-            fade = 1.0 - (j / num_segments) * 0.6
-            segment_color = get_bioluminescent_color(jf, fade)
-            
-            p1 = transformed_tentacle[j]
-            p2 = transformed_tentacle[j + 1]
-            DrawLineBresenham(surface, int(p1[0]), int(p1[1]), int(p2[0]), int(p2[1]), segment_color)
+    num_tentacles, num_points, _ = transformed_tentacles.shape
+    num_segments = num_points - 1
+    tentacle_colors = [get_bioluminescent_color(jf, 1.0 - (j / num_segments) * 0.6)
+                       for j in range(num_segments)]
+    
+    draw_lines(surface, get_tentacle_segments(transformed_tentacles), tentacle_colors * num_tentacles)
 
 
 def check_jellyfish_collision(jf, target_x, target_y, radius):
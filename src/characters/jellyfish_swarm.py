@@ -0,0 +1,246 @@
+"""
+Cardume de águas-vivas em arrays paralelos (struct-of-arrays).
+
+Cada atributo de uma água-viva (posição, destino, velocidade, fases do
+pulso e dos tentáculos, escala) é um array NumPy com uma posição por
+água-viva, e JellyfishSwarm.update move todas de uma vez: troca de
+destino, passo em direção a ele, teste de parede na grade de ocupação e
+a flutuação vertical. Com uma navigation.NavGrid, os destinos são os
+waypoints da grade e o passo segue o campo de fluxo do destino em vez
+da linha reta. Só as que estão na tela são desenhadas.
+
+O desenho usa sprites pré-rasterizados: a pose de uma água-viva depende
+só de pulse (período 4π, somando a escala e a cor), tentacle_phase
+(período 2π) e scale, então cada combinação quantizada é desenhada uma
+vez com draw_jellyfish_bioluminescent e depois só copiada com blit.
+"""
+import math
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+from characters.jellyfish import draw_jellyfish_bioluminescent, transform_jellyfish
+from transforms import get_translation_matrix
+
+TARGET_MARGIN = 100
+TARGET_TRIES = 10
+COLLISION_RADIUS = 30
+
+SPRITE_PULSE_STEPS = 48
+SPRITE_PHASE_STEPS = 24
+SPRITE_CACHE_SIZE = 2048
+
+_PULSE_PERIOD = math.pi * 4
+_PHASE_PERIOD = math.pi * 2
+
+# (escala, passo de pulse, passo de fase) -> (superfície, dx, dy), LRU.
+_sprites = OrderedDict()
+
+
+def _render_sprite(scale, pulse, tentacle_phase):
+    """Água-viva parada na origem, numa superfície recortada com colorkey preto."""
+    pose = {'x': 0, 'y': 0, 'pulse': pulse, 'tentacle_phase': tentacle_phase, 'scale': scale}
+    dome, tentacles = transform_jellyfish(pose, get_translation_matrix(0, 0))
+    points = np.vstack((dome, tentacles.reshape(-1, 2)))
+    left, top = np.floor(points.min(axis=0)).astype(int) - 1
+    right, bottom = np.ceil(points.max(axis=0)).astype(int) + 2
+
+    sprite = pygame.Surface((right - left, bottom - top))
+    sprite.fill((0, 0, 0))
+    pose['x'] = -left
+    pose['y'] = -top
+    draw_jellyfish_bioluminescent(sprite, pose)
+    sprite.set_colorkey((0, 0, 0))
+    if pygame.display.get_surface() is not None:
+        sprite = sprite.convert()
+    return sprite, int(left), int(top)
+
+
+def get_sprite(scale, pulse_step, phase_step):
+    """Sprite da pose quantizada, rasterizado na primeira vez."""
+    key = (scale, pulse_step, phase_step)
+    entry = _sprites.get(key)
+    if entry is not None:
+        _sprites.move_to_end(key)
+        return entry
+
+    entry = _render_sprite(scale,
+                           pulse_step * _PULSE_PERIOD / SPRITE_PULSE_STEPS,
+                           phase_step * _PHASE_PERIOD / SPRITE_PHASE_STEPS)
+    _sprites[key] = entry
+    while len(_sprites) > SPRITE_CACHE_SIZE:
+        _sprites.popitem(last=False)
+    return entry
+
+
+class JellyfishSwarm:
+    __slots__ = ('x', 'y', 'target_x', 'target_y', 'speed', 'time', 'pulse', 'pulse_speed',
+                 'tentacle_phase', 'direction_timer', 'direction_interval', 'scale',
+                 'goal_cell', 'rng')
+
+    def __init__(self, xs, ys, scales, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        n = len(xs)
+        self.x = np.asarray(xs, dtype=np.float64).copy()
+        self.y = np.asarray(ys, dtype=np.float64).copy()
+        self.target_x = self.x.copy()
+        self.target_y = self.y.copy()
+        self.speed = np.full(n, 0.5)
+        self.time = self.rng.uniform(0, math.pi * 2, n)
+        self.pulse = np.zeros(n)
+        self.pulse_speed = np.full(n, 0.08)
+        self.tentacle_phase = self.rng.uniform(0, math.pi * 2, n)
+        self.direction_timer = np.zeros(n, dtype=np.int64)
+        self.direction_interval = self.rng.integers(120, 241, n)
+        self.scale = np.broadcast_to(np.asarray(scales, dtype=np.float64), (n,)).copy()
+        # Célula (índice plano na NavGrid) do destino cujo campo de fluxo
+        # cada uma segue, -1 = linha reta.
+        self.goal_cell = np.full(n, -1, dtype=np.int64)
+
+    @classmethod
+    def from_spawns(cls, spawns, rng=None):
+        """Cardume a partir de posições (x, y, escala), como Level.spawns('jellyfish')."""
+        spawns = list(spawns)
+        xs = [s[0] for s in spawns]
+        ys = [s[1] for s in spawns]
+        scales = [s[2] for s in spawns]
+        return cls(xs, ys, scales, rng)
+
+    def __len__(self):
+        return len(self.x)
+
+    @staticmethod
+    def _goal_cell(nav, goal_x, goal_y):
+        cell = nav.cell_of(goal_x, goal_y)
+        if cell is None:
+            return -1
+        return cell[0] * nav.cols + cell[1]
+
+    def _retarget(self, chosen, bounds_width, bounds_height, in_map, nav):
+        if nav is not None and nav.waypoints:
+            picks = self.rng.integers(0, len(nav.waypoints), len(chosen))
+            for i, pick in zip(chosen.tolist(), picks.tolist()):
+                goal_x, goal_y = nav.waypoints[pick]
+                self.target_x[i] = goal_x
+                self.target_y[i] = goal_y
+                self.goal_cell[i] = self._goal_cell(nav, goal_x, goal_y)
+            return
+
+        shape = (len(chosen), TARGET_TRIES)
+        cand_x = self.rng.integers(TARGET_MARGIN, bounds_width - TARGET_MARGIN + 1, shape)
+        cand_y = self.rng.integers(TARGET_MARGIN, bounds_height - TARGET_MARGIN + 1, shape)
+        valid = in_map(cand_x, cand_y) if in_map is not None else np.ones(shape, dtype=bool)
+        first = np.argmax(valid, axis=1)
+        found = valid[np.arange(len(chosen)), first]
+        rows = np.flatnonzero(found)
+        self.target_x[chosen[rows]] = cand_x[rows, first[rows]]
+        self.target_y[chosen[rows]] = cand_y[rows, first[rows]]
+        self.goal_cell[chosen[rows]] = -1
+
+    def update(self, bounds_width, bounds_height, in_map=None, nav=None, active=None):
+        """
+        Um quadro de movimento para as águas-vivas de `active`
+        (máscara booleana; todas se None). `in_map` é vetorizado, como
+        map.points_in_map.
+        """
+        idx = np.arange(len(self.x)) if active is None else np.flatnonzero(active)
+        if len(idx) == 0:
+            return
+
+        self.time[idx] += 0.02
+        self.pulse[idx] += self.pulse_speed[idx]
+        self.tentacle_phase[idx] += 0.05
+        self.direction_timer[idx] += 1
+
+        due = idx[self.direction_timer[idx] >= self.direction_interval[idx]]
+        if len(due):
+            self.direction_timer[due] = 0
+            self.direction_interval[due] = self.rng.integers(120, 241, len(due))
+            self._retarget(due, bounds_width, bounds_height, in_map, nav)
+
+        dx = self.target_x[idx] - self.x[idx]
+        dy = self.target_y[idx] - self.y[idx]
+        dist = np.sqrt(dx * dx + dy * dy)
+        moving = dist > 5
+        idx, dx, dy, dist = idx[moving], dx[moving], dy[moving], dist[moving]
+
+        step = np.empty((len(idx), 2))
+        step[:, 0] = dx / dist
+        step[:, 1] = dy / dist
+        if nav is not None:
+            # Um campo por célula de destino, pedido à NavGrid (cache LRU dela).
+            cells = self.goal_cell[idx]
+            for cell in np.unique(cells[cells >= 0]).tolist():
+                group = np.flatnonzero(cells == cell)
+                first = idx[group[0]]
+                field = nav.flow_field(self.target_x[first], self.target_y[first])
+                flow = nav.steps(field, self.x[idx[group]], self.y[idx[group]])
+                usable = ~np.isnan(flow[:, 0])
+                step[group[usable]] = flow[usable]
+
+        new_x = self.x[idx] + step[:, 0] * self.speed[idx]
+        new_y = self.y[idx] + step[:, 1] * self.speed[idx]
+        ok = in_map(new_x, new_y) if in_map is not None else np.ones(len(idx), dtype=bool)
+        self.x[idx[ok]] = new_x[ok]
+        self.y[idx[ok]] = new_y[ok]
+
+        idx = np.arange(len(self.x)) if active is None else np.flatnonzero(active)
+        float_y = self.y[idx] + np.sin(self.time[idx]) * 0.3
+        ok = in_map(self.x[idx], float_y) if in_map is not None else np.ones(len(idx), dtype=bool)
+        self.y[idx[ok]] = float_y[ok]
+
+    def in_view(self, camera_x, camera_y, width, height, margin=200):
+        """Máscara das águas-vivas dentro da tela (com margem), como is_visible do main."""
+        sx = self.x - camera_x
+        sy = self.y - camera_y
+        return (sx > -margin) & (sx < width + margin) & (sy > -margin) & (sy < height + margin)
+
+    def first_collision(self, target_x, target_y, radius, active=None):
+        """
+        Índice da primeira água-viva (na ordem do cardume) que encosta num
+        círculo de raio `radius` em (target_x, target_y), ou None.
+        """
+        dx = self.x - target_x
+        dy = self.y - target_y
+        hit = dx * dx + dy * dy < (COLLISION_RADIUS * self.scale + radius) ** 2
+        if active is not None:
+            hit &= active
+        first = int(np.argmax(hit))
+        return first if hit[first] else None
+
+    def glow(self, visible):
+        """
+        Posições (mundo) e cores de get_bioluminescent_color das águas-vivas
+        de `visible`, para as luzes do mapa de iluminação.
+        """
+        idx = np.flatnonzero(visible)
+        pulse = np.sin(self.pulse[idx] * 1.5) * 0.5 + 0.5
+        colors = np.empty((len(idx), 3))
+        colors[:, 0] = 255
+        colors[:, 1] = 50 + pulse * 100
+        colors[:, 2] = 180 + pulse * 75
+        return self.x[idx], self.y[idx], colors
+
+    def draw(self, surface, camera_x, camera_y, visible=None):
+        """
+        Desenha só as águas-vivas de `visible` (máscara), em coordenadas de
+        tela, com os sprites da pose mais próxima.
+        """
+        if visible is None:
+            visible = self.in_view(camera_x, camera_y, surface.get_width(), surface.get_height())
+        idx = np.flatnonzero(visible)
+        if len(idx) == 0:
+            return
+
+        xs = (self.x[idx] - camera_x).astype(np.int64)
+        ys = (self.y[idx] - camera_y).astype(np.int64)
+        pulse_steps = np.rint(self.pulse[idx] * (SPRITE_PULSE_STEPS / _PULSE_PERIOD)).astype(np.int64) % SPRITE_PULSE_STEPS
+        phase_steps = np.rint(self.tentacle_phase[idx] * (SPRITE_PHASE_STEPS / _PHASE_PERIOD)).astype(np.int64) % SPRITE_PHASE_STEPS
+
+        blits = []
+        for x, y, scale, pulse_step, phase_step in zip(xs.tolist(), ys.tolist(), self.scale[idx].tolist(),
+                                                       pulse_steps.tolist(), phase_steps.tolist()):
+            sprite, dx, dy = get_sprite(scale, pulse_step, phase_step)
+            blits.append((sprite, (x + dx, y + dy)))
+        surface.blits(blits, doreturn=False)
@@ -1,11 +1,11 @@
 import math
 from primitives import (
-    drawPolygon, drawCircle, DrawLineBresenham, 
-    scanline_fill, drawEllipse
+    drawPolygon, drawCircle,
+    scanline_fill, drawEllipse, draw_lines
 )
 from transforms import (
     get_rotation_matrix, get_translation_matrix, 
-    mat_mul, apply_transform, get_scale_matrix
+    mat_mul, get_scale_matrix, GeometryBuffer
 )
 
 
@@ -129,23 +129,46 @@ def get_transform_matrix(x, y, scale=1.0):
 
 
 def transform_point(cx, cy, matrix):
-    points = [(cx, cy)]
-    transformed = apply_transform(points, matrix)
-    return transformed[0]
+    return matrix.apply(cx, cy)
+
+
+_capsule_geometry = None
+
+
+def get_capsule_geometry():
+    """Partes fixas da cápsula num GeometryBuffer (montado uma única vez) e as partes originais."""
+    global _capsule_geometry
+    if _capsule_geometry is None:
+        parts = get_capsule_parts()
+        model = {name: parts[name] for name in (
+            'body', 'cap_left', 'cap_right', 'stripe_top', 'stripe_bottom', 'handle')}
+        model['center'] = [(0, 0)]
+        model['detail_lines'] = [p for line in parts['detail_lines'] for p in line]
+        model['lights'] = [(cx, cy) for cx, cy, _ in parts['lights'].values()]
+        model['barnacles'] = [(cx, cy) for cx, cy, _ in parts['barnacles']]
+        model['rivets'] = [(cx, cy) for cx, cy, _ in parts['rivets']]
+        _capsule_geometry = (GeometryBuffer(model), parts)
+    return _capsule_geometry
+
+
+def get_capsule_light(capsule):
+    """Intensidade (0..1) das luzes da cápsula no quadro atual."""
+    return 0.5 + 0.5 * math.sin(capsule['light_phase'] * 2 * math.pi)
 
 
 def draw_research_capsule(surface, capsule):
     if capsule['collected']:
         return
     
-    parts = get_capsule_parts()
+    geometry, parts = get_capsule_geometry()
     
     
     draw_y = capsule['y'] + capsule['float_offset']
     matrix = get_transform_matrix(capsule['x'], draw_y, capsule['scale'])
+    model = geometry.transform(matrix)
     
    
-    light_intensity = 0.5 + 0.5 * math.sin(capsule['light_phase'] * 2 * math.pi)
+    light_intensity = get_capsule_light(capsule)
     
     
     if light_intensity > 0.6:
@@ -156,46 +179,36 @@ def draw_research_capsule(surface, capsule):
             int(CAPSULE_GLOW[1] * glow_alpha),
             int(CAPSULE_GLOW[2] * glow_alpha),
         )
-        glow_x, glow_y = transform_point(0, 0, matrix)
-        drawCircle(surface, int(glow_x), int(glow_y), glow_radius, glow_color)
+        glow_x, glow_y = model['center'][0].astype(int).tolist()
+        drawCircle(surface, glow_x, glow_y, glow_radius, glow_color)
     
-    body = apply_transform(parts['body'], matrix)
-    body_int = [(int(px), int(py)) for px, py in body]
+    body_int = model['body'].astype(int).tolist()
     scanline_fill(surface, body_int, CAPSULE_BODY)
     drawPolygon(surface, body_int, CAPSULE_ACCENT)
     
-    cap_left = apply_transform(parts['cap_left'], matrix)
-    cap_left_int = [(int(px), int(py)) for px, py in cap_left]
+    cap_left_int = model['cap_left'].astype(int).tolist()
     scanline_fill(surface, cap_left_int, CAPSULE_BODY_LIGHT)
     drawPolygon(surface, cap_left_int, CAPSULE_ACCENT)
     
-    cap_right = apply_transform(parts['cap_right'], matrix)
-    cap_right_int = [(int(px), int(py)) for px, py in cap_right]
+    cap_right_int = model['cap_right'].astype(int).tolist()
     scanline_fill(surface, cap_right_int, CAPSULE_BODY_LIGHT)
     drawPolygon(surface, cap_right_int, CAPSULE_ACCENT)
     
-    stripe_top = apply_transform(parts['stripe_top'], matrix)
-    stripe_top_int = [(int(px), int(py)) for px, py in stripe_top]
+    stripe_top_int = model['stripe_top'].astype(int).tolist()
     scanline_fill(surface, stripe_top_int, CAPSULE_ACCENT)
     
-    stripe_bottom = apply_transform(parts['stripe_bottom'], matrix)
-    stripe_bottom_int = [(int(px), int(py)) for px, py in stripe_bottom]
+    stripe_bottom_int = model['stripe_bottom'].astype(int).tolist()
     scanline_fill(surface, stripe_bottom_int, CAPSULE_ACCENT)
     
-    handle = apply_transform(parts['handle'], matrix)
-    handle_int = [(int(px), int(py)) for px, py in handle]
+    handle_int = model['handle'].astype(int).tolist()
     scanline_fill(surface, handle_int, CAPSULE_BODY_LIGHT)
     drawPolygon(surface, handle_int, CAPSULE_ACCENT)
     
-    for line in parts['detail_lines']:
-        transformed = apply_transform(line, matrix)
-        p1, p2 = transformed[0], transformed[1]
-        DrawLineBresenham(surface, int(p1[0]), int(p1[1]), 
-                         int(p2[0]), int(p2[1]), CAPSULE_ACCENT)
+    draw_lines(surface, model['detail_lines'].reshape(-1, 4), CAPSULE_ACCENT)
     
     
-    for name, (cx, cy, radius) in parts['lights'].items():
-        light_x, light_y = transform_point(cx, cy, matrix)
+    light_centers = model['lights'].astype(int).tolist()
+    for (_, _, radius), (light_x, light_y) in zip(parts['lights'].values(), light_centers):
         scaled_radius = int(radius * capsule['scale'])
         
         light_color = (
@@ -204,22 +217,22 @@ def draw_research_capsule(surface, capsule):
             int(CAPSULE_LIGHT_OFF[2] + (CAPSULE_LIGHT_ON[2] - CAPSULE_LIGHT_OFF[2]) * light_intensity),
         )
         
-        drawCircle(surface, int(light_x), int(light_y), scaled_radius + 2, CAPSULE_ACCENT)
-        drawCircle(surface, int(light_x), int(light_y), scaled_radius, light_color)
+        drawCircle(surface, light_x, light_y, scaled_radius + 2, CAPSULE_ACCENT)
+        drawCircle(surface, light_x, light_y, scaled_radius, light_color)
         
         if light_intensity > 0.5:
             inner_radius = max(1, int(scaled_radius * 0.5))
-            drawCircle(surface, int(light_x), int(light_y), inner_radius, CAPSULE_GLOW)
+            drawCircle(surface, light_x, light_y, inner_radius, CAPSULE_GLOW)
     
-    for cx, cy, radius in parts['barnacles']:
-        barnacle_x, barnacle_y = transform_point(cx, cy, matrix)
+    barnacle_centers = model['barnacles'].astype(int).tolist()
+    for (_, _, radius), (barnacle_x, barnacle_y) in zip(parts['barnacles'], barnacle_centers):
         scaled_radius = max(1, int(radius * capsule['scale']))
-        drawCircle(surface, int(barnacle_x), int(barnacle_y), scaled_radius, BARNACLE_COLOR)
+        drawCircle(surface, barnacle_x, barnacle_y, scaled_radius, BARNACLE_COLOR)
     
-    for cx, cy, radius in parts['rivets']:
-        rivet_x, rivet_y = transform_point(cx, cy, matrix)
+    rivet_centers = model['rivets'].astype(int).tolist()
+    for (_, _, radius), (rivet_x, rivet_y) in zip(parts['rivets'], rivet_centers):
         scaled_radius = max(1, int(radius * capsule['scale']))
-        drawCircle(surface, int(rivet_x), int(rivet_y), scaled_radius, CAPSULE_ACCENT)
+        drawCircle(surface, rivet_x, rivet_y, scaled_radius, CAPSULE_ACCENT)
 
 
 def check_capsule_collision(sub_x, sub_y, capsule, collision_radius=50):
@@ -1,9 +1,12 @@
 import math
 from primitives import (
-    drawPolygon, drawCircle, DrawLineBresenham, 
-    scanline_fill, drawEllipse
+    drawPolygon, drawCircle,
+    scanline_fill, drawEllipse, draw_lines
+)
+from transforms import (
+    get_rotation_matrix, get_translation_matrix, mat_mul, get_scale_matrix,
+    GeometryBuffer
 )
-from transforms import get_rotation_matrix, get_translation_matrix, mat_mul, apply_transform, get_scale_matrix
 
 
 def init_sonar():
@@ -166,7 +169,6 @@ def get_propeller_blades(propeller_angle):
 
 
 def get_transform_matrix(x, y, angle, scale=1.0):
-    from transforms import get_scale_matrix
     scale_mat = get_scale_matrix(scale, scale)
     rotation = get_rotation_matrix(angle)
     translation = get_translation_matrix(x, y)
@@ -175,55 +177,45 @@ def get_transform_matrix(x, y, angle, scale=1.0):
 
 
 def transform_point(cx, cy, matrix):
-    points = [(cx, cy)]
-    transformed = apply_transform(points, matrix)
-    return transformed[0]
+    return matrix.apply(cx, cy)
 
 
-def drawSubmarine(surface, x, y, angle, body_color, detail_color, propeller_angle=0, scale=1.0):
-    parts = get_submarine_parts()
-    matrix = get_transform_matrix(x, y, angle, scale)
-    
-    body = apply_transform(parts['body'], matrix)
-    drawPolygon(surface, body, body_color)
-    
-    tail = apply_transform(parts['tail'], matrix)
-    drawPolygon(surface, tail, body_color)
-    
-    tower_base = apply_transform(parts['tower_base'], matrix)
-    drawPolygon(surface, tower_base, body_color)
-    
-    periscope = apply_transform(parts['periscope'], matrix)
-    drawPolygon(surface, periscope, body_color)
-    
-    for line in parts['tower_lines']:
-        translated = apply_transform(line, matrix)
-        p1, p2 = translated[0], translated[1]
-        DrawLineBresenham(surface, int(p1[0]), int(p1[1]), 
-                         int(p2[0]), int(p2[1]), detail_color)
+_submarine_geometry = None
+
+
+def get_submarine_geometry():
+    """Partes fixas do submarino num GeometryBuffer (montado uma única vez) e as partes originais."""
+    global _submarine_geometry
+    if _submarine_geometry is None:
+        parts = get_submarine_parts()
+        model = {name: parts[name] for name in (
+            'body', 'tail', 'tower_base', 'periscope',
+            'stripe_left', 'stripe_right', 'fin_top', 'fin_bottom')}
+        model['tower_lines'] = [p for line in parts['tower_lines'] for p in line]
+        model['circles'] = [(cx, cy) for cx, cy, _ in parts['circles'].values()]
+        _submarine_geometry = (GeometryBuffer(model), parts)
+    return _submarine_geometry
+
+
+def _draw_submarine_outline(surface, parts, model, body_color, detail_color, scale):
+    drawPolygon(surface, model['body'], body_color)
+    drawPolygon(surface, model['tail'], body_color)
+    drawPolygon(surface, model['tower_base'], body_color)
+    drawPolygon(surface, model['periscope'], body_color)
     
-    for stripe_name in ['stripe_left', 'stripe_right']:
-        stripe = apply_transform(parts[stripe_name], matrix)
-        drawPolygon(surface, stripe, detail_color)
+    draw_lines(surface, model['tower_lines'].reshape(-1, 4), detail_color)
     
-    propeller_blades = get_propeller_blades(propeller_angle)
-    for blade in propeller_blades:
-        translated = apply_transform(blade, matrix)
-        p1, p2 = translated[0], translated[1]
-        DrawLineBresenham(surface, int(p1[0]), int(p1[1]), 
-                         int(p2[0]), int(p2[1]), body_color)
+    drawPolygon(surface, model['stripe_left'], detail_color)
+    drawPolygon(surface, model['stripe_right'], detail_color)
     
-    fin_top = apply_transform(parts['fin_top'], matrix)
-    drawPolygon(surface, fin_top, body_color)
+    draw_lines(surface, model['propeller_blades'].reshape(-1, 4), body_color)
     
-    fin_bottom = apply_transform(parts['fin_bottom'], matrix)
-    drawPolygon(surface, fin_bottom, body_color)
+    drawPolygon(surface, model['fin_top'], body_color)
+    drawPolygon(surface, model['fin_bottom'], body_color)
     
-    circles = parts['circles']
+    centers = model['circles'].astype(int).tolist()
     
-    for name, (cx, cy, radius) in circles.items():
-        final_x, final_y = transform_point(cx, cy, matrix)
-        final_x, final_y = int(final_x), int(final_y)
+    for (name, (_, _, radius)), (final_x, final_y) in zip(parts['circles'].items(), centers):
         scaled_radius = int(radius * scale)
         
         if 'window' in name:
@@ -241,35 +233,22 @@ def drawSubmarine(surface, x, y, angle, body_color, detail_color, propeller_angl
         drawCircle(surface, final_x, final_y, scaled_radius, color)
 
 
+def drawSubmarine(surface, x, y, angle, body_color, detail_color, propeller_angle=0, scale=1.0):
+    geometry, parts = get_submarine_geometry()
+    matrix = get_transform_matrix(x, y, angle, scale)
+    model = geometry.transform(matrix, propeller_blades=get_propeller_blades(propeller_angle))
+    _draw_submarine_outline(surface, parts, model, body_color, detail_color, scale)
+
+
 def drawSubmarineFilled(surface, x, y, angle, body_color, detail_color, fill_color, propeller_angle=0, scale=1.0):
-    parts = get_submarine_parts()
+    geometry, parts = get_submarine_geometry()
     matrix = get_transform_matrix(x, y, angle, scale)
+    model = geometry.transform(matrix, propeller_blades=get_propeller_blades(propeller_angle))
     
-    body = apply_transform(parts['body'], matrix)
-    body_int = [(int(px), int(py)) for px, py in body]
-    scanline_fill(surface, body_int, fill_color)
-    
-    tail = apply_transform(parts['tail'], matrix)
-    tail_int = [(int(px), int(py)) for px, py in tail]
-    scanline_fill(surface, tail_int, fill_color)
-    
-    tower_base = apply_transform(parts['tower_base'], matrix)
-    tower_int = [(int(px), int(py)) for px, py in tower_base]
-    scanline_fill(surface, tower_int, fill_color)
-    
-    periscope = apply_transform(parts['periscope'], matrix)
-    periscope_int = [(int(px), int(py)) for px, py in periscope]
-    scanline_fill(surface, periscope_int, fill_color)
-    
-    fin_top = apply_transform(parts['fin_top'], matrix)
-    fin_top_int = [(int(px), int(py)) for px, py in fin_top]
-    scanline_fill(surface, fin_top_int, fill_color)
-    
-    fin_bottom = apply_transform(parts['fin_bottom'], matrix)
-    fin_bottom_int = [(int(px), int(py)) for px, py in fin_bottom]
-    scanline_fill(surface, fin_bottom_int, fill_color)
+    for name in ('body', 'tail', 'tower_base', 'periscope', 'fin_top', 'fin_bottom'):
+        scanline_fill(surface, model[name].astype(int).tolist(), fill_color)
     
-    drawSubmarine(surface, x, y, angle, body_color, detail_color, propeller_angle, scale)
+    _draw_submarine_outline(surface, parts, model, body_color, detail_color, scale)
 
 
 def get_bubble_spawn_position(sub_x, sub_y, sub_angle):
@@ -1,7 +1,8 @@
 import math
 import random
-from primitives import drawPolygon, drawCircle, DrawLineBresenham, drawEllipse, scanline_fill
-from transforms import get_rotation_matrix, get_translation_matrix, mat_mul, apply_transform
+from functools import lru_cache
+from primitives import drawPolygon, drawCircle, drawEllipse, scanline_fill
+from transforms import get_rotation_matrix, get_translation_matrix, mat_mul, GeometryBuffer
 from characters.explosion import ExplosionParticle, ExplosionFragment
 
 
@@ -141,6 +142,28 @@ def get_bomb_bubbles(bomb):
     return bubbles
 
 
+@lru_cache(maxsize=16)
+def get_bomb_geometry(scale):
+    """Partes fixas da bomba (dependem só da escala) num GeometryBuffer."""
+    bomb = {'scale': scale}
+    spikes = get_bomb_spikes(bomb)
+    
+    center_points = []
+    for i in range(6):
+        angle = (i / 6) * math.pi * 2
+        px = 8 * math.cos(angle)
+        py = 8 * math.sin(angle)
+        center_points.append((px, py))
+    
+    return GeometryBuffer({
+        'center': [(0, 0)],
+        'spikes': [p for spike in spikes for p in spike],
+        'rivets': get_bomb_rivets(bomb),
+        'highlight': [(-10, -10)],
+        'center_points': center_points,
+    })
+
+
 def draw_water_bomb(surface, bomb, body_color, spike_color, highlight_color):
     if not bomb['active']:
         return
@@ -152,37 +175,27 @@ def draw_water_bomb(surface, bomb, body_color, spike_color, highlight_color):
     translation_matrix = get_translation_matrix(x, y)
     matrix = mat_mul(translation_matrix, rotation_matrix)
     
+    bubbles = get_bomb_bubbles(bomb)
+    model = get_bomb_geometry(bomb.get('scale', 1.0)).transform(
+        matrix, bubbles=[(bubble['x'], bubble['y']) for bubble in bubbles])
+    
     radius = int(28 * bomb.get('scale', 1.0))
-    center = apply_transform([(0, 0)], matrix)[0]
-    draw_metal_shading(surface, (int(center[0]), int(center[1])), radius, body_color)
+    center_x, center_y = model['center'][0].astype(int).tolist()
+    draw_metal_shading(surface, (center_x, center_y), radius, body_color)
 
     
-    spikes = get_bomb_spikes(bomb)
-    for spike in spikes:
-        transformed = apply_transform(spike, matrix)
-        drawPolygon(surface, transformed, spike_color)
-        scanline_fill(surface, transformed, spike_color)
+    for spike in model['spikes'].reshape(-1, 3, 2):
+        drawPolygon(surface, spike, spike_color)
+        scanline_fill(surface, spike.tolist(), spike_color)
 
-    rivets = get_bomb_rivets(bomb)
-    for r in rivets:
-        pos = apply_transform([r], matrix)[0]
-        drawCircle(surface, int(pos[0]), int(pos[1]), 3, (80, 80, 80))
+    for pos_x, pos_y in model['rivets'].astype(int).tolist():
+        drawCircle(surface, pos_x, pos_y, 3, (80, 80, 80))
 
-    highlight = apply_transform([(-10, -10)], matrix)[0]
-    drawCircle(surface, int(highlight[0]), int(highlight[1]), 6, highlight_color)
+    highlight_x, highlight_y = model['highlight'][0].astype(int).tolist()
+    drawCircle(surface, highlight_x, highlight_y, 6, highlight_color)
 
     
-    bubbles = get_bomb_bubbles(bomb)
-    for bubble in bubbles:
-        bubble_pos = apply_transform([(bubble['x'], bubble['y'])], matrix)[0]
-        drawCircle(surface, int(bubble_pos[0]), int(bubble_pos[1]), int(bubble['radius']), highlight_color)
-    
-    center_points = []
-    for i in range(6):
-        angle = (i / 6) * math.pi * 2
-        px = 8 * math.cos(angle)
-        py = 8 * math.sin(angle)
-        center_points.append((px, py))
+    for bubble, (bubble_x, bubble_y) in zip(bubbles, model['bubbles'].astype(int).tolist()):
+        drawCircle(surface, bubble_x, bubble_y, int(bubble['radius']), highlight_color)
     
-    transformed_center = apply_transform(center_points, matrix)
-    drawPolygon(surface, transformed_center, highlight_color)
+    drawPolygon(surface, model['center_points'], highlight_color)
@@ -0,0 +1,188 @@
+"""
+Módulo de Campo de Distância
+Campo de distância com sinal (SDF) das paredes da caverna, calculado a
+partir da grade de ocupação do mapa.
+
+Cada célula guarda a distância, em pixels, até a parede mais próxima:
+positiva na água, negativa na rocha e perto de zero na borda. Distâncias
+maiores que `max_distance` ficam saturadas nesse valor, o que basta para
+colisão. O gradiente do campo aponta para longe da parede e dá a normal
+usada no deslizamento e no empurrão.
+"""
+import os
+
+import numpy as np
+
+import level_cache
+
+DEFAULT_MAX_DISTANCE = 64
+
+
+def _column_distance(blocked, max_distance):
+    """Distância vertical de cada célula até a célula bloqueada mais próxima na mesma coluna."""
+    height = blocked.shape[0]
+    rows = np.arange(height)[:, None]
+    far = max_distance + 1
+
+    above = np.where(blocked, rows, -far - height)
+    above = np.maximum.accumulate(above, axis=0)
+    below = np.where(blocked, rows, far + 2 * height)
+    below = np.minimum.accumulate(below[::-1], axis=0)[::-1]
+
+    return np.minimum(np.minimum(rows - above, below - rows), far).astype(np.float32)
+
+
+def _distance_to(blocked, max_distance):
+    """
+    Transformada de distância euclidiana até a célula bloqueada mais
+    próxima, exata até `max_distance`. Primeiro a distância por coluna,
+    depois o mínimo de dx² + dy² sobre os deslocamentos horizontais
+    |dx| <= max_distance, cada um aplicado à grade inteira de uma vez.
+    """
+    column = _column_distance(blocked, max_distance)
+    column_sq = column * column
+    best = column_sq.copy()
+    width = blocked.shape[1]
+
+    for dx in range(1, min(max_distance, width - 1) + 1):
+        shift = np.float32(dx * dx)
+        np.minimum(best[:, dx:], column_sq[:, :-dx] + shift, out=best[:, dx:])
+        np.minimum(best[:, :-dx], column_sq[:, dx:] + shift, out=best[:, :-dx])
+
+    return np.minimum(np.sqrt(best), max_distance)
+
+
+def build_signed_distance(occupancy, max_distance=DEFAULT_MAX_DISTANCE):
+    """
+    Campo com sinal a partir da grade de ocupação (True = água).
+    Fora da grade conta como rocha.
+    """
+    free = np.pad(occupancy, 1, constant_values=False)
+    to_rock = _distance_to(~free, max_distance)
+    to_water = _distance_to(free, max_distance)
+    signed = np.where(free, to_rock - 0.5, 0.5 - to_water)
+    return signed[1:-1, 1:-1].astype(np.float32)
+
+
+class DistanceField:
+    """SDF das paredes com gradiente pré-calculado e consultas O(1) por ponto."""
+    __slots__ = ('distance', 'grad_x', 'grad_y', 'max_distance', 'width', 'height')
+
+    def __init__(self, distance, max_distance=DEFAULT_MAX_DISTANCE):
+        self.distance = distance
+        self.max_distance = max_distance
+        self.height, self.width = distance.shape
+        grad_y, grad_x = np.gradient(distance)
+        self.grad_x = grad_x.astype(np.float32)
+        self.grad_y = grad_y.astype(np.float32)
+
+    def _cell(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return int(y), int(x)
+        return None
+
+    def distance_at(self, x, y):
+        """Distância com sinal até a parede mais próxima (negativa dentro da rocha)."""
+        cell = self._cell(x, y)
+        if cell is None:
+            return -float(self.max_distance)
+        return float(self.distance[cell])
+
+    def normal_at(self, x, y):
+        """Normal unitária da parede mais próxima, apontando para a água (ou (0, 0))."""
+        cell = self._cell(x, y)
+        if cell is None:
+            return 0.0, 0.0
+        gx = float(self.grad_x[cell])
+        gy = float(self.grad_y[cell])
+        length = (gx * gx + gy * gy) ** 0.5
+        if length == 0:
+            return 0.0, 0.0
+        return gx / length, gy / length
+
+    def fits(self, x, y, radius=0.0):
+        """True se um casco circular de raio `radius` cabe em (x, y)."""
+        return self.distance_at(x, y) >= radius
+
+    def slide(self, x, y, dx, dy, radius=0.0):
+        """
+        Move (x, y) por (dx, dy) deslizando ao longo da parede: se o
+        destino invade o raio do casco, a componente do movimento contra a
+        parede é removida e o ponto é empurrado para fora pela normal.
+        Retorna a nova posição (igual à antiga se não houver saída).
+        """
+        new_x = x + dx
+        new_y = y + dy
+        gap = self.distance_at(new_x, new_y) - radius
+        if gap >= 0:
+            return new_x, new_y
+
+        nx, ny = self.normal_at(new_x, new_y)
+        into_wall = dx * nx + dy * ny
+        if into_wall < 0:
+            new_x -= nx * into_wall
+            new_y -= ny * into_wall
+        gap = self.distance_at(new_x, new_y) - radius
+        if gap < 0:
+            nx, ny = self.normal_at(new_x, new_y)
+            new_x -= nx * gap
+            new_y -= ny * gap
+
+        if self.fits(new_x, new_y, radius):
+            return new_x, new_y
+        return x, y
+
+    def clamp_motion(self, x, y, dx, dy, radius=0.0):
+        """
+        Avança de (x, y) na direção (dx, dy) o máximo possível sem que o
+        casco encoste na parede (sphere tracing pelo campo). Usado para
+        limitar empurrões.
+        """
+        length = (dx * dx + dy * dy) ** 0.5
+        if length == 0 or not self.fits(x, y, radius):
+            return x, y
+
+        ux = dx / length
+        uy = dy / length
+        travelled = 0.0
+        while travelled < length:
+            step = self.distance_at(x + ux * travelled, y + uy * travelled) - radius
+            if step < 0.5:
+                break
+            travelled = min(length, travelled + step)
+
+        while travelled > 0 and not self.fits(x + ux * travelled, y + uy * travelled, radius):
+            travelled = max(0.0, travelled - 0.5)
+        return x + ux * travelled, y + uy * travelled
+
+
+def load_distance_field(level_key, occupancy, max_distance=DEFAULT_MAX_DISTANCE):
+    """
+    SDF do nível, lido do cache em disco quando existe para o mesmo nível
+    (`level_key`, a chave de conteúdo do Level); senão é calculado e
+    gravado.
+    """
+    height, width = occupancy.shape
+    key = level_cache.content_hash('sdf', 2, level_key, width, height, max_distance)
+    path = level_cache.cache_path('sdf', key, 'npy')
+
+    distance = None
+    if os.path.exists(path):
+        try:
+            distance = np.load(path)
+        except (OSError, ValueError):
+            distance = None
+        if distance is not None and distance.shape != occupancy.shape:
+            distance = None
+
+    if distance is None:
+        distance = build_signed_distance(occupancy, max_distance)
+        tmp_path = path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.save(f, distance)
+            level_cache.replace_file(tmp_path, path)
+        except OSError:
+            pass
+
+    return DistanceField(distance, max_distance)
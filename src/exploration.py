@@ -0,0 +1,120 @@
+"""
+Módulo de Exploração
+Névoa do minimapa: uma máscara, na resolução da camada de zonas do
+minimapa, das células que o submarino já viu com a lanterna ou alcançou
+com o sonar.
+
+A cada quadro só as células novas dentro da caixa do cone ou do disco do
+sonar são marcadas. A textura do minimapa sai da camada de zonas por uma
+paleta (cor original de cada pixel, versão escondida e versão
+explorada) e só os pixels que mudaram são reescritos. Para salvar, a
+máscara vira bits empacotados (np.packbits), um oitavo do tamanho; o
+jogo ainda não tem sistema de save, então to_bytes/from_bytes são só o
+formato que um save deve guardar.
+"""
+import numpy as np
+import pygame
+
+from flashlight import get_cone_spans
+from primitives import disk_spans
+
+FOG_COLOR = (0, 0, 0)
+
+
+class ExplorationMask:
+    """Máscara de exploração de um nível sobre a camada de zonas `layer` do minimapa."""
+    __slots__ = ('map_width', 'map_height', 'cols', 'rows', 'scale_x', 'scale_y',
+                 'explored', 'surface', '_classes', '_palette', '_dirty', '_last_cone')
+
+    def __init__(self, layer, map_width, map_height, explored=None):
+        self.map_width = map_width
+        self.map_height = map_height
+        self.cols, self.rows = layer.get_size()
+        # A camada tem (largura + 1) x (altura + 1) pixels, com a borda inclusiva.
+        self.scale_x = (self.cols - 1) / map_width
+        self.scale_y = (self.rows - 1) / map_height
+
+        colors = pygame.surfarray.array3d(layer).reshape(-1, 3)
+        palette, classes = np.unique(colors, axis=0, return_inverse=True)
+        self._classes = classes.reshape(self.cols, self.rows)
+        fog = np.broadcast_to(np.asarray(FOG_COLOR, dtype=palette.dtype), palette.shape)
+        # índice = classe + explorado * len(palette)
+        self._palette = np.concatenate((fog, palette))
+
+        if explored is None:
+            explored = np.zeros((self.cols, self.rows), dtype=bool)
+            explored[[0, -1], :] = True
+            explored[:, [0, -1]] = True
+        self.explored = explored
+        self.surface = pygame.Surface((self.cols, self.rows))
+        pixels = pygame.surfarray.pixels3d(self.surface)
+        pixels[...] = self._palette[self._classes + self.explored * len(palette)]
+        del pixels
+        self._dirty = []
+        self._last_cone = None
+
+    def _to_cells(self, xs, ys):
+        return np.asarray(xs, dtype=np.float64) * self.scale_x, np.asarray(ys, dtype=np.float64) * self.scale_y
+
+    def _mark(self, cols, rows):
+        """Marca as células (cols, rows) e guarda as que eram novas."""
+        new = ~self.explored[cols, rows]
+        if new.any():
+            cols, rows = cols[new], rows[new]
+            self.explored[cols, rows] = True
+            self._dirty.append((cols, rows))
+
+    def _mark_spans(self, rows, x_start, x_end):
+        keep = (x_start <= x_end) & (rows >= 0) & (rows < self.rows)
+        rows, x_start, x_end = rows[keep], np.maximum(x_start[keep], 0), np.minimum(x_end[keep], self.cols - 1)
+        if len(rows) == 0:
+            return
+        lengths = x_end - x_start + 1
+        cols = np.repeat(x_start - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        self._mark(cols, np.repeat(rows, lengths))
+
+    def reveal_polygon(self, points):
+        """Marca as células dentro do polígono (coordenadas de mundo), como o cone da lanterna."""
+        points = np.asarray(points, dtype=np.float64)
+        xs, ys = self._to_cells(points[:, 0], points[:, 1])
+        cells = np.stack((xs, ys), axis=1)
+        key = cells.astype(np.int64).tobytes()
+        if key == self._last_cone:
+            return
+        self._last_cone = key
+        self._mark_spans(*get_cone_spans(cells, self.cols, self.rows))
+
+    def reveal_disk(self, x, y, radius):
+        """Marca o disco de raio `radius` (mundo) em (x, y), como uma onda do sonar."""
+        cx, cy = self._to_cells(x, y)
+        radius = int(radius * min(self.scale_x, self.scale_y))
+        dy, half_widths = disk_spans(radius)
+        rows = (cy + dy).astype(np.int64)
+        self._mark_spans(rows, (cx - half_widths).astype(np.int64), (cx + half_widths).astype(np.int64))
+
+    def reveal_sonar(self, sonar, base_radius=50):
+        """Marca o alcance atual de cada onda do sonar (como em draw_sonar)."""
+        for wave in sonar['waves']:
+            self.reveal_disk(wave['x'], wave['y'], base_radius * wave['scale'])
+
+    def refresh(self):
+        """Atualiza na textura só os pixels marcados desde a última chamada; retorna a textura."""
+        if self._dirty:
+            cols = np.concatenate([c for c, _ in self._dirty])
+            rows = np.concatenate([r for _, r in self._dirty])
+            self._dirty.clear()
+            pixels = pygame.surfarray.pixels3d(self.surface)
+            pixels[cols, rows] = self._palette[self._classes[cols, rows] + len(self._palette) // 2]
+            del pixels
+        return self.surface
+
+    def to_bytes(self):
+        """Máscara empacotada em bits, para salvar."""
+        return np.packbits(self.explored, axis=None).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data, layer, map_width, map_height):
+        """Máscara salva com to_bytes, sobre a mesma camada de zonas."""
+        cols, rows = layer.get_size()
+        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=cols * rows)
+        return cls(layer, map_width, map_height, bits.astype(bool).reshape(cols, rows))
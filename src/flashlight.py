@@ -3,8 +3,13 @@ Módulo de Lanterna do Submarino
 Sistema de iluminação com cone de luz usando Cohen-Sutherland para clipping.
 """
 import math
+from collections import OrderedDict
+
+import numpy as np
 import pygame
-from primitives import scanline_fill, drawPolygon, cohen_sutherland, DrawLineBresenham
+
+from primitives import drawPolygon, cohen_sutherland, DrawLineBresenham
+from visibility import visibility_polygon
 
 
 def get_flashlight_cone(sub_x, sub_y, angle, length=230, spread=30):
@@ -37,6 +42,24 @@ def get_flashlight_cone(sub_x, sub_y, angle, length=230, spread=30):
     return [(origin_x, origin_y), (left_x, left_y), (right_x, right_y)]
 
 
+def get_occluded_cone(walls, sub_x, sub_y, angle, length=230, spread=30):
+    """
+    Cone da lanterna recortado pelas paredes: o polígono de visibilidade
+    a partir de (sub_x, sub_y) contra o índice de paredes `walls`.
+
+    Returns:
+        Array (n, 2) com o vértice e as pontas dos raios, em coordenadas
+        de mundo; serve onde o triângulo de get_flashlight_cone servia.
+    """
+    return visibility_polygon(walls, sub_x, sub_y, angle, length, spread)
+
+
+def is_unoccluded(cone_points, length=230):
+    """Se nenhum raio do cone de get_occluded_cone parou numa parede."""
+    reach = np.hypot(*(np.asarray(cone_points[1:]) - cone_points[0]).T)
+    return bool(np.all(reach >= length - 1e-9))
+
+
 def get_flashlight_window(cone_points):
     """
     Retorna a bounding box do cone para uso com Cohen-Sutherland.
@@ -49,60 +72,82 @@ def get_flashlight_window(cone_points):
     return (min(xs), min(ys), max(xs), max(ys))
 
 
-def apply_darkness_overlay(screen, cone_points, width, height, darkness_alpha=230):
+# Máscaras de cone pré-rasterizadas, por chave (tipo, ângulo quantizado,
+# comprimento, abertura, ...) -> (superfície, dx, dy), em LRU limitado
+# por CONE_MASK_BUDGET bytes.
+CONE_ANGLE_STEP = 1
+CONE_MASK_BUDGET = 16 * 1024 * 1024
+_cone_masks = OrderedDict()
+_cone_mask_bytes = 0
+
+
+def quantize_angle(angle):
+    """Ângulo (graus) arredondado para o passo das máscaras, em [0, 360)."""
+    return round(angle / CONE_ANGLE_STEP) * CONE_ANGLE_STEP % 360
+
+
+def get_cached_mask(key, build):
     """
-    Aplica uma camada de escuridão na tela, deixando apenas o cone visível.
-    Usa setPixel para preencher o cone com transparência.
-    
-    Args:
-        screen: Surface do pygame
-        cone_points: 3 pontos do triângulo de luz
-        width, height: Dimensões da tela
-        darkness_alpha: Opacidade da escuridão (0-255)
+    Máscara de `key` no cache compartilhado, criada por build() na
+    primeira vez; build retorna (superfície, dx, dy), com (dx, dy) o
+    canto da superfície relativo ao vértice do cone.
     """
-    darkness = pygame.Surface((width, height), pygame.SRCALPHA)
-    darkness.fill((0, 0, 0, darkness_alpha))
-    
-    cone_int = [(int(p[0]), int(p[1])) for p in cone_points]
-    
-    points = cone_int
-    ys = [p[1] for p in points]
-    y_min = max(0, int(min(ys)))
-    y_max = min(height, int(max(ys)))
-    
-    n = len(points)
-    transparent = (0, 0, 0, 0)
-    
-    for y in range(y_min, y_max):
-        intersections_x = []
-        
-        for i in range(n):
-            x0, y0 = points[i]
-            x1, y1 = points[(i + 1) % n]
-            
-            if y0 == y1:
-                continue
-            
-            if y0 > y1:
-                x0, y0, x1, y1 = x1, y1, x0, y0
-            
-            if y < y0 or y >= y1:
-                continue
-            
-            x = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
-            intersections_x.append(x)
-        
-        intersections_x.sort()
-        
-        for i in range(0, len(intersections_x), 2):
-            if i + 1 < len(intersections_x):
-                x_start = max(0, int(round(intersections_x[i])))
-                x_end = min(width - 1, int(round(intersections_x[i + 1])))
-                
-                for x in range(x_start, x_end + 1):
-                    darkness.set_at((x, y), transparent)
-    
-    screen.blit(darkness, (0, 0))
+    global _cone_mask_bytes
+    entry = _cone_masks.get(key)
+    if entry is not None:
+        _cone_masks.move_to_end(key)
+        return entry
+
+    entry = build()
+    surface = entry[0]
+    _cone_masks[key] = entry
+    _cone_mask_bytes += surface.get_width() * surface.get_height() * surface.get_bytesize()
+    while _cone_mask_bytes > CONE_MASK_BUDGET and len(_cone_masks) > 1:
+        evicted = _cone_masks.popitem(last=False)[1][0]
+        _cone_mask_bytes -= evicted.get_width() * evicted.get_height() * evicted.get_bytesize()
+    return entry
+
+
+def get_cone_spans(points, width, height):
+    """
+    Spans do polígono em cada linha da tela, com a mesma regra do
+    scanline original (vértices truncados, linhas [y_min, y_max),
+    pontas arredondadas).
+
+    Returns:
+        (linhas, x_inicio, x_fim), arrays com x_fim inclusivo; um span
+        pode ficar vazio (x_inicio > x_fim) depois do recorte na tela.
+    """
+    pts = np.array([(int(p[0]), int(p[1])) for p in points], dtype=np.float64)
+    y_min = max(0, int(pts[:, 1].min()))
+    y_max = min(height, int(pts[:, 1].max()))
+    empty = np.empty(0, dtype=np.int64)
+    if y_min >= y_max:
+        return empty, empty, empty
+
+    x0, y0 = pts[:, 0], pts[:, 1]
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+    keep = y0 != y1
+    x0, y0, x1, y1 = x0[keep], y0[keep], x1[keep], y1[keep]
+    flip = y0 > y1
+    x0, x1 = np.where(flip, x1, x0), np.where(flip, x0, x1)
+    y0, y1 = np.where(flip, y1, y0), np.where(flip, y0, y1)
+
+    rows = np.arange(y_min, y_max)[:, None]
+    crosses = (rows >= y0) & (rows < y1)
+    xs = np.where(crosses, x0 + (rows - y0) * (x1 - x0) / (y1 - y0), np.inf)
+    xs.sort(axis=1)
+
+    counts = crosses.sum(axis=1)
+    pairs = xs.shape[1] // 2
+    row_index = np.repeat(rows[:, 0], pairs)
+    left = xs[:, 0:2 * pairs:2].ravel()
+    right = xs[:, 1:2 * pairs:2].ravel()
+    valid = (np.arange(pairs) * 2 + 1 < counts[:, None]).ravel()
+
+    x_start = np.maximum(0, np.rint(left[valid])).astype(np.int64)
+    x_end = np.minimum(width - 1, np.rint(right[valid])).astype(np.int64)
+    return row_index[valid], x_start, x_end
 
 
 def draw_flashlight_border(screen, cone_points, color=(100, 150, 200)):
@@ -0,0 +1,36 @@
+"""
+Módulo de Cache de Nível
+Arquivos pré-calculados de um nível (campo de distância, mapa renderizado)
+guardados em disco e identificados por um hash do conteúdo que os gera.
+"""
+import hashlib
+import os
+
+# Pasta cache/ na raiz do projeto (pai de src/), ignorada pelo git.
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache')
+
+
+def content_hash(*parts):
+    """
+    Hash estável do conteúdo que gera um arquivo em cache. Aceita bytes
+    ou qualquer valor com repr determinístico (chaves de nível,
+    números, strings).
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        if not isinstance(part, (bytes, bytearray)):
+            part = repr(part).encode('utf-8')
+        digest.update(len(part).to_bytes(8, 'little'))
+        digest.update(part)
+    return digest.hexdigest()[:16]
+
+
+def cache_path(name, key, extension):
+    """Caminho do arquivo `name` para a chave `key`, criando a pasta do cache."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, f"{name}-{key}.{extension}")
+
+
+def replace_file(tmp_path, path):
+    """Troca atômica: leitores nunca veem um arquivo de cache pela metade."""
+    os.replace(tmp_path, path)
@@ -0,0 +1,246 @@
+"""
+Módulo de Formato de Nível
+Leitura dos arquivos de nível (.lvl): zonas da caverna, fileiras de
+espinhos, regiões texturizadas e posições iniciais das entidades.
+
+O arquivo é texto, uma instrução por linha:
+
+    size <largura> <altura>
+    spawn <x> <y>
+    zone <r> <g> <b> <x0> <y0> <x1> <y1> ...
+    spikes <x0> <y0> <x1> <y1> <lado> <tamanho> <espacamento> <r> <g> <b>
+    texture <arquivo> <escala_uv> <x0> <y0> <x1> <y1> ...
+    entity <tipo> <x> <y> <escala>
+
+Linhas vazias e comentários (#) são ignorados. As camadas são desenhadas
+na ordem do arquivo.
+
+O leitor percorre as linhas uma única vez e já empilha os vértices em
+buffers contíguos (array.array, depois NumPy), com um índice de offsets
+por polígono, caixas envolventes, triângulos dos espinhos e UVs das
+texturas, sem criar uma lista Python por polígono.
+"""
+import hashlib
+import math
+from array import array
+
+import numpy as np
+
+LAYER_ZONE = 0
+LAYER_SPIKES = 1
+LAYER_TEXTURE = 2
+
+
+class LevelFormatError(ValueError):
+    """Linha inválida num arquivo de nível."""
+
+
+def _number(token):
+    return float(token) if '.' in token or 'e' in token.lower() else int(token)
+
+
+def _offsets(counts):
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.frombuffer(counts, dtype=np.int64))
+    return offsets
+
+
+def _vertices(coords):
+    return np.frombuffer(coords, dtype=np.float64).reshape(-1, 2)
+
+
+def _bboxes(vertices, offsets):
+    """(xmin, ymin, xmax, ymax) de cada polígono, com reduceat sobre o buffer."""
+    if len(offsets) < 2:
+        return np.empty((0, 4))
+    starts = offsets[:-1]
+    mins = np.minimum.reduceat(vertices, starts, axis=0)
+    maxs = np.maximum.reduceat(vertices, starts, axis=0)
+    return np.hstack((mins, maxs))
+
+
+def spike_triangles(x0, y0, x1, y1, lado, tamanho, espacamento):
+    """
+    Triângulos (n, 3, 2) dos espinhos ao longo do segmento (x0, y0)-(x1, y1):
+    base centrada em cada passo de `espacamento`, ponta a `tamanho` pixels
+    do lado `lado` (+1 ou -1) da normal.
+    """
+    dx = x1 - x0
+    dy = y1 - y0
+    comprimento = math.hypot(dx, dy)
+    if comprimento == 0:
+        return np.empty((0, 3, 2))
+
+    ux = dx / comprimento
+    uy = dy / comprimento
+    nx = -uy * lado
+    ny = ux * lado
+
+    i = np.arange(int(comprimento // espacamento), dtype=np.float64)
+    px = x0 + ux * i * espacamento
+    py = y0 + uy * i * espacamento
+
+    triangles = np.empty((len(i), 3, 2))
+    triangles[:, 0, 0] = px - ux * espacamento / 2
+    triangles[:, 0, 1] = py - uy * espacamento / 2
+    triangles[:, 1, 0] = px + ux * espacamento / 2
+    triangles[:, 1, 1] = py + uy * espacamento / 2
+    triangles[:, 2, 0] = px + nx * tamanho
+    triangles[:, 2, 1] = py + ny * tamanho
+    return triangles
+
+
+class Level:
+    """
+    Nível carregado. Zonas e regiões texturizadas ficam em buffers (N, 2)
+    com offsets por polígono; `layers` é a ordem de desenho como pares
+    (tipo de camada, índice).
+    """
+
+    def __init__(self, width, height, spawn, zone_vertices, zone_offsets, zone_colors,
+                 spikes, spike_colors, texture_vertices, texture_offsets, texture_files,
+                 texture_scales, layers, entities, key):
+        self.width = width
+        self.height = height
+        self.spawn = spawn
+        self.zone_vertices = zone_vertices
+        self.zone_offsets = zone_offsets
+        self.zone_colors = zone_colors
+        self.zone_bboxes = _bboxes(zone_vertices, zone_offsets)
+        self.spikes = spikes
+        self.spike_colors = spike_colors
+        self.texture_vertices = texture_vertices
+        self.texture_offsets = texture_offsets
+        self.texture_files = texture_files
+        self.texture_scales = texture_scales
+        self.layers = layers
+        self.entities = entities
+        self.key = key
+
+        self.spike_triangles = [spike_triangles(*params) for params in spikes.tolist()]
+
+        scales = np.repeat(texture_scales, np.diff(texture_offsets))[:, None]
+        self.texture_uvs = np.mod(texture_vertices / scales, 1)
+        self.texture_bboxes = _bboxes(texture_vertices, texture_offsets)
+        self.layer_bboxes = self._layer_bboxes()
+
+    def _layer_bboxes(self):
+        """Caixa envolvente (xmin, ymin, xmax, ymax) de cada camada, na ordem de desenho."""
+        boxes = np.empty((len(self.layers), 4))
+        for n, (kind, i) in enumerate(self.layers):
+            if kind == LAYER_ZONE:
+                boxes[n] = self.zone_bboxes[i]
+            elif kind == LAYER_TEXTURE:
+                boxes[n] = self.texture_bboxes[i]
+            else:
+                points = self.spike_triangles[i].reshape(-1, 2)
+                if len(points):
+                    boxes[n, :2] = points.min(axis=0)
+                    boxes[n, 2:] = points.max(axis=0)
+                else:
+                    boxes[n] = (np.inf, np.inf, -np.inf, -np.inf)
+        return boxes
+
+    @property
+    def zone_count(self):
+        return len(self.zone_offsets) - 1
+
+    def zone_array(self, i):
+        """Vértices da zona i como view (n, 2) do buffer."""
+        return self.zone_vertices[self.zone_offsets[i]:self.zone_offsets[i + 1]]
+
+    def zone(self, i):
+        """Vértices da zona i como lista de tuplas (x, y)."""
+        return [tuple(p) for p in self.zone_array(i).tolist()]
+
+    def zones(self):
+        return [self.zone(i) for i in range(self.zone_count)]
+
+    def texture_region(self, i):
+        """(pontos, uvs, arquivo da textura) da região texturizada i."""
+        start, end = self.texture_offsets[i], self.texture_offsets[i + 1]
+        points = [tuple(p) for p in self.texture_vertices[start:end].tolist()]
+        uvs = [tuple(p) for p in self.texture_uvs[start:end].tolist()]
+        return points, uvs, self.texture_files[i]
+
+    def spawns(self, kind):
+        """Posições iniciais (x, y, escala) das entidades do tipo `kind`, na ordem do arquivo."""
+        return [(x, y, scale) for entity_kind, x, y, scale in self.entities if entity_kind == kind]
+
+
+def parse_level(lines):
+    """
+    Lê um nível de qualquer iterável de linhas (arquivo aberto, lista),
+    numa única passada.
+    """
+    digest = hashlib.sha1()
+    width = height = None
+    spawn = None
+    zone_coords, zone_counts, zone_colors = array('d'), array('q'), array('B')
+    spikes, spike_colors = array('d'), array('B')
+    texture_coords, texture_counts, texture_scales = array('d'), array('q'), array('d')
+    texture_files = []
+    layers = []
+    entities = []
+
+    for line_number, line in enumerate(lines, 1):
+        digest.update(line.encode('utf-8'))
+        tokens = line.split('#', 1)[0].split()
+        if not tokens:
+            continue
+        command, args = tokens[0], tokens[1:]
+
+        try:
+            if command == 'size':
+                width, height = int(args[0]), int(args[1])
+            elif command == 'spawn':
+                spawn = (_number(args[0]), _number(args[1]))
+            elif command == 'zone':
+                coords = args[3:]
+                if len(coords) < 6 or len(coords) % 2:
+                    raise LevelFormatError("zona precisa de pelo menos 3 pontos (x, y)")
+                layers.append((LAYER_ZONE, len(zone_counts)))
+                zone_colors.extend(int(c) for c in args[:3])
+                zone_coords.extend(float(c) for c in coords)
+                zone_counts.append(len(coords) // 2)
+            elif command == 'spikes':
+                if len(args) != 10:
+                    raise LevelFormatError("spikes espera 10 valores")
+                layers.append((LAYER_SPIKES, len(spikes) // 7))
+                spikes.extend(float(v) for v in args[:7])
+                spike_colors.extend(int(c) for c in args[7:])
+            elif command == 'texture':
+                coords = args[2:]
+                if len(coords) < 6 or len(coords) % 2:
+                    raise LevelFormatError("textura precisa de pelo menos 3 pontos (x, y)")
+                layers.append((LAYER_TEXTURE, len(texture_counts)))
+                texture_files.append(args[0])
+                texture_scales.append(float(args[1]))
+                texture_coords.extend(float(c) for c in coords)
+                texture_counts.append(len(coords) // 2)
+            elif command == 'entity':
+                entities.append((args[0], _number(args[1]), _number(args[2]), _number(args[3])))
+            else:
+                raise LevelFormatError(f"instrução desconhecida '{command}'")
+        except (IndexError, ValueError) as error:
+            raise LevelFormatError(f"linha {line_number}: {error}") from error
+
+    if width is None or spawn is None:
+        raise LevelFormatError("nível sem 'size' ou 'spawn'")
+
+    return Level(
+        width, height, spawn,
+        _vertices(zone_coords), _offsets(zone_counts),
+        np.frombuffer(zone_colors, dtype=np.uint8).reshape(-1, 3),
+        np.frombuffer(spikes, dtype=np.float64).reshape(-1, 7),
+        np.frombuffer(spike_colors, dtype=np.uint8).reshape(-1, 3),
+        _vertices(texture_coords), _offsets(texture_counts), texture_files,
+        np.frombuffer(texture_scales, dtype=np.float64),
+        layers, entities, digest.hexdigest()[:16],
+    )
+
+
+def load_level(path):
+    """Lê o arquivo de nível `path` linha a linha."""
+    with open(path, encoding='utf-8') as f:
+        return parse_level(f)
@@ -0,0 +1,163 @@
+"""
+Módulo de Iluminação
+Mapa de luz em baixa resolução: as luzes de um quadro se acumulam num
+buffer de 1/`scale` da tela, que é ampliado e multiplicado sobre o
+quadro no lugar da camada de escuridão.
+
+O buffer é uma superfície RGB pequena, acessada como array NumPy por
+surfarray.pixels3d para preencher polígonos (o cone da lanterna) por
+spans; sem parede na frente, o cone vem pronto de um cache de sprites
+por ângulo. Luzes pontuais são sprites do núcleo de atenuação, um por
+raio e cor quantizada. Sprites são somados com BLEND_ADD numa única
+chamada a blits. Tudo acontece na resolução do buffer: o custo de uma
+luz é a área dela em células, não em pixels da tela.
+"""
+import numpy as np
+import pygame
+
+from flashlight import get_cached_mask, get_cone_spans, quantize_angle
+from visibility import visibility_polygon
+
+DEFAULT_SCALE = 4
+# Luz ambiente: o mesmo que a escuridão de alfa 230 deixava passar.
+DEFAULT_AMBIENT = (25, 25, 25)
+# Passo de quantização das cores das luzes pontuais (define quantos
+# sprites diferentes existem por raio).
+COLOR_STEP = 16
+MAX_SPRITES = 256
+POLYGON_SUPERSAMPLE = 2
+
+
+def _point_kernel(radius):
+    """Atenuação (1 - d/r)² num quadrado (2r+1)², em células do buffer."""
+    offsets = np.arange(-radius, radius + 1)
+    distance = np.hypot(offsets[:, None], offsets[None, :])
+    return np.clip(1 - distance / radius, 0, None) ** 2
+
+
+class LightMap:
+    """Buffer de luz em baixa resolução, com a luz ambiente de fundo."""
+    __slots__ = ('width', 'height', 'scale', 'rows', 'cols', 'ambient',
+                 '_small', '_full', '_sprites', '_blits')
+
+    def __init__(self, width, height, scale=DEFAULT_SCALE, ambient=DEFAULT_AMBIENT):
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.rows = -(-height // scale)
+        self.cols = -(-width // scale)
+        self.ambient = tuple(ambient)
+        self._small = pygame.Surface((self.cols, self.rows))
+        self._full = pygame.Surface((width, height))
+        # (raio em células, cor quantizada) -> sprite do núcleo
+        self._sprites = {}
+        self._blits = []
+        self.clear()
+
+    def clear(self):
+        """Começa um quadro novo, só com a luz ambiente."""
+        self._small.fill(self.ambient)
+        self._blits.clear()
+
+    def _sprite(self, radius, color):
+        key = (radius, color)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            if len(self._sprites) >= MAX_SPRITES:
+                self._sprites.clear()
+            light = _point_kernel(radius)[:, :, None] * np.asarray(color, dtype=np.float64)
+            sprite = pygame.surfarray.make_surface(np.rint(light).astype(np.uint8).transpose(1, 0, 2))
+            self._sprites[key] = sprite
+        return sprite
+
+    def add_points(self, xs, ys, radius, colors, intensity=1.0):
+        """
+        Luzes pontuais em (xs, ys) (pixels de tela) com alcance `radius`;
+        `colors` é uma cor (r, g, b) ou uma por luz.
+        """
+        radius = max(1, int(round(radius / self.scale)))
+        cols = np.floor(np.asarray(xs, dtype=np.float64) / self.scale).astype(np.int64) - radius
+        rows = np.floor(np.asarray(ys, dtype=np.float64) / self.scale).astype(np.int64) - radius
+        near = ((cols > -2 * radius - 1) & (cols < self.cols) &
+                (rows > -2 * radius - 1) & (rows < self.rows))
+        if not near.any():
+            return
+        colors = np.broadcast_to(np.asarray(colors, dtype=np.float64) * intensity, (len(cols), 3))[near]
+        colors = np.clip(np.rint(colors / COLOR_STEP) * COLOR_STEP, 0, 255).astype(np.int64)
+
+        for col, row, color in zip(cols[near].tolist(), rows[near].tolist(), map(tuple, colors.tolist())):
+            self._blits.append((self._sprite(radius, color), (col, row), None, pygame.BLEND_ADD))
+
+    def add_point(self, x, y, radius, color, intensity=1.0):
+        self.add_points((x,), (y,), radius, color, intensity)
+
+    def _coverage(self, points):
+        """
+        Cobertura (0..1) do polígono (pixels de tela) em cada célula,
+        amostrada em POLYGON_SUPERSAMPLE² subcélulas para suavizar a borda.
+        Retorna (coluna, linha, cobertura (colunas, linhas)) do canto da
+        caixa do polígono, ou None se ele não cobre nenhuma célula.
+        """
+        factor = POLYGON_SUPERSAMPLE
+        cells = np.asarray(points, dtype=np.float64) * (factor / self.scale)
+        rows, x_start, x_end = get_cone_spans(cells, self.cols * factor, self.rows * factor)
+        spans = x_start <= x_end
+        if not spans.any():
+            return None
+        rows, x_start, x_end = rows[spans], x_start[spans], x_end[spans]
+        c0 = int(x_start.min()) // factor * factor
+        c1 = -(-(int(x_end.max()) + 1) // factor) * factor
+        r0 = int(rows[0]) // factor * factor
+        r1 = -(-(int(rows[-1]) + 1) // factor) * factor
+        # Uma linha pode ter mais de um span (polígono côncavo): cada span
+        # vira suas células (linha, coluna), sem atribuição com índice repetido.
+        lengths = x_end - x_start + 1
+        cols = np.repeat(x_start - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        inside = np.zeros((r1 - r0, c1 - c0), dtype=bool)
+        inside[np.repeat(rows - r0, lengths), cols - c0] = True
+        coverage = inside.reshape((r1 - r0) // factor, factor, (c1 - c0) // factor, factor).mean(axis=(1, 3))
+        return c0 // factor, r0 // factor, coverage.T
+
+    def add_polygon(self, points, color, intensity=1.0):
+        """Soma luz uniforme dentro do polígono (pixels de tela)."""
+        covered = self._coverage(points)
+        if covered is None:
+            return
+        col, row, coverage = covered
+        lit = coverage > 0
+        light = np.asarray(color, dtype=np.float64) * intensity
+        buffer = pygame.surfarray.pixels3d(self._small)
+        region = buffer[col:col + coverage.shape[0], row:row + coverage.shape[1]]
+        added = np.rint(coverage[lit][:, None] * light).astype(np.int16)
+        region[lit] = np.minimum(region[lit] + added, 255)
+        del buffer, region
+
+    def _build_cone(self, x, y, angle, length, spread, color):
+        covered = self._coverage(visibility_polygon(None, x, y, angle, length, spread))
+        if covered is None:
+            return pygame.Surface((1, 1)), 0, 0
+        col, row, coverage = covered
+        light = np.rint(coverage[:, :, None] * np.asarray(color, dtype=np.float64)).astype(np.uint8)
+        return pygame.surfarray.make_surface(light), col, row
+
+    def add_cone(self, x, y, angle, color, intensity=1.0, length=230, spread=30):
+        """
+        O mesmo que add_polygon com o cone sem paredes de vértice (x, y),
+        mas a partir de um sprite pré-rasterizado por ângulo quantizado
+        (flashlight.get_cached_mask), somado com um blit BLEND_ADD.
+        """
+        x, y = int(x), int(y)
+        angle = quantize_angle(angle)
+        color = tuple(int(round(c * intensity)) for c in color)
+        sprite, col, row = get_cached_mask(
+            ('light', self.scale, x, y, angle, length, spread, color),
+            lambda: self._build_cone(x, y, angle, length, spread, color))
+        self._blits.append((sprite, (col, row), None, pygame.BLEND_ADD))
+
+    def apply(self, screen):
+        """Soma as luzes pontuais, amplia o buffer para a tela e multiplica o quadro por ele."""
+        if self._blits:
+            self._small.blits(self._blits, doreturn=False)
+            self._blits.clear()
+        pygame.transform.smoothscale(self._small, (self.width, self.height), self._full)
+        screen.blit(self._full, (0, 0), special_flags=pygame.BLEND_MULT)
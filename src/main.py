@@ -6,6 +6,7 @@ import primitives
 from primitives import drawCircle
 from collision import circle_collision
 import time
+import numpy as np
 
 from characters.submarine import (
     apply_damage,
@@ -22,10 +23,8 @@ from characters.submarine import (
     draw_depth
 )
 
-from characters.jellyfish import (
-    create_jellyfish,
-    update_jellyfish,
-    draw_jellyfish_bioluminescent
+from characters.jellyfish_swarm import (
+    JellyfishSwarm
 )
 
 from characters.tentacles import (
@@ -45,7 +44,9 @@ from characters.research_capsule import (
     update_research_capsule,
     draw_research_capsule,
     check_capsule_collision,
-    collect_capsule
+    collect_capsule,
+    get_capsule_light,
+    CAPSULE_GLOW
 )
 
 from characters.explosion import (
@@ -59,7 +60,11 @@ import menu
 import map
 from map import get_spawn_position, is_point_in_map, get_all_map_zones
 import minimap
+import world_tiles
 import flashlight
+import lighting
+from exploration import ExplorationMask
+import timing
 
 OCEAN_DEEP = (15, 40, 70)
 SUBMARINE_BODY = (80, 90, 100)
@@ -71,6 +76,8 @@ SONAR_COLOR = (0, 255, 200)
 BOMB_BODY = (90, 90, 100)
 BOMB_SPIKE = (70, 70, 80)
 BOMB_HIGHLIGHT = (200, 200, 200)
+FLASHLIGHT_COLOR = (255, 255, 255)
+JELLYFISH_GLOW_RADIUS = 70
 
 WIDTH = 1280
 HEIGHT = 720
@@ -93,6 +100,19 @@ impact_sound.set_volume(0.3)
 
 SHOW_FPS = True
 
+# Simulação em passo fixo: o jogo avança em passos de SIM_STEP_MS, o
+# ritmo em que os contadores em quadros (bateria, recarga de dano, sonar)
+# foram calibrados, e a tela é desenhada tantas vezes quanto a máquina
+# aguentar, até MAX_RENDER_FPS, com o submarino interpolado entre os dois
+# últimos passos.
+SIM_STEP_MS = 1000 / 60
+MAX_SIM_STEPS = 5
+MAX_SKIPPED_FRAMES = 2
+MAX_FRAME_MS = 250
+MAX_RENDER_FPS = 120
+sim_accumulator = 0.0
+skipped_frames = 0
+
 title_font = pygame.font.Font(None, 64)
 button_font = pygame.font.Font(None, 36)
 
@@ -114,11 +134,14 @@ menu_time = 0
 sub_x = WIDTH // 2
 sub_y = HEIGHT // 2
 sub_angle = 0
+# Pose do submarino no passo anterior, para interpolar o desenho.
+prev_sub_x, prev_sub_y, prev_sub_angle = sub_x, sub_y, sub_angle
 sub_speed = 3
 rotation_speed = 4
 propeller_angle = 0
 propeller_speed = 15
 SUB_SCALE = 0.5
+SUB_HULL_RADIUS = 10
 
 
 damage_cooldown = 0
@@ -127,23 +150,34 @@ damage_flash = 0
 
 camera_x = 0
 camera_y = 0
+# Tremor da câmera só no desenho: gerador próprio (semeado do random), para
+# que o número de quadros desenhados não mude a sequência da simulação.
+shake_rng = random.Random(random.getrandbits(32))
 
 bubbles = []
 bubble_timer = 0
 MAX_BUBBLES = 120
 
-jellyfishes = []
+jellyfishes = JellyfishSwarm.from_spawns([])
+# Modo cardume: completa o nível com águas-vivas em pontos alcançáveis
+# aleatórios até este total (0 = só as do nível).
+JELLYFISH_SWARM_SIZE = 0
 water_bombs = []
 explosions = []
 giant_tentacles = None
 sonar = None
+exploration = None
 battery = None
 research_capsules = [] 
-MAP_WIDTH = 2000
-MAP_HEIGHT = 1200
-map_surface = pygame.Surface((MAP_WIDTH, MAP_HEIGHT))
-map_surface.fill((0, 0, 0))
-map.drawMap(map_surface)
+MAP_WIDTH = map.MAP_WIDTH
+MAP_HEIGHT = map.MAP_HEIGHT
+baked_map = map.load_baked_map(include_surface=False)
+world_surface = world_tiles.TiledSurface(MAP_WIDTH, MAP_HEIGHT, map.draw_map_region)
+wall_field = map.get_distance_field()
+nav_grid = map.get_navigation()
+wall_index = map.get_wall_index()
+light_map = lighting.LightMap(WIDTH, HEIGHT)
+frame_timer = timing.get_frame_timer()
 
 BASE_POS = get_spawn_position()
 BASE_RADIUS = 90
@@ -282,6 +316,8 @@ def draw_bubble(surface, b):
     drawCircle(surface, int(b['x']), int(b['y']), b['radius'], color)
 
 while True:
+    frame_ms = min(clock.tick(MAX_RENDER_FPS), MAX_FRAME_MS)
+    frame_timer.start()
     mouse_x, mouse_y = pygame.mouse.get_pos()
 
     for event in pygame.event.get():
@@ -298,29 +334,32 @@ while True:
 
                     sub_x, sub_y = get_spawn_position()
                     sub_angle = 0
+                    prev_sub_x, prev_sub_y, prev_sub_angle = sub_x, sub_y, sub_angle
                     bubbles.clear()
                     mission_start_time = pygame.time.get_ticks()
 
-                    jellyfishes = [
-                        create_jellyfish(450, 780, 0.3),
-                        create_jellyfish(600, 700, 0.3),
-                        create_jellyfish(1250, 850, 0.3),
-                    ]
-
-                    water_bombs = [
-                        create_water_bomb(550, 750, 0.35),
-                        create_water_bomb(250, 200, 0.35),
-                        create_water_bomb(300, 700, 0.35),
-                    ]
-
-                    giant_tentacles = create_giant_tentacles(1100, 900, 0.5)
+                    level = map.get_level()
+                    jellyfish_spawns = level.spawns('jellyfish')
+                    for _ in range(JELLYFISH_SWARM_SIZE - len(jellyfish_spawns)):
+                        point = nav_grid.random_point()
+                        if point is None:
+                            # Nenhuma célula alcançável: fica só com as do nível.
+                            break
+                        jellyfish_spawns.append(point + (0.3,))
+                    # Gerador do cardume tirado do random: semear o random repete a partida.
+                    jellyfishes = JellyfishSwarm.from_spawns(jellyfish_spawns,
+                                                             np.random.default_rng(random.getrandbits(32)))
+
+                    water_bombs = [create_water_bomb(x, y, scale)
+                                   for x, y, scale in level.spawns('water_bomb')]
+
+                    giant_tentacles = create_giant_tentacles(*level.spawns('giant_tentacles')[0])
                     sonar = init_sonar()
+                    exploration = ExplorationMask(baked_map['minimap'], MAP_WIDTH, MAP_HEIGHT)
                     battery = submarine_battery()
                     
-                    research_capsules = [
-                        create_research_capsule(1750, 850, 0.4),
-                        create_research_capsule(450, 200, 0.4),
-                    ]
+                    research_capsules = [create_research_capsule(x, y, scale)
+                                         for x, y, scale in level.spawns('research_capsule')]
 
                 elif action == "INSTRUCOES":
                     game_state = GAME_STATE_INSTRUCTIONS
@@ -360,9 +399,157 @@ while True:
                     use_sonar_battery(battery)
                     sonar_sound.play()
 
+    frame_timer.mark('events')
+
+    sim_accumulator += frame_ms
+    sim_steps = 0
+    while sim_accumulator >= SIM_STEP_MS and sim_steps < MAX_SIM_STEPS:
+        sim_accumulator -= SIM_STEP_MS
+        sim_steps += 1
+
+        if game_state == GAME_STATE_MENU:
+            menu_time += 1
+            menu.update_menu(menu_time, mouse_x, mouse_y)
+
+        elif game_state == GAME_STATE_PLAYING:
+            prev_sub_x, prev_sub_y, prev_sub_angle = sub_x, sub_y, sub_angle
+
+            keys = pygame.key.get_pressed()
+            is_moving = False
+
+            current_speed = sub_speed
+            if giant_tentacles:
+                dx_tent = sub_x - giant_tentacles['x']
+                dy_tent = sub_y - giant_tentacles['y']
+                dist_tent = math.sqrt(dx_tent * dx_tent + dy_tent * dy_tent)
+                if dist_tent < 200:
+                    current_speed = sub_speed * 0.4
+
+            if keys[pygame.K_LEFT]:
+                sub_angle -= rotation_speed
+            if keys[pygame.K_RIGHT]:
+                sub_angle += rotation_speed
+            if keys[pygame.K_UP]:
+                rad = math.radians(sub_angle)
+                new_x, new_y = wall_field.slide(sub_x, sub_y,
+                                                math.cos(rad) * current_speed,
+                                                math.sin(rad) * current_speed,
+                                                SUB_HULL_RADIUS)
+                if (new_x, new_y) != (sub_x, sub_y):
+                    sub_x = new_x
+                    sub_y = new_y
+                    is_moving = True
+            if keys[pygame.K_DOWN]:
+                rad = math.radians(sub_angle)
+                new_x, new_y = wall_field.slide(sub_x, sub_y,
+                                                -math.cos(rad) * current_speed,
+                                                -math.sin(rad) * current_speed,
+                                                SUB_HULL_RADIUS)
+                if (new_x, new_y) != (sub_x, sub_y):
+                    sub_x = new_x
+                    sub_y = new_y
+                    is_moving = True
+
+            if is_moving:
+                propeller_angle += propeller_speed
+                bubble_timer += 1
+                if bubble_timer >= 8:
+                    bubble_timer = 0
+                    if len(bubbles) < MAX_BUBBLES:
+                        bx, by = get_bubble_spawn_position(sub_x, sub_y, sub_angle)
+                        bubbles.append(create_bubble(bx, by))
+            else:
+                propeller_angle += propeller_speed * 0.2
+
+            bubbles[:] = [b for b in bubbles if update_bubble(b)]
+
+            if damage_cooldown > 0:
+                damage_cooldown -= 1
+
+            # A simulação usa a vista sem tremor para decidir quem está ativo.
+            jellyfish_active = jellyfishes.in_view(sub_x - WIDTH // 2, sub_y - HEIGHT // 2, WIDTH, HEIGHT)
+            jellyfishes.update(MAP_WIDTH, MAP_HEIGHT, map.points_in_map, nav_grid, active=jellyfish_active)
+
+            if damage_cooldown == 0:
+                hit = jellyfishes.first_collision(sub_x, sub_y, 50 * SUB_SCALE, active=jellyfish_active)
+                if hit is not None:
+                    apply_damage(battery, 8)
+                    damage_cooldown = DAMAGE_COOLDOWN_TIME
+                    damage_flash = 15
+
+                    dx = jellyfishes.x[hit] - sub_x
+                    dy = jellyfishes.y[hit] - sub_y
+                    distance = math.sqrt(dx * dx + dy * dy)
+                    if distance > 0:
+                        knockback_x = -(dx / distance) * 40
+                        knockback_y = -(dy / distance) * 40
+                        sub_x, sub_y = wall_field.clamp_motion(sub_x, sub_y, knockback_x, knockback_y,
+                                                               SUB_HULL_RADIUS)
+
+            for bomb in water_bombs[:]:
+                update_water_bomb(bomb, MAP_HEIGHT, is_point_in_map)
+
+                dx = bomb['x'] - sub_x
+                dy = bomb['y'] - sub_y
+                distance = math.sqrt(dx * dx + dy * dy)
+                bomb_radius = 28 * bomb.get('scale', 1.0)
+                sub_radius = 50 * SUB_SCALE
+                if distance <= (bomb_radius + sub_radius):
+                    bomb['active'] = False
+
+                    if distance > 0:
+                        knockback_force = 80
+                        knockback_x = -(dx / distance) * knockback_force
+                        knockback_y = -(dy / distance) * knockback_force
+                        sub_x, sub_y = wall_field.clamp_motion(sub_x, sub_y, knockback_x, knockback_y,
+                                                               SUB_HULL_RADIUS)
+
+                if not bomb.get('active', True):
+                    explosions.append(create_explosion(bomb['x'], bomb['y']))
+                    impact_sound.play()
+                    apply_damage(battery, 15)
+                    water_bombs.remove(bomb)
+
+            explosions[:] = [explosion for explosion in explosions if update_explosion(explosion)]
+
+            update_giant_tentacles(giant_tentacles)
+
+            for capsule in research_capsules:
+                if not capsule['collected']:
+                    update_research_capsule(capsule)
+                    if check_capsule_collision(sub_x, sub_y, capsule):
+                        collect_capsule(capsule)
+
+            update_sonar(sonar, sub_x, sub_y)
+
+            if damage_flash > 0:
+                damage_flash -= 1
+
+            update_battery(battery)
+            if battery['charge'] <= 0:
+                game_state = GAME_STATE_GAMEOVER
+                gameover_start_time = pygame.time.get_ticks()
+
+            elif all(cap['collected'] for cap in research_capsules):
+                game_state = GAME_STATE_VICTORY
+                victory_start_time = pygame.time.get_ticks()
+
+    frame_timer.mark('simulation')
+
+    if sim_accumulator >= SIM_STEP_MS:
+        # Atrasado mesmo depois de MAX_SIM_STEPS: pula o desenho de alguns
+        # quadros para a simulação alcançar o relógio; se nem assim, o
+        # atraso é descartado (o jogo fica mais lento em vez de travar).
+        if skipped_frames < MAX_SKIPPED_FRAMES:
+            skipped_frames += 1
+            frame_timer.end_frame()
+            continue
+        sim_accumulator %= SIM_STEP_MS
+    skipped_frames = 0
+    # Fração do próximo passo já decorrida, para interpolar o submarino.
+    alpha = sim_accumulator / SIM_STEP_MS
+
     if game_state == GAME_STATE_MENU:
-        menu_time += 1
-        menu.update_menu(menu_time, mouse_x, mouse_y)
         screen.fill(menu.ABYSS_BLACK)
         menu.draw_menu(screen, WIDTH, HEIGHT, title_font, button_font)
 
@@ -413,7 +600,7 @@ while True:
     elif game_state == GAME_STATE_PAUSED:
         
         screen.fill((0, 0, 0))
-        screen.blit(map_surface, (-camera_x, -camera_y))
+        world_surface.draw(screen, camera_x, camera_y)
         
         
         drawSubmarineFilled(
@@ -432,134 +619,34 @@ while True:
         draw_pause_menu(screen)
 
     elif game_state == GAME_STATE_PLAYING:
-        keys = pygame.key.get_pressed()
-        is_moving = False
-
-        current_speed = sub_speed
-        if giant_tentacles:
-            dx_tent = sub_x - giant_tentacles['x']
-            dy_tent = sub_y - giant_tentacles['y']
-            dist_tent = math.sqrt(dx_tent * dx_tent + dy_tent * dy_tent)
-            if dist_tent < 200:
-                current_speed = sub_speed * 0.4
-        
-        if keys[pygame.K_LEFT]:
-            sub_angle -= rotation_speed
-        if keys[pygame.K_RIGHT]:
-            sub_angle += rotation_speed
-        if keys[pygame.K_UP]:
-            rad = math.radians(sub_angle)
-            new_x = sub_x + math.cos(rad) * current_speed
-            new_y = sub_y + math.sin(rad) * current_speed
-            if is_point_in_map(new_x, new_y):
-                sub_x = new_x
-                sub_y = new_y
-                is_moving = True
-        if keys[pygame.K_DOWN]:
-            rad = math.radians(sub_angle)
-            new_x = sub_x - math.cos(rad) * current_speed
-            new_y = sub_y - math.sin(rad) * current_speed
-            if is_point_in_map(new_x, new_y):
-                sub_x = new_x
-                sub_y = new_y
-                is_moving = True
-
-        if is_moving:
-            propeller_angle += propeller_speed
-            bubble_timer += 1
-            if bubble_timer >= 8:
-                bubble_timer = 0
-                if len(bubbles) < MAX_BUBBLES:
-                    bx, by = get_bubble_spawn_position(sub_x, sub_y, sub_angle)
-                    bubbles.append(create_bubble(bx, by))
-        else:
-            propeller_angle += propeller_speed * 0.2
+        draw_x = prev_sub_x + (sub_x - prev_sub_x) * alpha
+        draw_y = prev_sub_y + (sub_y - prev_sub_y) * alpha
+        draw_angle = prev_sub_angle + (sub_angle - prev_sub_angle) * alpha
 
-        bubbles[:] = [b for b in bubbles if update_bubble(b)]
+        camera_x = draw_x - WIDTH // 2
+        camera_y = draw_y - HEIGHT // 2
 
-        camera_x = sub_x - WIDTH // 2
-        camera_y = sub_y - HEIGHT // 2
 
-        
-        cycle_time = pygame.time.get_ticks() % 20000  
-        is_shaking = cycle_time >= 15000  
-        
+        cycle_time = pygame.time.get_ticks() % 20000
+        is_shaking = cycle_time >= 15000
+
         if is_shaking:
             shake_intensity = 4
-            shake_x = random.randint(-shake_intensity, shake_intensity)
-            shake_y = random.randint(-shake_intensity, shake_intensity)
+            shake_x = shake_rng.randint(-shake_intensity, shake_intensity)
+            shake_y = shake_rng.randint(-shake_intensity, shake_intensity)
             camera_x += shake_x
             camera_y += shake_y
 
         screen.fill((0, 0, 0))
-        screen.blit(map_surface, (-camera_x, -camera_y))
+        world_surface.draw(screen, camera_x, camera_y)
 
         draw_base_marker(screen, BASE_POS[0], BASE_POS[1], camera_x, camera_y)
+        frame_timer.mark('world')
 
-        if damage_cooldown > 0:
-            damage_cooldown -= 1
-        
-        for jf in jellyfishes:
-            jf_screen_x = jf['x'] - camera_x
-            jf_screen_y = jf['y'] - camera_y
-            if is_visible(jf_screen_x, jf_screen_y):
-                update_jellyfish(jf, MAP_WIDTH, MAP_HEIGHT, is_point_in_map)
-                dx = jf['x'] - sub_x
-                dy = jf['y'] - sub_y
-                distance = math.sqrt(dx * dx + dy * dy)
-                jf_scale = jf.get('scale', 1.0)
-                collision_radius = (30 * jf_scale) + (50 * SUB_SCALE)
-                
-                if distance < collision_radius and damage_cooldown == 0:
-                    apply_damage(battery, 8)
-                    damage_cooldown = DAMAGE_COOLDOWN_TIME
-                    damage_flash = 15
-                    
-                    if distance > 0:
-                        knockback_x = -(dx / distance) * 40
-                        knockback_y = -(dy / distance) * 40
-                        if is_point_in_map(sub_x + knockback_x, sub_y + knockback_y):
-                            sub_x += knockback_x
-                            sub_y += knockback_y
-                
-                jf_copy = jf.copy()
-                jf_copy['x'] = jf_screen_x
-                jf_copy['y'] = jf_screen_y
-                draw_jellyfish_bioluminescent(screen, jf_copy)
-
-        for bomb in water_bombs[:]:   
-            update_water_bomb(bomb, MAP_HEIGHT, is_point_in_map)
-
-            dx = bomb['x'] - sub_x
-            dy = bomb['y'] - sub_y
-            distance = math.sqrt(dx * dx + dy * dy)
-            bomb_radius = 28 * bomb.get('scale', 1.0)
-            sub_radius = 50 * SUB_SCALE 
-            if distance <= (bomb_radius + sub_radius):
-                bomb['active'] = False
-                
-                if distance > 0:
-                    knockback_force = 80
-                    knockback_x = -(dx / distance) * knockback_force
-                    knockback_y = -(dy / distance) * knockback_force
-                    new_sub_x = sub_x + knockback_x
-                    new_sub_y = sub_y + knockback_y
-                    if is_point_in_map(new_sub_x, new_sub_y):
-                        sub_x = new_sub_x
-                        sub_y = new_sub_y
-                    else:
-                        if is_point_in_map(sub_x + knockback_x, sub_y):
-                            sub_x = sub_x + knockback_x
-                        if is_point_in_map(sub_x, sub_y + knockback_y):
-                            sub_y = sub_y + knockback_y
-
-            if not bomb.get('active', True):
-                explosions.append(create_explosion(bomb['x'], bomb['y']))
-                impact_sound.play()
-                apply_damage(battery, 15)
-                water_bombs.remove(bomb)
-                continue
+        jellyfish_visible = jellyfishes.in_view(camera_x, camera_y, WIDTH, HEIGHT)
+        jellyfishes.draw(screen, camera_x, camera_y, jellyfish_visible)
 
+        for bomb in water_bombs:
             bomb_screen_x = bomb['x'] - camera_x
             bomb_screen_y = bomb['y'] - camera_y
 
@@ -569,16 +656,9 @@ while True:
                 bomb_copy['y'] = bomb_screen_y
                 draw_water_bomb(screen, bomb_copy, BOMB_BODY, BOMB_SPIKE, BOMB_HIGHLIGHT)
 
-        for explosion in explosions[:]:
-            alive = update_explosion(explosion)
-
+        for explosion in explosions:
             draw_explosion(screen, explosion, camera_x, camera_y)
 
-            if not alive:
-                explosions.remove(explosion)
-
-
-        update_giant_tentacles(giant_tentacles)
         tentacles_copy = {
             'x': giant_tentacles['x'] - camera_x,
             'y': giant_tentacles['y'] - camera_y,
@@ -591,7 +671,6 @@ while True:
 
         for capsule in research_capsules:
             if not capsule['collected']:
-                update_research_capsule(capsule)
                 capsule_screen_x = capsule['x'] - camera_x
                 capsule_screen_y = capsule['y'] - camera_y
                 if is_visible(capsule_screen_x, capsule_screen_y, 150):
@@ -600,10 +679,6 @@ while True:
                     capsule_copy['y'] = capsule_screen_y
                     draw_research_capsule(screen, capsule_copy)
 
-                if check_capsule_collision(sub_x, sub_y, capsule):
-                    collect_capsule(capsule)
-
-        update_sonar(sonar, sub_x, sub_y)
         draw_sonar(screen, sonar, SONAR_COLOR,camera_x,camera_y)
 
         for b in bubbles:
@@ -616,37 +691,46 @@ while True:
             screen,
             WIDTH // 2,
             HEIGHT // 2,
-            sub_angle,
+            draw_angle,
             SUBMARINE_BODY,
             SUBMARINE_DETAIL,
             SUBMARINE_FILL,
             propeller_angle,
             SUB_SCALE
         )
+        frame_timer.mark('entities')
 
-        cone_points = flashlight.get_flashlight_cone(WIDTH // 2, HEIGHT // 2, sub_angle)
-        flashlight.apply_darkness_overlay(screen, cone_points, WIDTH, HEIGHT)
+        light_map.clear()
+        cone_points = flashlight.get_occluded_cone(wall_index, draw_x, draw_y, draw_angle)
+        if flashlight.is_unoccluded(cone_points):
+            light_map.add_cone(WIDTH // 2, HEIGHT // 2, draw_angle, FLASHLIGHT_COLOR)
+        else:
+            light_map.add_polygon(cone_points - (camera_x, camera_y), FLASHLIGHT_COLOR)
+        exploration.reveal_polygon(cone_points)
+        exploration.reveal_sonar(sonar)
+
+        glow_x, glow_y, glow_colors = jellyfishes.glow(jellyfish_visible)
+        light_map.add_points(glow_x - camera_x, glow_y - camera_y, JELLYFISH_GLOW_RADIUS, glow_colors, 0.5)
+
+        for capsule in research_capsules:
+            if not capsule['collected']:
+                capsule_light = get_capsule_light(capsule)
+                light_map.add_point(capsule['x'] - camera_x,
+                                    capsule['y'] + capsule['float_offset'] - camera_y,
+                                    int(160 * capsule['scale']), CAPSULE_GLOW, 0.6 * capsule_light)
+
+        light_map.apply(screen)
+        frame_timer.mark('lighting')
 
         if damage_flash > 0:
             flash_alpha = int((damage_flash / 15) * 100)
             flash_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
             flash_surface.fill((255, 0, 0, flash_alpha))
             screen.blit(flash_surface, (0, 0))
-            
-            shake_x = random.randint(-3, 3)
-            shake_y = random.randint(-3, 3)
-            
-            damage_flash -= 1
 
-        
-        update_battery(battery)
         battery_height = draw_battery(screen, battery, 20, 20)
 
-        if battery['charge'] <= 0:
-            game_state = GAME_STATE_GAMEOVER
-            gameover_start_time = pygame.time.get_ticks()
-
-        depth = sub_y
+        depth = draw_y
         draw_depth(screen, depth, 20, 20 + battery_height + 10)
 
         collected_count = sum(1 for cap in research_capsules if cap['collected'])
@@ -662,8 +746,7 @@ while True:
         if sonar['active']:
             minimap_x = WIDTH - 250
             minimap_y = 20
-            minimap_w = 230
-            minimap_h = 160
+            minimap_w, minimap_h = map.MINIMAP_SIZE
             
             uncollected_capsules = [cap for cap in research_capsules if not cap['collected']]
             objects_to_draw = {
@@ -678,7 +761,8 @@ while True:
                 get_all_map_zones(),
                 (sub_x, sub_y),
                 MAP_WIDTH, MAP_HEIGHT,
-                objects_to_draw
+                objects_to_draw,
+                zone_layer=exploration.refresh()
             )
 
         if collected_count > 0 and collected_count < total_capsules:
@@ -702,10 +786,6 @@ while True:
             screen.blit(bg_surface, bg_rect.topleft)
             screen.blit(find_text, text_rect)
 
-        if collected_count == total_capsules:
-            game_state = GAME_STATE_VICTORY
-            victory_start_time = pygame.time.get_ticks()
-
         elapsed = pygame.time.get_ticks() - mission_start_time
         if elapsed < SHOW_MISSION_DURATION_MS:
             draw_center_overlay(
@@ -721,8 +801,11 @@ while True:
                 SHOW_MISSION_DURATION_MS
             )
 
+    frame_timer.mark('hud')
+
     if SHOW_FPS:
         pygame.display.set_caption(f"Echoes of the Deep | FPS: {int(clock.get_fps())}")
 
     pygame.display.flip()
-    clock.tick(60)
+    frame_timer.mark('present')
+    frame_timer.end_frame()
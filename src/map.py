@@ -1,193 +1,250 @@
+import os
 import pygame
+import numpy as np
 import primitives
-import transforms
-import math
-import sys
+import distance_field
+import navigation
+import visibility
+import level_cache
+import level_format
+import cave_generator
+import minimap
 
 BLUE_DARK = (10, 30, 60)
 WHITE = (255, 255, 255)
 OCEAN_DEEP = (15, 40, 70)
 
-def gerar_uvs(poligono, escala=200):
-    uvs = []
-    for x, y in poligono:
-        u = x / escala
-        v = y / escala
-        uvs.append((u % 1, v % 1))
-    return uvs
+# Relativo à raiz do projeto (pai de src/), não ao diretório atual.
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEVEL_PATH = os.path.join(ROOT_DIR, 'levels', 'caverna.lvl')
+
+# Versão do formato do mapa pré-renderizado; mude ao alterar drawMap.
+BAKE_VERSION = 2
+MINIMAP_SIZE = (230, 160)
+
+# Modos de consulta de is_point_in_map:
+# - "grid": grade de ocupação pré-calculada, O(1) por ponto.
+# - "exact": ray casting em todos os polígonos (referência).
+MAP_QUERY_GRID = "grid"
+MAP_QUERY_EXACT = "exact"
+
+_map_query_mode = MAP_QUERY_GRID
+_occupancy_grid = None
+_zone_index = None
+_distance_field = None
+_navigation = None
+_wall_index = None
+_textures = {}
+_level = None
+MAP_WIDTH = None
+MAP_HEIGHT = None
+
+def _deslocar(pontos, origem):
+    ox, oy = origem
+    if ox == 0 and oy == 0:
+        return pontos
+    return [(x - ox, y - oy) for x, y in pontos]
+
+
+def get_texture(path):
+    """Textura do nível, carregada uma vez por arquivo."""
+    textura = _textures.get(path)
+    if textura is None:
+        textura = pygame.image.load(path).convert()
+        _textures[path] = textura
+    return textura
+
+
+def get_level():
+    return _level
+
+
+def set_level(level, occupancy=None):
+    """
+    Troca o nível atual e descarta tudo o que foi calculado a partir do
+    anterior (grade de ocupação, índice de zonas, campo de distância,
+    navegação, paredes).
+    `occupancy` é a grade de ocupação já conhecida do nível, se houver.
+    """
+    global _level, MAP_WIDTH, MAP_HEIGHT
+    global _occupancy_grid, _zone_index, _distance_field, _navigation, _wall_index
+    _level = level
+    MAP_WIDTH = level.width
+    MAP_HEIGHT = level.height
+    _occupancy_grid = occupancy
+    _zone_index = None
+    _distance_field = None
+    _navigation = None
+    _wall_index = None
+
+
+def load_level(path=LEVEL_PATH):
+    """Lê o arquivo de nível e o torna o nível atual."""
+    level = level_format.load_level(path)
+    set_level(level)
+    return level
+
+
+def load_generated_cave(width, height, seed=None, **options):
+    """
+    Gera uma caverna procedural (cave_generator) e a torna o nível atual,
+    já com a grade de ocupação das células.
+    """
+    level, occupancy, _ = cave_generator.generate_cave(width, height, seed=seed, **options)
+    set_level(level, occupancy)
+    return level
+
+
+def draw_map_region(screen, origin_x, origin_y):
+    """
+    Desenha as camadas do nível com o ponto de mundo (origin_x, origin_y)
+    no canto superior esquerdo de `screen`. Camadas cuja caixa envolvente
+    não toca a região são puladas; as demais são recortadas pelas
+    primitivas, então só a região visível é rasterizada.
+    """
+    origem = (origin_x, origin_y)
+    largura, altura = screen.get_size()
+    caixas = _level.layer_bboxes
+    visiveis = ((caixas[:, 2] >= origin_x - 1) & (caixas[:, 0] <= origin_x + largura + 1) &
+                (caixas[:, 3] >= origin_y - 1) & (caixas[:, 1] <= origin_y + altura + 1))
+    for (tipo, i), visivel in zip(_level.layers, visiveis.tolist()):
+        if not visivel:
+            continue
+        if tipo == level_format.LAYER_ZONE:
+            pontos = (_level.zone_array(i) - origem).tolist()
+            cor = tuple(_level.zone_colors[i].tolist())
+            primitives.drawPolygon(screen, pontos, cor)
+            primitives.scanline_fill(screen, pontos, cor)
+        elif tipo == level_format.LAYER_SPIKES:
+            cor = tuple(_level.spike_colors[i].tolist())
+            for triangulo in (_level.spike_triangles[i] - origem).tolist():
+                primitives.drawPolygon(screen, triangulo, cor)
+                primitives.scanline_fill(screen, triangulo, cor)
+        elif tipo == level_format.LAYER_TEXTURE:
+            pontos, uvs, arquivo = _level.texture_region(i)
+            primitives.scanline_texture(screen, _deslocar(pontos, origem), uvs, get_texture(arquivo))
 
 
-
-def gerar_contorno_completo():
-    pontos = [
-        (100, 900),
-        (100, 700),
-        (300, 700),
-        (700, 550),
-        (700,200),
-        (1100,200 ),
-        (1100,300),
-        (800, 300),
-        (800, 650),
-        (500, 850),
-        (300, 850),
-        (100, 900)
-    ]
-    return pontos
-
-
-
-def gerar_magmaZone():
-    zone = [(1100,200 ),(1200,150 ),(1300,100 ),(1400,200 ),(1400, 300),(1200,400),(1150,350),(1100,300 ),
-            ]
-    return zone
-
-def gerar_SegundoPercurso():
-    zone = [(1400,200),(1800, 200),(1200, 700),(1000,700),(1500,300),(1400,300)
-            ]
-    return zone
-
-def gerar_ArenaInimigos():
-    arena = [
-        (1000,700),(800,800),(1000,900),(1400,900),(1400,800),(1200,700),
-    ]
-    return arena
-
-
-
-def gerar_CorredorArenaParaObjeto():
-    zone = [
-        (1400, 900),(1600,900),(1600,1000),(1800,1000),(1800,700),(1600,700),(1600,800),(1400, 800),
-
-       
-    ]
-    return zone
-
-def fazer_espinhos(screen, x0, y0, x1, y1, lado,tamanho=20, espacamento=25, cor=(200, 200, 200)):
-
-    dx = x1 - x0
-    dy = y1 - y0
-    comprimento = math.hypot(dx, dy)
-    
-
-    if comprimento == 0:
-        return
-
-    ux = dx / comprimento
-    uy = dy / comprimento
-
-    nx = -uy * lado
-    ny = ux * lado
-
-    quantidade = int(comprimento // espacamento)
-
-    for i in range(quantidade):
-        px = x0 + ux * i * espacamento
-        py = y0 + uy * i * espacamento
-
-        base1 = (
-            px - ux * espacamento / 2,
-            py - uy * espacamento / 2
-        )
-        base2 = (
-            px + ux * espacamento / 2,
-            py + uy * espacamento / 2
-        )
-
-        ponta = (
-            px + nx * tamanho,
-            py + ny * tamanho
-        )
-
-        primitives.drawPolygon(screen,[base1, base2, ponta],cor)
-        primitives.scanline_fill(screen,[base1, base2, ponta],cor)
-
-def gerar_caminho_errado():
-    caminho = [
-        (800,800),(400,900),(550,1000),(1000,900)
-    ]
-    return caminho
-        
-def fazer_magma(poligono, screen, textura):
-    uvs = gerar_uvs(poligono, escala=150)
-    primitives.scanline_texture(screen, poligono, uvs, textura)
-
-def caminhoerrado_inicial():
-    caminho = [(100, 700), (100, 200), (0, 200), (0, 0), (300, 0), (300, 200), (300, 700)]
-    return caminho
-
-def gerar_bifurcacao_direita():
-    bifurcacao = [
-        (300, 450),
-        (500, 450),
-        (550, 450),
-        (550, 200),
-        (500, 150),
-        (400, 150),
-        (350, 200),
-        (350, 350),
-        (300, 350),
-    ]
-    return bifurcacao
-
- 
 def drawMap(screen):
-    textura_lava = pygame.image.load('imagens/lava.jfif').convert()
-
-    caminho_errado = caminhoerrado_inicial()
-    primitives.drawPolygon(screen, caminho_errado, OCEAN_DEEP)
-    primitives.scanline_fill(screen, caminho_errado, OCEAN_DEEP)
-
-    primitives.drawPolygon(screen, gerar_contorno_completo(), OCEAN_DEEP)
-    primitives.scanline_fill(screen, gerar_contorno_completo(), OCEAN_DEEP)
-
-    primitives.drawPolygon(screen, gerar_magmaZone(), OCEAN_DEEP)
-    primitives.scanline_fill(screen, gerar_magmaZone(), OCEAN_DEEP)
-
-    primitives.drawPolygon(screen, gerar_SegundoPercurso(), OCEAN_DEEP)
-    primitives.scanline_fill(screen, gerar_SegundoPercurso(), OCEAN_DEEP)
-
-    primitives.drawPolygon(screen, gerar_ArenaInimigos(), (50,50,50))
-    primitives.scanline_fill(screen, gerar_ArenaInimigos(), (50,50,50))
-
-    primitives.drawPolygon(screen, gerar_CorredorArenaParaObjeto(), OCEAN_DEEP)
-    primitives.scanline_fill(screen, gerar_CorredorArenaParaObjeto(), OCEAN_DEEP)
-
-    caminho_errado = gerar_caminho_errado()
-    primitives.drawPolygon(screen, caminho_errado, OCEAN_DEEP)
-    primitives.scanline_fill(screen, caminho_errado, OCEAN_DEEP)
-
-    fazer_espinhos(screen, 700,550 , 300, 700, -1, tamanho=20, espacamento=30, cor=(0,0,0))
-    fazer_espinhos(screen, 500, 850, 800, 650 , -1, tamanho=15, espacamento=30, cor=(0,0,0))
-
-    fazer_magma([(1100,200 ),(1200,150 ),(1300,100 ),(1400,200 )],screen,textura_lava)
-    fazer_magma([(1400, 300),(1200,400),(1150,350),(1100,300 )],screen,textura_lava)
-    
-    bifurc_dir = gerar_bifurcacao_direita()
-    primitives.drawPolygon(screen, bifurc_dir, OCEAN_DEEP)
-    primitives.scanline_fill(screen, bifurc_dir, OCEAN_DEEP)
-
-
-
+    draw_map_region(screen, 0, 0)
+
+
+def get_bake_key(minimap_size=MINIMAP_SIZE, include_surface=True):
+    """Hash de tudo o que determina o mapa pré-renderizado: nível, texturas e tamanhos."""
+    texture_bytes = []
+    for path in sorted(set(_level.texture_files)):
+        with open(path, 'rb') as f:
+            texture_bytes.append(f.read())
+    return level_cache.content_hash('mapa', BAKE_VERSION, _level.key, MAP_WIDTH, MAP_HEIGHT,
+                                    tuple(minimap_size), include_surface, *texture_bytes)
+
+
+def bake_map(minimap_size=MINIMAP_SIZE, include_surface=True):
+    """
+    Renderiza o mapa, a grade de ocupação e a camada de zonas do minimapa.
+    Com include_surface=False o mapa inteiro não é renderizado ('surface'
+    fica None): é o caso de quem desenha o mundo por tiles.
+    """
+    surface = None
+    if include_surface:
+        surface = pygame.Surface((MAP_WIDTH, MAP_HEIGHT))
+        surface.fill((0, 0, 0))
+        drawMap(surface)
+
+    minimap_w, minimap_h = minimap_size
+    return {
+        'surface': surface,
+        'occupancy': get_occupancy_grid(),
+        'minimap': minimap.render_zone_layer(minimap_w, minimap_h, get_all_map_zones(),
+                                             MAP_WIDTH, MAP_HEIGHT),
+    }
+
+
+def _save_baked_map(path, baked):
+    minimap_layer = baked['minimap']
+    arrays = {
+        'occupancy': np.packbits(baked['occupancy']),
+        'minimap': np.frombuffer(pygame.image.tobytes(minimap_layer, 'RGB'), dtype=np.uint8),
+        'minimap_size': np.array(minimap_layer.get_size()),
+    }
+    if baked['surface'] is not None:
+        arrays['surface'] = np.frombuffer(pygame.image.tobytes(baked['surface'], 'RGB'), dtype=np.uint8)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+    level_cache.replace_file(tmp_path, path)
+
+
+def _load_baked_map(path, include_surface):
+    with np.load(path) as data:
+        surface = None
+        if include_surface:
+            surface = pygame.image.frombytes(data['surface'].tobytes(), (MAP_WIDTH, MAP_HEIGHT), 'RGB')
+        occupancy = np.unpackbits(data['occupancy'], count=MAP_WIDTH * MAP_HEIGHT)
+        minimap_size = tuple(int(v) for v in data['minimap_size'])
+        minimap_layer = pygame.image.frombytes(data['minimap'].tobytes(), minimap_size, 'RGB')
+    return {
+        'surface': surface,
+        'occupancy': occupancy.reshape(MAP_HEIGHT, MAP_WIDTH).astype(bool),
+        'minimap': minimap_layer,
+    }
+
+
+def load_baked_map(minimap_size=MINIMAP_SIZE, include_surface=True):
+    """
+    Mapa pré-renderizado ({'surface', 'occupancy', 'minimap'}), lido do
+    cache em disco quando a chave de conteúdo bate; senão é renderizado
+    e gravado. A grade de ocupação carregada passa a atender
+    is_point_in_map.
+    """
+    global _occupancy_grid
+    path = level_cache.cache_path('mapa', get_bake_key(minimap_size, include_surface), 'npz')
+
+    baked = None
+    if os.path.exists(path):
+        try:
+            baked = _load_baked_map(path, include_surface)
+        except (OSError, ValueError, KeyError):
+            baked = None
+
+    if baked is None:
+        baked = bake_map(minimap_size, include_surface)
+        try:
+            _save_baked_map(path, baked)
+        except OSError:
+            pass
+
+    if pygame.display.get_surface() is not None:
+        if baked['surface'] is not None:
+            baked['surface'] = baked['surface'].convert()
+        baked['minimap'] = baked['minimap'].convert()
+    _occupancy_grid = baked['occupancy']
+    return baked
 
 
 def get_spawn_position():
     """Retorna a posição inicial do submarino (dentro da safe zone)"""
-    return (200, 800)
+    return _level.spawn
 
 
 def get_all_map_zones():
-    """Retorna todos os polígonos do mapa para verificação de colisão"""
-    return [
-        gerar_contorno_completo(),
-        gerar_magmaZone(),
-        gerar_SegundoPercurso(),
-        gerar_ArenaInimigos(),
-        gerar_CorredorArenaParaObjeto(),
-        caminhoerrado_inicial(),
-        gerar_caminho_errado(),
-        gerar_bifurcacao_direita(),
-    ]
+    """
+    Polígonos do mapa nos buffers do nível: (vértices (N, 2), offsets),
+    com a zona i em vértices[offsets[i]:offsets[i + 1]].
+    """
+    return _level.zone_vertices, _level.zone_offsets
+
+
+def _zone_edges(vertices, offsets):
+    """
+    Arestas de todas as zonas como arrays (xi, yi, xj, yj), ligando cada
+    vértice i ao anterior j da mesma zona (o primeiro liga ao último),
+    na ordem do ray casting de point_in_polygon.
+    """
+    previous = np.arange(-1, len(vertices) - 1)
+    previous[offsets[:-1]] = offsets[1:] - 1
+    return vertices[:, 0], vertices[:, 1], vertices[previous, 0], vertices[previous, 1]
 
 
 def point_in_polygon(x, y, polygon):
@@ -207,10 +264,202 @@ def point_in_polygon(x, y, polygon):
     return inside
 
 
+class ZoneIndex:
+    """
+    Índice espacial das zonas para consultas exatas de ponto em polígono.
+    As caixas envolventes (AABB) das zonas são distribuídas numa grade
+    uniforme de células `cell_size`; uma consulta só testa as zonas da
+    célula do ponto cuja AABB o contém. As arestas não horizontais de
+    todas as zonas ficam pré-calculadas num array (5, n) de (xi, yi, yj,
+    xj - xi, yj - yi), com `edge_offsets` separando as de cada zona.
+    """
+    __slots__ = ('cell_size', 'bboxes', 'edges', 'edge_offsets', 'cells', 'cols', 'rows')
+
+    def __init__(self, vertices, offsets, bboxes, cell_size=128):
+        self.cell_size = cell_size
+        self.bboxes = [tuple(b) for b in np.asarray(bboxes).tolist()]
+
+        xi, yi, xj, yj = _zone_edges(vertices, offsets)
+        keep = yi != yj
+        self.edges = np.stack((xi, yi, yj, xj - xi, yj - yi))[:, keep]
+        zone_of_vertex = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        self.edge_offsets = np.searchsorted(zone_of_vertex[keep], np.arange(len(offsets))).tolist()
+
+        self.cols = int(max((b[2] for b in self.bboxes), default=0) // cell_size) + 1
+        self.rows = int(max((b[3] for b in self.bboxes), default=0) // cell_size) + 1
+        self.cells = [[] for _ in range(self.cols * self.rows)]
+        for zone_id, (xmin, ymin, xmax, ymax) in enumerate(self.bboxes):
+            c0, c1 = self._cell_range(xmin, xmax, self.cols)
+            r0, r1 = self._cell_range(ymin, ymax, self.rows)
+            for row in range(r0, r1 + 1):
+                for col in range(c0, c1 + 1):
+                    self.cells[row * self.cols + col].append((zone_id, xmin, ymin, xmax, ymax))
+
+    def _cell_range(self, lo, hi, count):
+        first = min(max(int(lo // self.cell_size), 0), count - 1)
+        last = min(max(int(hi // self.cell_size), 0), count - 1)
+        return first, last
+
+    def candidates(self, x, y):
+        """Zonas cuja AABB contém o ponto, em ordem de índice."""
+        col = int(x // self.cell_size)
+        row = int(y // self.cell_size)
+        # Pontos fora da grade só podem estar em zonas que tocam a borda.
+        col = min(max(col, 0), self.cols - 1)
+        row = min(max(row, 0), self.rows - 1)
+        return [zone_id for zone_id, xmin, ymin, xmax, ymax in self.cells[row * self.cols + col]
+                if xmin <= x <= xmax and ymin <= y <= ymax]
+
+    def zone_contains(self, zone_id, x, y):
+        """Mesmo ray casting de point_in_polygon, sobre as arestas pré-calculadas."""
+        xi, yi, yj, dx, dy = self.edges[:, self.edge_offsets[zone_id]:self.edge_offsets[zone_id + 1]]
+        crosses = (yi > y) != (yj > y)
+        return bool(np.count_nonzero(crosses & (x < dx * (y - yi) / dy + xi)) & 1)
+
+    def zone_at(self, x, y):
+        """Índice da primeira zona que contém o ponto, ou None."""
+        for zone_id in self.candidates(x, y):
+            if self.zone_contains(zone_id, x, y):
+                return zone_id
+        return None
+
+    def contains(self, x, y):
+        return self.zone_at(x, y) is not None
+
+
+def get_zone_index():
+    """Índice das zonas do mapa, construído uma única vez."""
+    global _zone_index
+    if _zone_index is None:
+        _zone_index = ZoneIndex(_level.zone_vertices, _level.zone_offsets, _level.zone_bboxes)
+    return _zone_index
+
+
+def is_point_in_map_exact(x, y):
+    """Verifica se um ponto está dentro de qualquer zona do mapa (ray casting só nas zonas candidatas)"""
+    return get_zone_index().contains(x, y)
+
+
+def set_map_query_mode(mode):
+    """Seleciona o modo de is_point_in_map ("grid" ou "exact")."""
+    global _map_query_mode
+    if mode not in (MAP_QUERY_GRID, MAP_QUERY_EXACT):
+        raise ValueError(f"Modo de consulta desconhecido: {mode}")
+    _map_query_mode = mode
+
+
+def get_map_query_mode():
+    return _map_query_mode
+
+
+def build_occupancy_grid(vertices, offsets, width, height):
+    """
+    Grade booleana (altura, largura) em que a célula [y, x] é o resultado
+    de point_in_polygon no ponto inteiro (x, y) para alguma das zonas
+    (buffers de vértices e offsets, como em Level).
+    Cada aresta inverte a paridade das colunas x < interseção em todas as
+    linhas que cruza; a paridade sai de uma soma acumulada por linha.
+    Uma linha é cruzada um número par de vezes por zona, então à esquerda
+    da caixa da zona a paridade é zero e a soma só precisa da caixa.
+    """
+    grid = np.zeros((height, width), dtype=bool)
+    xi, yi, xj, yj = _zone_edges(vertices, offsets)
+
+    # Linhas inteiras r que a aresta cruza: (yi > r) != (yj > r), ou seja,
+    # min(yi, yj) <= r < max(yi, yj).
+    first = np.clip(np.ceil(np.minimum(yi, yj)), 0, height).astype(np.int64)
+    last = np.clip(np.ceil(np.maximum(yi, yj)), 0, height).astype(np.int64)
+    counts = last - first
+    edge = np.repeat(np.arange(len(xi)), counts)
+    ys = np.arange(len(edge)) - np.repeat(np.cumsum(counts) - counts, counts) + first[edge]
+
+    xi, yi, xj, yj = xi[edge], yi[edge], xj[edge], yj[edge]
+    x_cross = (xj - xi) * (ys - yi) / (yj - yi) + xi
+    # x < x_cross para x inteiro  <=>  x < ceil(x_cross)
+    limit = np.clip(np.ceil(x_cross), 0, width).astype(np.int64)
+
+    # As arestas estão em ordem de zona; a paridade é contada por zona,
+    # na caixa (r0..r1, c0..c1) das linhas e interseções da zona.
+    zone_of_edge = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))[edge]
+    bounds = np.searchsorted(zone_of_edge, np.arange(len(offsets))).tolist()
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if start == end:
+            continue
+        rows, cols = ys[start:end], limit[start:end]
+        r0, r1 = int(rows.min()), int(rows.max()) + 1
+        c0, c1 = int(cols.min()), int(cols.max())
+        if c0 == c1:
+            continue
+        toggles = np.zeros((r1 - r0, c1 - c0 + 1), dtype=np.int8)
+        np.add.at(toggles, (rows - r0, 0), 1)
+        np.add.at(toggles, (rows - r0, cols - c0), 1)
+        grid[r0:r1, c0:c1] |= (np.cumsum(toggles[:, :c1 - c0], axis=1) & 1).astype(bool)
+
+    return grid
+
+
+def get_occupancy_grid():
+    """Grade de ocupação do mapa, construída uma única vez."""
+    global _occupancy_grid
+    if _occupancy_grid is None:
+        _occupancy_grid = build_occupancy_grid(_level.zone_vertices, _level.zone_offsets,
+                                               MAP_WIDTH, MAP_HEIGHT)
+    return _occupancy_grid
+
+
+def get_distance_field():
+    """Campo de distância com sinal das paredes (do cache em disco quando possível)."""
+    global _distance_field
+    if _distance_field is None:
+        _distance_field = distance_field.load_distance_field(_level.key, get_occupancy_grid())
+    return _distance_field
+
+
+def get_navigation():
+    """Grade de navegação (campos de fluxo) das áreas alcançáveis a partir do spawn."""
+    global _navigation
+    if _navigation is None:
+        _navigation = navigation.NavGrid(get_occupancy_grid(), seed=get_spawn_position())
+    return _navigation
+
+
+def get_wall_index():
+    """Segmentos de parede do nível num índice espacial, para a visibilidade da luz."""
+    global _wall_index
+    if _wall_index is None:
+        segments = visibility.build_wall_segments(_level.zone_vertices, _level.zone_offsets,
+                                                  get_occupancy_grid())
+        _wall_index = visibility.WallIndex(segments, MAP_WIDTH, MAP_HEIGHT)
+    return _wall_index
+
+
 def is_point_in_map(x, y):
-    """Verifica se um ponto está dentro de qualquer zona do mapa"""
-    zones = get_all_map_zones()
-    for zone in zones:
-        if point_in_polygon(x, y, zone):
-            return True
-    return False
+    """
+    Verifica se um ponto está dentro de qualquer zona do mapa.
+    No modo "grid" consulta a célula do ponto (x, y arredondados para
+    baixo); fora da grade, ou no modo "exact", usa o teste por polígono.
+    """
+    if _map_query_mode == MAP_QUERY_GRID and 0 <= x < MAP_WIDTH and 0 <= y < MAP_HEIGHT:
+        return bool(get_occupancy_grid()[int(y), int(x)])
+    return is_point_in_map_exact(x, y)
+
+
+def points_in_map(xs, ys):
+    """Versão vetorizada de is_point_in_map para arrays de coordenadas."""
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+
+    if _map_query_mode == MAP_QUERY_EXACT:
+        return np.array([is_point_in_map_exact(x, y) for x, y in zip(xs.ravel().tolist(), ys.ravel().tolist())],
+                        dtype=bool).reshape(xs.shape)
+
+    inside_grid = (xs >= 0) & (xs < MAP_WIDTH) & (ys >= 0) & (ys < MAP_HEIGHT)
+    result = np.zeros(xs.shape, dtype=bool)
+    result[inside_grid] = get_occupancy_grid()[ys[inside_grid].astype(np.int64), xs[inside_grid].astype(np.int64)]
+
+    for i in np.flatnonzero(~inside_grid.ravel()).tolist():
+        result.flat[i] = is_point_in_map_exact(xs.flat[i], ys.flat[i])
+    return result
+
+
+load_level()
@@ -1,12 +1,14 @@
+from functools import lru_cache
+
 import pygame
-from primitives import drawPolygon, scanline_fill, drawCircle
-from transforms import get_window_to_viewport_matrix_pygame, apply_transform
+from primitives import drawPolygon, scanline_fill, drawCircle, sutherland_hodgman
+from transforms import get_window_to_viewport_matrix_pygame, apply_transform, apply_transform_array
+
+# (largura, altura, largura do mapa, altura do mapa) -> (vértices das zonas, camada)
+_zone_layers = {}
 
-def draw_minimap(surface, x, y, width, height,
-                 map_zones, player_pos,
-                 map_width, map_height,
-                 objects_dict=None):
 
+def _draw_zone_layer(surface, x, y, width, height, map_zones, map_width, map_height):
     bg_points = [
         (x, y),
         (x + width, y),
@@ -20,69 +22,101 @@ def draw_minimap(surface, x, y, width, height,
     viewport = (x, y, x + width, y + height)
     transform = get_window_to_viewport_matrix_pygame(janela, viewport)
 
-    for zone in map_zones:
-        minimap_zone = apply_transform(zone, transform)
-        minimap_zone = [
-            (max(x, min(x + width, int(px))),
-             max(y, min(y + height, int(py))))
-            for px, py in minimap_zone
-        ]
+    vertices, offsets = map_zones
+    minimap_vertices = apply_transform_array(vertices, transform)
+    for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist()):
+        minimap_zone = sutherland_hodgman(minimap_vertices[start:end].tolist(), viewport)
+        minimap_zone = [(int(px), int(py)) for px, py in minimap_zone]
 
         if len(minimap_zone) >= 3:
             scanline_fill(surface, minimap_zone, (40, 60, 100))
 
-    if objects_dict and 'sonar' in objects_dict:
-        sonar = objects_dict['sonar']
 
-        player_mm = apply_transform([player_pos], transform)[0]
-        pmx, pmy = int(player_mm[0]), int(player_mm[1])
+def render_zone_layer(width, height, map_zones, map_width, map_height):
+    """
+    Fundo, borda e zonas do minimapa numa superfície própria
+    ((width + 1) x (height + 1), a borda é inclusiva), para ser
+    desenhada uma vez por nível e só copiada com blit a cada quadro.
+    """
+    layer = pygame.Surface((width + 1, height + 1))
+    _draw_zone_layer(layer, 0, 0, width, height, map_zones, map_width, map_height)
+    return layer
+
+
+def get_zone_layer(width, height, map_zones, map_width, map_height):
+    """
+    Camada de zonas (render_zone_layer) do nível e tamanho pedidos,
+    renderizada só na primeira vez. `map_zones` são os buffers
+    (vértices, offsets) do nível; a entrada guarda o buffer de vértices
+    de onde saiu e é refeita quando o nível o troca.
+    """
+    key = (width, height, map_width, map_height)
+    entry = _zone_layers.get(key)
+    if entry is None or entry[0] is not map_zones[0]:
+        entry = (map_zones[0], render_zone_layer(width, height, map_zones, map_width, map_height))
+        _zone_layers[key] = entry
+    return entry[1]
+
+
+@lru_cache(maxsize=8)
+def _minimap_transform(x, y, width, height, map_width, map_height):
+    janela = (0, 0, map_width, map_height)
+    viewport = (x, y, x + width, y + height)
+    return get_window_to_viewport_matrix_pygame(janela, viewport)
+
 
-        if not (x <= pmx <= x + width and y <= pmy <= y + height):
+def draw_minimap(surface, x, y, width, height,
+                 map_zones, player_pos,
+                 map_width, map_height,
+                 objects_dict=None, zone_layer=None):
+    """
+    Minimapa: a camada de zonas (a `zone_layer` dada ou a de
+    get_zone_layer) copiada com blit, e por cima os anéis do sonar e os
+    marcadores do jogador, da base e das cápsulas.
+    """
+    if zone_layer is None:
+        zone_layer = get_zone_layer(width, height, map_zones, map_width, map_height)
+    surface.blit(zone_layer, (x, y))
+
+    transform = _minimap_transform(x, y, width, height, map_width, map_height)
+    player_mm = apply_transform([player_pos], transform)[0]
+    px, py = int(player_mm[0]), int(player_mm[1])
+    player_inside = x <= px <= x + width and y <= py <= y + height
+
+    circles = []
+    if objects_dict and 'sonar' in objects_dict:
+        if not player_inside:
             return
 
         scale = min(width / map_width, height / map_height)
-
         base_radius = 50
 
-        for wave in sonar.get('waves', []):
-            world_radius = base_radius * wave['scale']
-            radius = int(world_radius * scale)
-
+        for wave in objects_dict['sonar'].get('waves', []):
+            radius = int(base_radius * wave['scale'] * scale)
             alpha = max(0, min(1, wave['alpha']))
+            circles.append((px, py, radius, (int(0 * alpha), int(200 * alpha), int(255 * alpha))))
+
+    if player_inside:
+        circles.append((px, py, 3, (255, 255, 0)))
+
+    if objects_dict:
+        markers = []
+        if 'base' in objects_dict:
+            markers.append((objects_dict['base'], 4, (0, 255, 0)))
+
+        if 'capsules' in objects_dict:
+            capsules = objects_dict['capsules']
+        elif 'capsule' in objects_dict:
+            capsules = [objects_dict['capsule']]
+        else:
+            capsules = []
+        for cap in capsules:
+            if cap and not cap.get('collected', False):
+                markers.append(((cap['x'], cap['y']), 3, (255, 0, 0)))
 
-            color = (
-                int(0 * alpha),
-                int(200 * alpha),
-                int(255 * alpha)
-            )
-
-            drawCircle(surface, pmx, pmy, radius, color)
-
-
-    player_transformed = apply_transform([player_pos], transform)[0]
-    px, py = int(player_transformed[0]), int(player_transformed[1])
-
-    if x <= px <= x + width and y <= py <= y + height:
-        drawCircle(surface, px, py, 3, (255, 255, 0))
-
-    if not objects_dict:
-        return
-
-    if 'base' in objects_dict:
-        bx, by = objects_dict['base']
-        bt = apply_transform([(bx, by)], transform)[0]
-        drawCircle(surface, int(bt[0]), int(bt[1]), 4, (0, 255, 0))
+        points = apply_transform([point for point, _, _ in markers], transform)
+        for (mx, my), (_, radius, color) in zip(points, markers):
+            circles.append((int(mx), int(my), radius, color))
 
-    if 'capsules' in objects_dict:
-        for cap in objects_dict['capsules']:
-            if cap and not cap.get('collected', False):
-                cx, cy = cap['x'], cap['y']
-                ct = apply_transform([(cx, cy)], transform)[0]
-                drawCircle(surface, int(ct[0]), int(ct[1]), 3, (255, 0, 0))
-
-    elif 'capsule' in objects_dict:
-        cap = objects_dict['capsule']
-        if cap and not cap.get('collected', False):
-            cx, cy = cap['x'], cap['y']
-            ct = apply_transform([(cx, cy)], transform)[0]
-            drawCircle(surface, int(ct[0]), int(ct[1]), 3, (255, 0, 0))
+    for cx, cy, radius, color in circles:
+        drawCircle(surface, cx, cy, radius, color)
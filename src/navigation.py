@@ -0,0 +1,172 @@
+"""
+Módulo de Navegação
+Campos de fluxo sobre uma grade grossa do mapa, para as criaturas
+andarem pela caverna sem ficar presas nas paredes.
+
+Uma célula é navegável quando todos os seus pixels são água. Para cada
+objetivo, uma busca em largura (frente de onda vetorizada) dá a
+distância de cada célula até ele, e cada célula guarda o passo para a
+vizinha mais próxima do objetivo. Os campos ficam num cache LRU por
+célula de objetivo, então consultar a direção é O(1) por criatura.
+
+Pontos de destino aleatórios saem de uma tabela das células alcançáveis
+a partir do spawn; para vagar, as criaturas usam um conjunto fixo de
+waypoints sorteados dessa tabela, cujos campos ficam sempre no cache.
+"""
+import math
+import random
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_CELL_SIZE = 16
+DEFAULT_WAYPOINTS = 16
+DEFAULT_MAX_FIELDS = 48
+
+# Passos da 8-vizinhança (dx, dy); o índice 8 é "parado".
+_STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+_STEP_VECTORS = tuple((dx / math.hypot(dx, dy), dy / math.hypot(dx, dy)) for dx, dy in _STEPS) + (None,)
+STAY = len(_STEPS)
+# _STEP_VECTORS como array (9, 2), com NaN em STAY, para consultas vetorizadas.
+STEP_TABLE = np.array([v if v is not None else (np.nan, np.nan) for v in _STEP_VECTORS])
+
+
+def _walkable_cells(occupancy, cell_size):
+    """Células (linhas, colunas) cujos pixels são todos água."""
+    height, width = occupancy.shape
+    rows = height // cell_size
+    cols = width // cell_size
+    blocks = occupancy[:rows * cell_size, :cols * cell_size].reshape(rows, cell_size, cols, cell_size)
+    return blocks.all(axis=(1, 3))
+
+
+def _bfs(walkable, goal):
+    """
+    Distância em passos 4-conexos de cada célula até `goal` (índice plano
+    na grade com borda), -1 onde não alcança.
+    """
+    cols = walkable.shape[1]
+    flat = walkable.ravel()
+    distance = np.full(flat.shape, -1, dtype=np.int32)
+    if not flat[goal]:
+        return distance.reshape(walkable.shape)
+
+    distance[goal] = 0
+    frontier = np.array([goal])
+    level = 0
+    offsets = np.array([1, -1, cols, -cols])
+    while len(frontier):
+        level += 1
+        neighbours = (frontier[:, None] + offsets).ravel()
+        neighbours = neighbours[flat[neighbours] & (distance[neighbours] < 0)]
+        frontier = np.unique(neighbours)
+        distance[frontier] = level
+    return distance.reshape(walkable.shape)
+
+
+def _steps_towards(distance, walkable):
+    """
+    Para cada célula, o índice em _STEPS da vizinha com menor distância;
+    diagonais só quando as duas vizinhas ortogonais são navegáveis, para
+    não cortar quinas de rocha. Células encostadas na parede (fora da
+    grade navegável) apontam para a vizinha alcançável mais próxima do
+    objetivo. STAY no objetivo e onde não há vizinha alcançável.
+    """
+    rows, cols = distance.shape
+    big = np.iinfo(np.int32).max
+    padded = np.pad(np.where(distance >= 0, distance, big), 1, constant_values=big)
+    open_ = np.pad(walkable, 1, constant_values=False)
+
+    active = distance != 0
+    best = np.where(distance > 0, distance, big).astype(np.int64)
+    step = np.full((rows, cols), STAY, dtype=np.uint8)
+    for index, (dx, dy) in enumerate(_STEPS):
+        candidate = padded[1 + dy:1 + dy + rows, 1 + dx:1 + dx + cols]
+        if dx and dy:
+            corner_ok = (open_[1:1 + rows, 1 + dx:1 + dx + cols] &
+                         open_[1 + dy:1 + dy + rows, 1:1 + cols]) | (distance < 0)
+            candidate = np.where(corner_ok, candidate, big)
+        better = active & (candidate < best)
+        best = np.where(better, candidate, best)
+        step[better] = index
+    return step
+
+
+class NavGrid:
+    """Grade de navegação com campos de fluxo por objetivo."""
+
+    def __init__(self, occupancy, cell_size=DEFAULT_CELL_SIZE, seed=None,
+                 waypoints=DEFAULT_WAYPOINTS, max_fields=DEFAULT_MAX_FIELDS, rng=random):
+        self.cell_size = cell_size
+        self.walkable = _walkable_cells(occupancy, cell_size)
+        self.rows, self.cols = self.walkable.shape
+        self.max_fields = max(max_fields, waypoints)
+        self._fields = OrderedDict()
+
+        reachable = self.walkable
+        if seed is not None:
+            seed_cell = self.cell_of(*seed)
+            if seed_cell is not None and self.walkable[seed_cell]:
+                reachable = self._distance_to(seed_cell) >= 0
+        self.reachable = np.flatnonzero(reachable)
+
+        count = min(waypoints, len(self.reachable))
+        picks = rng.sample(range(len(self.reachable)), count) if count else []
+        self.waypoints = [self._cell_center(int(self.reachable[i])) for i in picks]
+
+    def cell_of(self, x, y):
+        """(linha, coluna) da célula de (x, y), ou None fora da grade."""
+        col = int(x // self.cell_size)
+        row = int(y // self.cell_size)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    def _cell_center(self, flat_index):
+        row, col = divmod(flat_index, self.cols)
+        half = self.cell_size / 2
+        return col * self.cell_size + half, row * self.cell_size + half
+
+    def _distance_to(self, cell):
+        padded = np.pad(self.walkable, 1, constant_values=False)
+        goal = (cell[0] + 1) * (self.cols + 2) + cell[1] + 1
+        return _bfs(padded, goal)[1:-1, 1:-1]
+
+    def flow_field(self, goal_x, goal_y):
+        """
+        Passos (índices de _STEPS) de todas as células em direção à célula
+        de (goal_x, goal_y), calculados uma vez por célula de objetivo.
+        None se o objetivo está fora da grade.
+        """
+        cell = self.cell_of(goal_x, goal_y)
+        if cell is None:
+            return None
+        field = self._fields.get(cell)
+        if field is not None:
+            self._fields.move_to_end(cell)
+            return field
+
+        field = _steps_towards(self._distance_to(cell), self.walkable)
+        self._fields[cell] = field
+        while len(self._fields) > self.max_fields:
+            self._fields.popitem(last=False)
+        return field
+
+    def steps(self, field, xs, ys):
+        """
+        Vetores unitários (n, 2) do próximo passo de cada ponto no campo
+        `field`, NaN na célula do objetivo, fora da grade ou sem caminho
+        (quem chama segue em linha reta).
+        """
+        cols = (np.asarray(xs) // self.cell_size).astype(np.int64)
+        rows = (np.asarray(ys) // self.cell_size).astype(np.int64)
+        inside = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+        codes = np.full(len(cols), STAY, dtype=np.uint8)
+        codes[inside] = field[rows[inside], cols[inside]]
+        return STEP_TABLE[codes]
+
+    def random_point(self, rng=random):
+        """Centro de uma célula alcançável sorteada da tabela."""
+        if len(self.reachable) == 0:
+            return None
+        return self._cell_center(int(self.reachable[rng.randrange(len(self.reachable))]))
@@ -1,21 +1,172 @@
 """
 Módulo de Primitivas Gráficas
 Funções para desenho de formas usando setPixel.
+
+As primitivas geram as coordenadas dos pixels (ou os trechos horizontais)
+em arrays NumPy e escrevem tudo de uma vez pelo backend selecionado:
+- "numpy": um único scatter vetorizado via pygame.surfarray.pixels2d,
+  com a superfície travada uma só vez por primitiva.
+- "pygame": um set_at por pixel e um fill por trecho.
 """
+import math
+import weakref
+from functools import lru_cache
 
-def setPixel(surface, x_pos, y_pos, color):
+import numpy as np
+import pygame
+
+BACKEND_NUMPY = "numpy"
+BACKEND_PYGAME = "pygame"
+
+_backend = BACKEND_NUMPY
+
+# Abaixo deste número de pixels, montar arrays e travar a superfície custa
+# mais do que escrever os pixels um a um.
+_SMALL_PRIMITIVE = 24
+
+
+def set_backend(backend):
+    """Seleciona o backend de escrita ("numpy" ou "pygame")."""
+    global _backend
+    if backend not in (BACKEND_NUMPY, BACKEND_PYGAME):
+        raise ValueError(f"Backend desconhecido: {backend}")
+    _backend = backend
+
+
+def get_backend():
+    return _backend
+
+
+def _pixel_array(surface):
+    """
+    Referência 2D aos pixels mapeados da superfície (trava a superfície
+    enquanto existir). Retorna None quando o backend é "pygame" ou quando
+    o formato não é suportado pelo surfarray (ex.: 24 bits).
+    """
+    if _backend != BACKEND_NUMPY:
+        return None
     try:
-        surface.set_at((int(x_pos), int(y_pos)), color)
-    except IndexError:
-        pass
+        return pygame.surfarray.pixels2d(surface)
+    except ValueError:
+        return None
+
+
+def _map_color(surface, color):
+    """Valor mapeado da cor como inteiro sem sinal (map_rgb devolve negativos com alfa)."""
+    return surface.map_rgb(color) & 0xFFFFFFFF
+
+
+def _map_rgb_array(surface, rgb):
+    """Valores mapeados de um array N x 3 de cores RGB, numa única chamada."""
+    rgb = np.asarray(rgb, dtype=np.uint8).reshape(-1, 1, 3)
+    return pygame.surfarray.map_array(surface, rgb)[:, 0]
+
+
+def _write_pixels(surface, xs, ys, color, bbox=None):
+    """
+    Escreve pixels soltos de uma cor, respeitando o clip rect.
+    `bbox` (xmin, ymin, xmax, ymax), quando conhecido, evita a máscara de
+    recorte para primitivas inteiramente dentro do clip rect.
+    """
+    clip = surface.get_clip()
+    if bbox is None or not (bbox[0] >= clip.left and bbox[2] < clip.right and
+                            bbox[1] >= clip.top and bbox[3] < clip.bottom):
+        inside = (xs >= clip.left) & (xs < clip.right) & (ys >= clip.top) & (ys < clip.bottom)
+        xs = xs[inside]
+        ys = ys[inside]
+        if len(xs) == 0:
+            return
+
+    pixels = _pixel_array(surface)
+    if pixels is None:
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            surface.set_at((x, y), color)
+        return
+
+    pixels[xs, ys] = _map_color(surface, color)
+    del pixels
+
+
+def _write_pixel_colors(surface, xs, ys, rgb):
+    """Escreve pixels com cores individuais (array N x 3), respeitando o clip rect."""
+    clip = surface.get_clip()
+    inside = (xs >= clip.left) & (xs < clip.right) & (ys >= clip.top) & (ys < clip.bottom)
+    xs = xs[inside]
+    ys = ys[inside]
+    rgb = rgb[inside]
+    if len(xs) == 0:
+        return
+
+    pixels = _pixel_array(surface)
+    if pixels is None:
+        for x, y, cor in zip(xs.tolist(), ys.tolist(), rgb.tolist()):
+            surface.set_at((x, y), cor)
+        return
+
+    pixels[xs, ys] = _map_rgb_array(surface, rgb)
+    del pixels
+
+
+def _write_spans(surface, ys, x_starts, x_ends, color=None, span_colors=None):
+    """
+    Escreve trechos horizontais [x_inicio, x_fim] (fim inclusivo) com uma
+    cor única (`color`) ou com uma cor por trecho (`span_colors`, lista de
+    tuplas ou array N x 3).
+    """
+    ys = np.asarray(ys, dtype=np.int64)
+    x_starts = np.asarray(x_starts, dtype=np.int64)
+    x_ends = np.asarray(x_ends, dtype=np.int64)
+
+    clip = surface.get_clip()
+    x_starts = np.maximum(x_starts, clip.left)
+    x_ends = np.minimum(x_ends, clip.right - 1)
+    keep = (ys >= clip.top) & (ys < clip.bottom) & (x_starts <= x_ends)
+    if not keep.any():
+        return
+
+    pixels = _pixel_array(surface)
+    if pixels is None:
+        if span_colors is not None:
+            span_colors = np.asarray(span_colors).tolist()
+        for i in np.flatnonzero(keep).tolist():
+            cor = color if span_colors is None else span_colors[i]
+            x_start = int(x_starts[i])
+            surface.fill(cor, (x_start, int(ys[i]), int(x_ends[i]) - x_start + 1, 1))
+        return
+
+    ys = ys[keep]
+    x_starts = x_starts[keep]
+    lengths = x_ends[keep] - x_starts + 1
+    offsets = np.cumsum(lengths) - lengths
+    span_of_pixel = np.repeat(np.arange(len(lengths)), lengths)
+    xs = x_starts[span_of_pixel] + (np.arange(lengths.sum()) - offsets[span_of_pixel])
+
+    if span_colors is None:
+        pixels[xs, ys[span_of_pixel]] = _map_color(surface, color)
+    else:
+        mapped = _map_rgb_array(surface, span_colors)
+        pixels[xs, ys[span_of_pixel]] = mapped[keep][span_of_pixel]
+    del pixels
+
+
+def setPixel(surface, x_pos, y_pos, color):
+    x_pos = int(x_pos)
+    y_pos = int(y_pos)
+    if surface.get_clip().collidepoint(x_pos, y_pos):
+        surface.set_at((x_pos, y_pos), color)
 
 def getPixel(surface, x_pos, y_pos):
-    try:
+    if 0 <= x_pos < surface.get_width() and 0 <= y_pos < surface.get_height():
         return surface.get_at((x_pos, y_pos))
-    except IndexError:
-        return None
+    return None
 
-def DrawLineBresenham(surface, x0, y0, x1, y1, color):
+
+def _bbox_outside(clip, xmin, ymin, xmax, ymax):
+    """True quando a caixa (inclusiva) não toca o clip rect."""
+    return xmax < clip.left or xmin >= clip.right or ymax < clip.top or ymin >= clip.bottom
+
+def _line_setup(x0, y0, x1, y1):
+    """Normaliza a reta para o octante base de Bresenham."""
     x0, y0, x1, y1 = int(x0), int(y0), int(x1), int(y1)
     
     steep = abs(y1 - y0) > abs(x1 - x0)
@@ -32,30 +183,217 @@ def DrawLineBresenham(surface, x0, y0, x1, y1, color):
 
     ystep = 1 if dy >= 0 else -1
     dy = abs(dy)
+    return steep, x0, y0, dx, dy, ystep
+
+
+def _clip_line_range(x0, y0, dx, dy, ystep, major_lo, major_hi, minor_lo, minor_hi):
+    """
+    Recorte paramétrico da reta no espaço do passo i (0..dx).
+    Restringe i para que o eixo maior fique em [major_lo, major_hi] e o
+    eixo menor em [minor_lo, minor_hi]. Como o desvio do eixo menor é
+    floor((2*dy*i + dx - 1) / (2*dx)), os limites são invertidos em
+    aritmética inteira e o trecho recortado é idêntico ao original.
+    Retorna (i_inicio, i_fim) inclusivos, ou None se nada for visível.
+    """
+    i_lo = max(0, major_lo - x0)
+    i_hi = min(dx, major_hi - x0)
+
+    if ystep > 0:
+        k_lo, k_hi = minor_lo - y0, minor_hi - y0
+    else:
+        k_lo, k_hi = y0 - minor_hi, y0 - minor_lo
+
+    if dy == 0:
+        if not (k_lo <= 0 <= k_hi):
+            return None
+    else:
+        # k_i >= k_lo  <=>  i >= ceil((2*dx*k_lo - dx + 1) / (2*dy))
+        i_lo = max(i_lo, -((dx - 1 - 2 * dx * k_lo) // (2 * dy)))
+        # k_i <= k_hi  <=>  i < ceil((2*dx*(k_hi + 1) - dx + 1) / (2*dy))
+        i_hi = min(i_hi, -((dx - 1 - 2 * dx * (k_hi + 1)) // (2 * dy)) - 1)
+
+    if i_lo > i_hi:
+        return None
+    return i_lo, i_hi
 
-    d = 2 * dy - dx
-    incE = 2 * dy
-    incNE = 2 * (dy - dx)
 
-    y = y0
-    for x in range(x0, x1 + 1):
+def _line_pixels(x0, y0, x1, y1, clip=None):
+    """
+    Pixels da reta de Bresenham em forma fechada.
+    O desvio acumulado no eixo menor após i passos é
+    floor((2*dy*i + dx - 1) / (2*dx)), o mesmo que a recorrência produz.
+    Com `clip`, só os passos visíveis são gerados.
+    """
+    steep, x0, y0, dx, dy, ystep = _line_setup(x0, y0, x1, y1)
+
+    i_lo, i_hi = 0, dx
+    if clip is not None:
         if steep:
-            setPixel(surface, y, x, color)
+            limits = (clip.top, clip.bottom - 1, clip.left, clip.right - 1)
         else:
-            setPixel(surface, x, y, color)
+            limits = (clip.left, clip.right - 1, clip.top, clip.bottom - 1)
+        visible = _clip_line_range(x0, y0, dx, dy, ystep, *limits)
+        if visible is None:
+            return None
+        i_lo, i_hi = visible
+
+    major = np.arange(x0 + i_lo, x0 + i_hi + 1)
+    if dx == 0:
+        minor = np.full(len(major), y0)
+    else:
+        k = ((2 * dy) * (major - x0) + (dx - 1)) // (2 * dx)
+        minor = y0 + ystep * k
+    if steep:
+        return minor, major
+    return major, minor
 
-        if d > 0:
-            y += ystep
-            d += incNE
-        else:
-            d += incE
 
+def DrawLineBresenham(surface, x0, y0, x1, y1, color):
+    x0, y0, x1, y1 = int(x0), int(y0), int(x1), int(y1)
 
-def drawCircle(surface, center_x, center_y, radius, color):
+    clip = surface.get_clip()
+    if _bbox_outside(clip, min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)):
+        return
+
+    if max(abs(x1 - x0), abs(y1 - y0)) < _SMALL_PRIMITIVE:
+        steep, x0, y0, dx, dy, ystep = _line_setup(x0, y0, x1, y1)
+        for i in range(dx + 1):
+            y = y0 + ystep * ((2 * dy * i + dx - 1) // (2 * dx)) if dx else y0
+            if steep:
+                setPixel(surface, y, x0 + i, color)
+            else:
+                setPixel(surface, x0 + i, y, color)
+        return
+
+    pixels = _line_pixels(x0, y0, x1, y1, clip)
+    if pixels is None:
+        return
+    xs, ys = pixels
+    _write_pixels(surface, xs, ys, color, bbox=(clip.left, clip.top, clip.right - 1, clip.bottom - 1))
+
+
+def _int_coords(values):
+    """Coordenadas como int64, truncadas em direção a zero como int()."""
+    values = np.asarray(values)
+    if values.dtype.kind == 'f':
+        values = np.trunc(values)
+    return values.astype(np.int64)
+
+
+def _line_batch_pixels(x0, y0, x1, y1, clip):
+    """
+    Versão vetorizada de _line_pixels para N retas de uma vez: mesma
+    normalização de octante, mesmo recorte paramétrico inteiro e mesma
+    forma fechada do desvio no eixo menor. Retorna (xs, ys, reta_do_pixel).
+    """
+    steep = np.abs(y1 - y0) > np.abs(x1 - x0)
+    a0 = np.where(steep, y0, x0)
+    b0 = np.where(steep, x0, y0)
+    a1 = np.where(steep, y1, x1)
+    b1 = np.where(steep, x1, y1)
+
+    flip = a0 > a1
+    a0, a1 = np.where(flip, a1, a0), np.where(flip, a0, a1)
+    b0, b1 = np.where(flip, b1, b0), np.where(flip, b0, b1)
+
+    dx = a1 - a0
+    dy = b1 - b0
+    ystep = np.where(dy >= 0, 1, -1)
+    dy = np.abs(dy)
+
+    major_lo = np.where(steep, clip.top, clip.left)
+    major_hi = np.where(steep, clip.bottom, clip.right) - 1
+    minor_lo = np.where(steep, clip.left, clip.top)
+    minor_hi = np.where(steep, clip.right, clip.bottom) - 1
+
+    i_lo = np.maximum(0, major_lo - a0)
+    i_hi = np.minimum(dx, major_hi - a0)
+    k_lo = np.where(ystep > 0, minor_lo - b0, b0 - minor_hi)
+    k_hi = np.where(ystep > 0, minor_hi - b0, b0 - minor_lo)
+
+    flat = dy == 0
+    denom = np.where(flat, 1, 2 * dy)
+    i_lo = np.where(flat, i_lo, np.maximum(i_lo, -((dx - 1 - 2 * dx * k_lo) // denom)))
+    i_hi = np.where(flat, i_hi, np.minimum(i_hi, -((dx - 1 - 2 * dx * (k_hi + 1)) // denom) - 1))
+    i_hi = np.where(flat & ((k_lo > 0) | (k_hi < 0)), i_lo - 1, i_hi)
+
+    lengths = np.maximum(i_hi - i_lo + 1, 0)
+    line_of_pixel = np.repeat(np.arange(len(lengths)), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    i = i_lo[line_of_pixel] + (np.arange(lengths.sum()) - offsets[line_of_pixel])
+
+    dx_p = dx[line_of_pixel]
+    k = np.where(dx_p == 0, 0, (2 * dy[line_of_pixel] * i + dx_p - 1) // np.maximum(2 * dx_p, 1))
+    major = a0[line_of_pixel] + i
+    minor = b0[line_of_pixel] + ystep[line_of_pixel] * k
+
+    steep_p = steep[line_of_pixel]
+    return np.where(steep_p, minor, major), np.where(steep_p, major, minor), line_of_pixel
+
+
+def draw_lines(surface, segments, colors):
+    """
+    Desenha N retas de Bresenham numa única passada vetorizada.
+    `segments` é um array (N, 4) de (x0, y0, x1, y1) e `colors` é uma cor
+    única ou uma cor por reta. O resultado é o mesmo de chamar
+    DrawLineBresenham para cada reta, na ordem dada.
+    """
+    segments = _int_coords(segments).reshape(-1, 4)
+    if len(segments) == 0:
+        return
+
+    per_segment = np.ndim(colors) == 2
+    if per_segment:
+        colors = np.asarray(colors)[:, :3]
+
+    x0, y0, x1, y1 = segments.T
+    clip = surface.get_clip()
+    visible = ~((np.maximum(x0, x1) < clip.left) | (np.minimum(x0, x1) >= clip.right) |
+                (np.maximum(y0, y1) < clip.top) | (np.minimum(y0, y1) >= clip.bottom))
+    if not visible.any():
+        return
+    if not visible.all():
+        x0, y0, x1, y1 = x0[visible], y0[visible], x1[visible], y1[visible]
+        if per_segment:
+            colors = colors[visible]
+
+    xs, ys, line_of_pixel = _line_batch_pixels(x0, y0, x1, y1, clip)
+    if len(xs) == 0:
+        return
+
+    if per_segment:
+        _write_pixel_colors(surface, xs, ys, colors[line_of_pixel])
+    else:
+        _write_pixels(surface, xs, ys, colors,
+                      bbox=(clip.left, clip.top, clip.right - 1, clip.bottom - 1))
+
+
+def _polygon_segments(points):
+    """Arestas fechadas do polígono como array (N, 4)."""
+    points = np.asarray(points)
+    return np.concatenate((points, np.roll(points, -1, axis=0)), axis=1)
+
+
+def _frozen(*arrays):
+    """Marca arrays de tabelas em cache como somente leitura."""
+    for array in arrays:
+        array.setflags(write=False)
+    return arrays
+
+
+@lru_cache(maxsize=256)
+def _circle_offsets(radius):
+    """
+    Deslocamentos (dx, dy) do círculo de ponto médio, já espelhados nos 8
+    octantes. A tabela fica em cache por raio; desenhar é só transladar.
+    """
+    xs = []
+    ys = []
     x = 0
     y = radius
     d = 3 - 2 * radius
-    drawCirclePixels(surface, center_x, center_y, x, y, color)
+    xs.append(x)
+    ys.append(y)
     while y >= x:
         x += 1
         if d > 0:
@@ -63,7 +401,44 @@ def drawCircle(surface, center_x, center_y, radius, color):
             d = d + 4 * (x - y) + 10
         else:
             d = d + 4 * x + 6
-        drawCirclePixels(surface, center_x, center_y, x, y, color)
+        xs.append(x)
+        ys.append(y)
+
+    xs = np.array(xs)
+    ys = np.array(ys)
+    offsets_x = np.concatenate((xs, -xs, xs, -xs, ys, -ys, ys, -ys))
+    offsets_y = np.concatenate((ys, ys, -ys, -ys, xs, xs, -xs, -xs))
+    return _frozen(offsets_x, offsets_y)
+
+
+def _row_spans(offsets_x, offsets_y):
+    """Converte um contorno simétrico em trechos por linha: (dy, meia_largura)."""
+    rows, inverse = np.unique(offsets_y, return_inverse=True)
+    half_widths = np.zeros(len(rows), dtype=offsets_x.dtype)
+    np.maximum.at(half_widths, inverse, np.abs(offsets_x))
+    return _frozen(rows, half_widths)
+
+
+@lru_cache(maxsize=256)
+def disk_spans(radius):
+    """
+    Trechos por linha do disco de raio `radius` com o contorno de
+    drawCircle: arrays (dy, meia_largura), em cache e somente leitura.
+    """
+    return _row_spans(*_circle_offsets(radius))
+
+
+def drawCircle(surface, center_x, center_y, radius, color):
+    reach = abs(radius) + 1
+    bbox = (int(center_x - reach) - 1, int(center_y - reach) - 1,
+            int(center_x + reach) + 1, int(center_y + reach) + 1)
+    if _bbox_outside(surface.get_clip(), *bbox):
+        return
+    offsets_x, offsets_y = _circle_offsets(radius)
+    _write_pixels(surface,
+                  (center_x + offsets_x).astype(np.int64),
+                  (center_y + offsets_y).astype(np.int64),
+                  color, bbox)
 
 def drawCirclePixels(surface, center_x, center_y, x_offset, y_offset, color):
     setPixel(surface, center_x + x_offset, center_y + y_offset, color)
@@ -75,7 +450,11 @@ def drawCirclePixels(surface, center_x, center_y, x_offset, y_offset, color):
     setPixel(surface, center_x + y_offset, center_y - x_offset, color)
     setPixel(surface, center_x - y_offset, center_y - x_offset, color)
 
-def drawEllipse(surface, center_x, center_y, rx, ry, color):
+@lru_cache(maxsize=256)
+def _ellipse_offsets(rx, ry):
+    """Deslocamentos (dx, dy) da elipse de ponto médio, espelhados nos 4 quadrantes (em cache por rx, ry)."""
+    xs = []
+    ys = []
     x = 0
     y = ry
     d1 = (ry * ry) - (rx * rx * ry) + (0.25 * rx * rx)
@@ -83,7 +462,8 @@ def drawEllipse(surface, center_x, center_y, rx, ry, color):
     dy = 2 * rx * rx * y
 
     while dx < dy:
-        drawEllipsePixels(surface, center_x, center_y, x, y, color)
+        xs.append(x)
+        ys.append(y)
         if d1 < 0:
             x += 1
             dx += 2 * ry * ry
@@ -98,7 +478,8 @@ def drawEllipse(surface, center_x, center_y, rx, ry, color):
     d2 = ((ry * ry) * ((x + 0.5) * (x + 0.5))) + ((rx * rx) * ((y - 1) * (y - 1))) - (rx * rx * ry * ry)
     
     while y >= 0:
-        drawEllipsePixels(surface, center_x, center_y, x, y, color)
+        xs.append(x)
+        ys.append(y)
         if d2 > 0:
             y -= 1
             dy -= 2 * rx * rx
@@ -110,83 +491,272 @@ def drawEllipse(surface, center_x, center_y, rx, ry, color):
             dy -= 2 * rx * rx
             d2 += dx - dy + (rx * rx)
 
+    xs = np.array(xs)
+    ys = np.array(ys)
+    offsets_x = np.concatenate((xs, -xs, xs, -xs))
+    offsets_y = np.concatenate((ys, ys, -ys, -ys))
+    return _frozen(offsets_x, offsets_y)
+
+
+def drawEllipse(surface, center_x, center_y, rx, ry, color):
+    reach_x = abs(rx) + 1
+    reach_y = abs(ry) + 1
+    bbox = (int(center_x - reach_x) - 1, int(center_y - reach_y) - 1,
+            int(center_x + reach_x) + 1, int(center_y + reach_y) + 1)
+    if _bbox_outside(surface.get_clip(), *bbox):
+        return
+    offsets_x, offsets_y = _ellipse_offsets(rx, ry)
+    _write_pixels(surface,
+                  (center_x + offsets_x).astype(np.int64),
+                  (center_y + offsets_y).astype(np.int64),
+                  color, bbox)
+
 def drawEllipsePixels(surface, center_x, center_y, x, y, color):
     setPixel(surface, center_x + x, center_y + y, color)
     setPixel(surface, center_x - x, center_y + y, color)
     setPixel(surface, center_x + x, center_y - y, color)
     setPixel(surface, center_x - x, center_y - y, color)
 
+def _chaves_rgb(superficie):
+    """
+    Array (largura, altura) de chaves RGB comparáveis entre si e a função
+    que converte uma cor na mesma chave. Em superfícies de 32 bits a chave
+    é o próprio valor mapeado sem o alfa, lido sem cópia.
+    """
+    if superficie.get_bytesize() == 4:
+        r, g, b, _ = superficie.get_masks()
+        mascara = r | g | b
+        chaves = pygame.surfarray.pixels2d(superficie)
+        return chaves, mascara, lambda cor: superficie.map_rgb(tuple(cor[:3])) & mascara
+
+    cores = pygame.surfarray.array3d(superficie).astype(np.uint32)
+    chaves = (cores[..., 0] << 16) | (cores[..., 1] << 8) | cores[..., 2]
+    return chaves, 0xFFFFFF, lambda cor: (cor[0] << 16) | (cor[1] << 8) | cor[2]
+
+
+def _bloqueados(chaves, mascara, chave_preenchimento, chave_borda):
+    """Máscara dos pixels que barram o preenchimento (cor de borda ou já preenchidos)."""
+    chaves = chaves & mascara
+    return (chaves == chave_borda) | (chaves == chave_preenchimento)
+
+
 def flood_fill_iterativo(superficie, x, y, cor_preenchimento, cor_borda):
+    """
+    Preenchimento por semente com varredura de trechos (scanline seed fill).
+    Cada semente é estendida até as bordas da sua linha e o trecho inteiro é
+    marcado de uma vez; novas sementes só são empilhadas no início de cada
+    trecho livre das linhas vizinhas. Preenche a mesma região 4-conexa que
+    o preenchimento pixel a pixel.
+    """
     largura = superficie.get_width()
     altura = superficie.get_height()
 
+    if not (0 <= x < largura and 0 <= y < altura):
+        return
+
+    chaves, mascara_rgb, chave = _chaves_rgb(superficie)
+    chave_preenchimento = chave(cor_preenchimento)
+    chave_borda = chave(cor_borda)
+    linhas = {}
+
+    def bloqueado(linha):
+        mascara = linhas.get(linha)
+        if mascara is None:
+            mascara = _bloqueados(chaves[:, linha], mascara_rgb, chave_preenchimento, chave_borda)
+            linhas[linha] = mascara
+        return mascara
+
+    ys = []
+    inicios = []
+    fins = []
     pilha = [(x, y)]
 
     while pilha:
         x, y = pilha.pop()
-
-        if not (0 <= x < largura and 0 <= y < altura):
+        mascara = bloqueado(y)
+        if mascara[x]:
             continue
 
-        cor_atual = superficie.get_at((x, y))[:3]
+        antes = np.flatnonzero(mascara[:x])
+        esquerda = int(antes[-1]) + 1 if len(antes) else 0
+        depois = np.flatnonzero(mascara[x:])
+        direita = x + int(depois[0]) - 1 if len(depois) else largura - 1
 
-        if cor_atual == cor_borda or cor_atual == cor_preenchimento:
-            continue
+        mascara[esquerda:direita + 1] = True
+        ys.append(y)
+        inicios.append(esquerda)
+        fins.append(direita)
+
+        for vizinha in (y - 1, y + 1):
+            if not (0 <= vizinha < altura):
+                continue
+            livre = ~bloqueado(vizinha)[esquerda:direita + 1]
+            comeco = livre.copy()
+            comeco[1:] &= ~livre[:-1]
+            pilha.extend((esquerda + int(i), vizinha) for i in np.flatnonzero(comeco))
+
+    del chaves
+    if ys:
+        _write_spans(superficie, ys, inicios, fins, color=cor_preenchimento)
+
+
+def flood_fill_regiao(superficie, x, y, cor_preenchimento, cor_borda):
+    """
+    Preenchimento por região conexa para áreas grandes.
+    Monta a máscara de bordas da superfície inteira, quebra as linhas em
+    trechos livres e rotula os trechos ligados entre linhas vizinhas; só o
+    componente que contém a semente é escrito. Mesmo resultado de
+    flood_fill_iterativo, com custo proporcional à superfície.
+    """
+    largura = superficie.get_width()
+    altura = superficie.get_height()
+
+    if not (0 <= x < largura and 0 <= y < altura):
+        return
 
-        setPixel(superficie, x, y, cor_preenchimento)
+    chaves, mascara_rgb, chave = _chaves_rgb(superficie)
+    livre = ~_bloqueados(chaves, mascara_rgb, chave(cor_preenchimento), chave(cor_borda)).T
+    del chaves
+    if not livre[y, x]:
+        return
+
+    bordas = np.diff(livre.astype(np.int8), axis=1, prepend=0, append=0)
+    linha_inicio, inicio = np.nonzero(bordas == 1)
+    _, fim = np.nonzero(bordas == -1)
+
+    chave_inicio = linha_inicio * largura + inicio
+    chave_fim = linha_inicio * largura + fim
+
+    # Trechos da linha seguinte que se sobrepõem a cada trecho: um
+    # intervalo contíguo na ordem global dos trechos.
+    primeiro = np.searchsorted(chave_fim, (linha_inicio + 1) * largura + inicio, side='right')
+    ultimo = np.searchsorted(chave_inicio, (linha_inicio + 1) * largura + fim, side='left')
+    quantos = np.maximum(ultimo - primeiro, 0)
+    origem = np.repeat(np.arange(len(inicio)), quantos)
+    destino = np.repeat(primeiro, quantos) + (np.arange(quantos.sum()) - np.repeat(np.cumsum(quantos) - quantos, quantos))
+
+    pares_a = np.concatenate((origem, destino))
+    pares_b = np.concatenate((destino, origem))
+    ordem = np.argsort(pares_a, kind='stable')
+    vizinhos = pares_b[ordem]
+    limites = np.searchsorted(pares_a[ordem], np.arange(len(inicio) + 1))
+
+    semente = int(np.searchsorted(chave_inicio, y * largura + x, side='right')) - 1
+    visitado = np.zeros(len(inicio), dtype=bool)
+    visitado[semente] = True
+    pilha = [semente]
+    while pilha:
+        trecho = pilha.pop()
+        for outro in vizinhos[limites[trecho]:limites[trecho + 1]].tolist():
+            if not visitado[outro]:
+                visitado[outro] = True
+                pilha.append(outro)
 
-        pilha.append((x + 1, y))
-        pilha.append((x - 1, y))
-        pilha.append((x, y + 1))
-        pilha.append((x, y - 1))
+    _write_spans(superficie, linha_inicio[visitado], inicio[visitado], fim[visitado] - 1,
+                 color=cor_preenchimento)
 
 def drawTriangle(surface, point1, point2, point3, color):
-    DrawLineBresenham(surface, point1[0], point1[1], point2[0], point2[1], color)
-    DrawLineBresenham(surface, point2[0], point2[1], point3[0], point3[1], color)
-    DrawLineBresenham(surface, point3[0], point3[1], point1[0], point1[1], color)
+    draw_lines(surface, _polygon_segments([point1[:2], point2[:2], point3[:2]]), color)
 
 def drawPolygon(surface, points, color):
+    if len(points) == 0:
+        return
+    draw_lines(surface, _polygon_segments(points), color)
+
+def _build_edge_table(points, row_lo=None, row_hi=None):
+    """
+    Monta a tabela de arestas (ET) do polígono, ordenada pela primeira linha
+    que cada aresta cruza. Arestas horizontais são descartadas e, com
+    row_lo/row_hi, cada aresta é recortada às linhas [row_lo, row_hi).
+    Cada entrada: [linha_inicial, linha_final (exclusiva), x0, y0, dx, dy].
+    """
+    ys = [p[1] for p in points]
+    y_max = int(max(ys))
+
+    edges = []
     n = len(points)
     for i in range(n):
         x0, y0 = points[i]
         x1, y1 = points[(i + 1) % n]
-        DrawLineBresenham(surface, x0, y0, x1, y1, color)
 
-def scanline_fill(surface, points, fill_color):
-    ys = [p[1] for p in points]
-    y_min = int(min(ys))
-    y_max = int(max(ys))
+        if y0 == y1:
+            continue
 
-    n = len(points)
+        if y0 > y1:
+            x0, y0, x1, y1 = x1, y1, x0, y0
 
-    for y in range(y_min, y_max):
-        intersections_x = []
+        row_start = math.ceil(y0)
+        row_end = min(math.ceil(y1), y_max)
+        if row_lo is not None:
+            row_start = max(row_start, row_lo)
+            row_end = min(row_end, row_hi)
+        if row_start >= row_end:
+            continue
 
-        for i in range(n):
-            x0, y0 = points[i]
-            x1, y1 = points[(i + 1) % n]
+        edges.append([row_start, row_end, x0, y0, x1 - x0, y1 - y0])
 
-            if y0 == y1:
-                continue
+    edges.sort(key=lambda e: e[0])
+    return edges
 
-            if y0 > y1:
-                x0, y0, x1, y1 = x1, y1, x0, y0
 
-            if y < y0 or y >= y1:
-                continue
+def _scanline_spans(points, row_lo=None, row_hi=None):
+    """
+    Rasteriza o polígono com tabela de arestas ativas (AET).
+    As interseções de cada aresta ativa são atualizadas de linha em linha
+    somando dx ao numerador, sem varrer novamente todas as arestas.
+    Gera tuplas (y, x_inicio, x_fim) com x_fim inclusivo.
+    """
+    edges = _build_edge_table(points, row_lo, row_hi)
+    if not edges:
+        return
+
+    y_end = max(e[1] for e in edges)
+    next_edge = 0
+    active = []
+
+    for y in range(edges[0][0], y_end):
+        while next_edge < len(edges) and edges[next_edge][0] == y:
+            row_start, row_end, x0, y0, dx, dy = edges[next_edge]
+            active.append([row_end, x0, dx, dy, (y - y0) * dx])
+            next_edge += 1
+
+        active = [e for e in active if e[0] > y]
+
+        intersections_x = sorted(e[1] + e[4] / e[3] for e in active)
+        for e in active:
+            e[4] += e[2]
 
-            x = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
-            intersections_x.append(x)
+        for i in range(0, len(intersections_x) - 1, 2):
+            x_start = int(round(intersections_x[i]))
+            x_end = int(round(intersections_x[i + 1]))
+            yield y, x_start, x_end
 
-        intersections_x.sort()
 
-        for i in range(0, len(intersections_x), 2):
-            if i + 1 < len(intersections_x):
-                x_start = int(round(intersections_x[i]))
-                x_end = int(round(intersections_x[i + 1]))
+def _collect_spans(points, clip):
+    """
+    Agrupa os trechos visíveis do polígono em listas (ys, x_inicio, x_fim).
+    Só as linhas dentro do clip rect são rasterizadas; o recorte em x fica
+    a cargo de _write_spans.
+    """
+    ys = []
+    x_starts = []
+    x_ends = []
+
+    xs = [p[0] for p in points]
+    if max(xs) < clip.left or min(xs) >= clip.right + 1:
+        return ys, x_starts, x_ends
+
+    for y, x_start, x_end in _scanline_spans(points, clip.top, clip.bottom):
+        ys.append(y)
+        x_starts.append(x_start)
+        x_ends.append(x_end)
+    return ys, x_starts, x_ends
 
-                for x in range(x_start, x_end + 1):
-                    setPixel(surface, x, y, fill_color)
+
+def scanline_fill(surface, points, fill_color):
+    ys, x_starts, x_ends = _collect_spans(points, surface.get_clip())
+    if ys:
+        _write_spans(surface, ys, x_starts, x_ends, color=fill_color)
 
 def drawRect(surface, top_left_x, top_left_y, width, height, color):
     points = [
@@ -198,6 +768,20 @@ def drawRect(surface, top_left_x, top_left_y, width, height, color):
     drawPolygon(surface, points, color)
 
 
+@lru_cache(maxsize=64)
+def _gradient_lut(color_top, color_bottom, height):
+    """
+    Tabela (height + 1) x 3 com a cor interpolada de cada linha do
+    gradiente, indexada por y - y_min. Mesmo truncamento e clamp do
+    cálculo linha a linha.
+    """
+    t = np.arange(height + 1) / height
+    top = np.array(color_top[:3], dtype=np.float64)
+    bottom = np.array(color_bottom[:3], dtype=np.float64)
+    lut = np.clip((top + (bottom - top) * t[:, None]).astype(np.int64), 0, 255).astype(np.uint8)
+    return _frozen(lut)[0]
+
+
 def scanline_fill_gradient(surface, points, color_top, color_bottom):
     if not points:
         return
@@ -209,110 +793,123 @@ def scanline_fill_gradient(surface, points, color_top, color_bottom):
     if y_max == y_min:
         return
     
-    n = len(points)
-    
-    for y in range(y_min, y_max):
-        intersections_x = []
-        
-        for i in range(n):
-            x0, y0 = points[i]
-            x1, y1 = points[(i + 1) % n]
-            
-            if y0 == y1:
-                continue
-            
-            if y0 > y1:
-                x0, y0, x1, y1 = x1, y1, x0, y0
-            
-            if y < y0 or y >= y1:
-                continue
-            
-            x = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
-            intersections_x.append(x)
-        
-        intersections_x.sort()
-        
-        t = (y - y_min) / (y_max - y_min)
-        
-        r = int(color_top[0] + (color_bottom[0] - color_top[0]) * t)
-        g = int(color_top[1] + (color_bottom[1] - color_top[1]) * t)
-        b = int(color_top[2] + (color_bottom[2] - color_top[2]) * t)
-        
-        r = max(0, min(255, r))
-        g = max(0, min(255, g))
-        b = max(0, min(255, b))
-        
-        gradient_color = (r, g, b)
-        
-        for i in range(0, len(intersections_x), 2):
-            if i + 1 < len(intersections_x):
-                x_start = int(round(intersections_x[i]))
-                x_end = int(round(intersections_x[i + 1]))
-                
-                for x in range(x_start, x_end + 1):
-                    setPixel(surface, x, y, gradient_color)
-
-def scanline_texture(superficie, pontos, uvs, textura):
-    n = len(pontos)
-
-    tex_w, tex_h = textura.get_size()
-
-    ys = [p[1] for p in pontos]
-    y_min = int(min(ys))
-    y_max = int(max(ys))
-
-    for y in range(y_min, y_max):
-        inter = []
+    span_ys, x_starts, x_ends = _collect_spans(points, surface.get_clip())
+    if not span_ys:
+        return
 
-        for i in range(n):
-            x0, y0 = pontos[i]
-            x1, y1 = pontos[(i + 1) % n]
+    lut = _gradient_lut(tuple(color_top), tuple(color_bottom), y_max - y_min)
+    span_colors = lut[np.asarray(span_ys) - y_min]
+    _write_spans(surface, span_ys, x_starts, x_ends, span_colors=span_colors)
 
-            u0, v0 = uvs[i]
-            u1, v1 = uvs[(i + 1) % n]
 
-            if y0 == y1:
-                continue
+_texel_cache = weakref.WeakKeyDictionary()
 
-            if y0 > y1:
-                x0, y0, x1, y1 = x1, y1, x0, y0
-                u0, v0, u1, v1 = u1, v1, u0, v0
 
-            if y < y0 or y >= y1:
-                continue
+def _texels(textura):
+    """Array (largura, altura, 3) com os texels da textura, extraído uma vez por textura."""
+    texels = _texel_cache.get(textura)
+    if texels is None:
+        texels = _frozen(pygame.surfarray.array3d(textura))[0]
+        _texel_cache[textura] = texels
+    return texels
 
-            t = (y - y0) / (y1 - y0)
 
-            x = x0 + t * (x1 - x0)
-            u = u0 + t * (u1 - u0)
-            v = v0 + t * (v1 - v0)
+def _texture_spans(pontos, uvs, row_lo, row_hi):
+    """
+    Interseções de todas as arestas com todas as linhas [row_lo, row_hi)
+    de uma vez. Retorna, por trecho, (y, x, u, v) do início e do fim, na
+    mesma ordem de pares da varredura linha a linha.
+    """
+    n = len(pontos)
+    p0 = np.asarray(pontos, dtype=np.float64)
+    p1 = np.roll(p0, -1, axis=0)
+    t0 = np.asarray(uvs, dtype=np.float64)
+    t1 = np.roll(t0, -1, axis=0)
+
+    # Orienta cada aresta de cima para baixo e descarta as horizontais.
+    swap = p0[:, 1] > p1[:, 1]
+    p0[swap], p1[swap] = p1[swap], p0[swap].copy()
+    t0[swap], t1[swap] = t1[swap], t0[swap].copy()
+    valid_edge = p0[:, 1] != p1[:, 1]
+
+    rows = np.arange(row_lo, row_hi)
+    y0 = p0[:, 1:2]
+    y1 = p1[:, 1:2]
+    hit = valid_edge[:, None] & (rows >= y0) & (rows < y1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (rows - y0) / (y1 - y0)
+        x = p0[:, 0:1] + t * (p1[:, 0:1] - p0[:, 0:1])
+        u = t0[:, 0:1] + t * (t1[:, 0:1] - t0[:, 0:1])
+        v = t0[:, 1:2] + t * (t1[:, 1:2] - t0[:, 1:2])
+
+    # Interseções ordenadas por x em cada linha; as ausentes vão para o fim.
+    order = np.argsort(np.where(hit, x, np.inf), axis=0, kind='stable')
+    x = np.take_along_axis(x, order, axis=0)
+    u = np.take_along_axis(u, order, axis=0)
+    v = np.take_along_axis(v, order, axis=0)
+    count = hit.sum(axis=0)
+
+    starts = []
+    ends = []
+    for k in range(0, n - 1, 2):
+        row_idx = np.flatnonzero(count >= k + 2)
+        starts.append((rows[row_idx], x[k, row_idx], u[k, row_idx], v[k, row_idx]))
+        ends.append((x[k + 1, row_idx], u[k + 1, row_idx], v[k + 1, row_idx]))
+
+    span_y, x_start, u_start, v_start = (np.concatenate(c) for c in zip(*starts))
+    x_end, u_end, v_end = (np.concatenate(c) for c in zip(*ends))
+    return span_y, x_start, u_start, v_start, x_end, u_end, v_end
 
-            inter.append((x, u, v))
 
-        inter.sort(key=lambda i: i[0])
+def scanline_texture(superficie, pontos, uvs, textura):
+    """
+    Preenche o polígono com a textura mapeada pelas coordenadas uv dos
+    vértices. Os trechos de todas as linhas são calculados juntos e os
+    texels são lidos com um único gather do array da textura.
+    """
+    if len(pontos) < 3:
+        return
 
-        for i in range(0, len(inter), 2):
-            if i + 1 >= len(inter):
-                continue
+    tex_w, tex_h = textura.get_size()
 
-            x_start, u_start, v_start = inter[i]
-            x_end,   u_end,   v_end   = inter[i + 1]
+    ys = [p[1] for p in pontos]
+    y_min = int(min(ys))
+    y_max = int(max(ys))
 
-            if x_start == x_end:
-                continue
+    clip = superficie.get_clip()
+    row_lo = max(y_min, clip.top)
+    row_hi = min(y_max, clip.bottom)
+    if row_lo >= row_hi:
+        return
 
-            for x in range(int(x_start), int(x_end) + 1):
-                t = (x - x_start) / (x_end - x_start)
+    span_y, x_start, u_start, v_start, x_end, u_end, v_end = _texture_spans(pontos, uvs, row_lo, row_hi)
 
-                u = u_start + t * (u_end - u_start)
-                v = v_start + t * (v_end - v_start)
+    keep = x_start != x_end
+    first = np.maximum(np.trunc(x_start[keep]).astype(np.int64), clip.left)
+    last = np.minimum(np.trunc(x_end[keep]).astype(np.int64), clip.right - 1)
+    lengths = np.maximum(last - first + 1, 0)
+    if lengths.sum() == 0:
+        return
 
-                tx = int(u * (tex_w - 1))
-                ty = int(v * (tex_h - 1))
+    span_of_pixel = np.repeat(np.arange(len(lengths)), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    xs = first[span_of_pixel] + (np.arange(lengths.sum()) - offsets[span_of_pixel])
+
+    x0 = x_start[keep][span_of_pixel]
+    t = (xs - x0) / (x_end[keep][span_of_pixel] - x0)
+    u0 = u_start[keep][span_of_pixel]
+    v0 = v_start[keep][span_of_pixel]
+    u = u0 + t * (u_end[keep][span_of_pixel] - u0)
+    v = v0 + t * (v_end[keep][span_of_pixel] - v0)
+
+    tx = np.trunc(u * (tex_w - 1)).astype(np.int64)
+    ty = np.trunc(v * (tex_h - 1)).astype(np.int64)
+    inside = (tx >= 0) & (tx < tex_w) & (ty >= 0) & (ty < tex_h)
+    if not inside.any():
+        return
 
-                if 0 <= tx < tex_w and 0 <= ty < tex_h:
-                    cor = textura.get_at((tx, ty))
-                    setPixel(superficie, x, y, cor)
+    cores = _texels(textura)[tx[inside], ty[inside]]
+    _write_pixel_colors(superficie, xs[inside], span_y[keep][span_of_pixel][inside], cores)
 
 
 INSIDE = 0
@@ -371,6 +968,7 @@ def desenhar_poligono_recortado(superficie, pontos, janela, cor):
     """Desenha um polígono recortado pela janela de clipping."""
     xmin, ymin, xmax, ymax = janela
     n = len(pontos)
+    segmentos = []
 
     for i in range(n):
         x0, y0 = pontos[i]
@@ -381,7 +979,51 @@ def desenhar_poligono_recortado(superficie, pontos, janela, cor):
         )
 
         if visivel:
-            DrawLineBresenham(superficie,
-                      int(rx0), int(ry0),
-                      int(rx1), int(ry1),
-                      cor)
\ No newline at end of file
+            segmentos.append((int(rx0), int(ry0), int(rx1), int(ry1)))
+
+    if segmentos:
+        draw_lines(superficie, segmentos, cor)
+
+
+def sutherland_hodgman(pontos, janela):
+    """
+    Recorte de polígono Sutherland-Hodgman contra a janela retangular
+    (xmin, ymin, xmax, ymax). Retorna a lista de vértices recortada
+    (vazia se o polígono estiver todo fora).
+    """
+    xmin, ymin, xmax, ymax = janela
+
+    limites = [
+        (lambda p: p[0] >= xmin, lambda p, q: _intersecao_vertical(p, q, xmin)),
+        (lambda p: p[0] <= xmax, lambda p, q: _intersecao_vertical(p, q, xmax)),
+        (lambda p: p[1] >= ymin, lambda p, q: _intersecao_horizontal(p, q, ymin)),
+        (lambda p: p[1] <= ymax, lambda p, q: _intersecao_horizontal(p, q, ymax)),
+    ]
+
+    saida = list(pontos)
+    for dentro, intersecao in limites:
+        if not saida:
+            break
+        entrada = saida
+        saida = []
+        anterior = entrada[-1]
+        for atual in entrada:
+            if dentro(atual):
+                if not dentro(anterior):
+                    saida.append(intersecao(anterior, atual))
+                saida.append(atual)
+            elif dentro(anterior):
+                saida.append(intersecao(anterior, atual))
+            anterior = atual
+
+    return saida
+
+
+def _intersecao_vertical(p, q, x):
+    t = (x - p[0]) / (q[0] - p[0])
+    return (x, p[1] + t * (q[1] - p[1]))
+
+
+def _intersecao_horizontal(p, q, y):
+    t = (y - p[1]) / (q[1] - p[1])
+    return (p[0] + t * (q[0] - p[0]), y)
@@ -0,0 +1,57 @@
+"""
+Módulo de Medição
+Tempo gasto em cada fase do quadro (eventos, simulação, desenho...),
+acumulado entre start() e as marcas mark(fase) do laço principal.
+
+O main mede sempre pelo mesmo PhaseTimer (get_frame_timer); ele vem
+desligado e aí cada marca é só um teste de atributo. O modo de
+benchmark o liga antes de rodar o jogo e lê o relatório no final.
+"""
+import time
+
+
+class PhaseTimer:
+    """Tempo acumulado por fase, em segundos, e o número de quadros medidos."""
+    __slots__ = ('enabled', 'totals', 'frames', '_last')
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.totals = {}
+        self.frames = 0
+        self._last = 0.0
+
+    def reset(self):
+        self.totals.clear()
+        self.frames = 0
+
+    def start(self):
+        """Começa um quadro: a próxima marca conta a partir daqui."""
+        if self.enabled:
+            self._last = time.perf_counter()
+
+    def mark(self, phase):
+        """Soma à fase `phase` o tempo desde a última marca (ou start)."""
+        if self.enabled:
+            now = time.perf_counter()
+            self.totals[phase] = self.totals.get(phase, 0.0) + now - self._last
+            self._last = now
+
+    def end_frame(self):
+        if self.enabled:
+            self.frames += 1
+
+    def report(self):
+        """Milissegundos médios por quadro de cada fase, na ordem em que apareceram."""
+        frames = max(self.frames, 1)
+        return {phase: total * 1000 / frames for phase, total in self.totals.items()}
+
+
+_frame_timer = None
+
+
+def get_frame_timer():
+    """PhaseTimer do laço principal (desligado até alguém ligar)."""
+    global _frame_timer
+    if _frame_timer is None:
+        _frame_timer = PhaseTimer()
+    return _frame_timer
@@ -1,10 +1,104 @@
 """
 Módulo de Transformações Geométricas
 Funções para manipulação de matrizes e transformações 2D.
+
+As matrizes são objetos Affine (2x3 com a última linha implícita
+[0, 0, 1]), que compõem, invertem e aplicam em forma fechada. Um Affine
+também se comporta como a antiga lista 3x3 (matrix[i][j], iteração por
+linhas), e as funções continuam aceitando listas 3x3.
+
+Para modelos com muitas partes, GeometryBuffer guarda todos os pontos
+num único array NumPy e transforma o modelo inteiro de uma vez.
 """
 import math
+
+import numpy as np
+
+
+class Affine:
+    """
+    Transformação afim 2D:
+        | a  b  c |
+        | d  e  f |
+        | 0  0  1 |
+    """
+    __slots__ = ('a', 'b', 'c', 'd', 'e', 'f')
+
+    def __init__(self, a, b, c, d, e, f):
+        self.a = a
+        self.b = b
+        self.c = c
+        self.d = d
+        self.e = e
+        self.f = f
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """Converte uma matriz 3x3 (lista de listas) em Affine."""
+        if isinstance(matrix, Affine):
+            return matrix
+        return cls(matrix[0][0], matrix[0][1], matrix[0][2],
+                   matrix[1][0], matrix[1][1], matrix[1][2])
+
+    def compose(self, other):
+        """self · other: aplica `other` primeiro e depois `self`."""
+        a, b, c, d, e, f = self.a, self.b, self.c, self.d, self.e, self.f
+        return Affine(a * other.a + b * other.d,
+                      a * other.b + b * other.e,
+                      a * other.c + b * other.f + c,
+                      d * other.a + e * other.d,
+                      d * other.b + e * other.e,
+                      d * other.c + e * other.f + f)
+
+    def inverse(self):
+        a, b, c, d, e, f = self.a, self.b, self.c, self.d, self.e, self.f
+        det = a * e - b * d
+        if det == 0:
+            raise ValueError("Matriz afim singular não tem inversa")
+        return Affine(e / det, -b / det, (b * f - c * e) / det,
+                      -d / det, a / det, (c * d - a * f) / det)
+
+    def apply(self, x, y):
+        """Transforma um único ponto."""
+        return (self.a * x + self.b * y + self.c,
+                self.d * x + self.e * y + self.f)
+
+    def rows(self):
+        return ((self.a, self.b, self.c),
+                (self.d, self.e, self.f),
+                (0, 0, 1))
+
+    def __getitem__(self, i):
+        return self.rows()[i]
+
+    def __iter__(self):
+        return iter(self.rows())
+
+    def __len__(self):
+        return 3
+
+    def __eq__(self, other):
+        try:
+            return [list(r) for r in self.rows()] == [list(r) for r in other]
+        except TypeError:
+            return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Affine({self.a}, {self.b}, {self.c}, {self.d}, {self.e}, {self.f})"
+
+
+def _is_affine(matrix):
+    """Listas 3x3 cuja última linha é [0, 0, 1] podem ser tratadas como Affine."""
+    return isinstance(matrix, Affine) or list(matrix[2]) == [0, 0, 1]
+
+
 def mat_mul(A, B):
     """ Multiplies two 3x3 matrices. """
+    if _is_affine(A) and _is_affine(B):
+        return Affine.from_matrix(A).compose(Affine.from_matrix(B))
+
     C = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
     for i in range(3):
         for j in range(3):
@@ -13,30 +107,25 @@ def mat_mul(A, B):
     return C
 
 def get_translation_matrix(tx, ty):
-    return [
-        [1, 0, tx],
-        [0, 1, ty],
-        [0, 0, 1]
-    ]
+    return Affine(1, 0, tx,
+                  0, 1, ty)
 
 def get_rotation_matrix(angle_degrees):
     rad = math.radians(angle_degrees)
     c = math.cos(rad)
     s = math.sin(rad)
-    return [
-        [c, -s, 0],
-        [s, c, 0],
-        [0, 0, 1]
-    ]
+    return Affine(c, -s, 0,
+                  s, c, 0)
 
 def get_scale_matrix(sx, sy):
-    return [
-        [sx, 0, 0],
-        [0, sy, 0],
-        [0, 0, 1]
-    ]
+    return Affine(sx, 0, 0,
+                  0, sy, 0)
 
 def apply_transform(points, matrix):
+    if isinstance(matrix, Affine):
+        a, b, c, d, e, f = matrix.a, matrix.b, matrix.c, matrix.d, matrix.e, matrix.f
+        return [(a * x + b * y + c, d * x + e * y + f) for x, y in points]
+
     new_points = []
     for x, y in points:
         vec = [x, y, 1]
@@ -48,21 +137,17 @@ def apply_transform(points, matrix):
 def get_rotation_around_point_matrix(angle_degrees, cx, cy):
     """
     Cria matriz de rotação em torno de um ponto arbitrário (cx, cy).
-    Processo: T(-cx,-cy) -> R(angle) -> T(cx,cy)
+    Processo: T(-cx,-cy) -> R(angle) -> T(cx,cy), em forma fechada.
     """
-    to_origin = get_translation_matrix(-cx, -cy)
-    rotation = get_rotation_matrix(angle_degrees)
-    back = get_translation_matrix(cx, cy)
-    
-    temp = mat_mul(rotation, to_origin)
-    return mat_mul(back, temp)
+    rad = math.radians(angle_degrees)
+    c = math.cos(rad)
+    s = math.sin(rad)
+    return Affine(c, -s, c * -cx + -s * -cy + cx,
+                  s, c, s * -cx + c * -cy + cy)
 
 def get_identity_matrix():
-    return [
-        [1, 0, 0],
-        [0, 1, 0],
-        [0, 0, 1]
-    ]
+    return Affine(1, 0, 0,
+                  0, 1, 0)
 
 
 
@@ -70,18 +155,70 @@ def get_window_to_viewport_matrix_pygame(janela, viewport):
     """
     Transforma coordenadas da janela (mundo) para viewport (tela).
     Versão SEM inversão de Y (para Pygame onde Y já cresce para baixo).
+    Equivale a T(Vmin) · S(sx, sy) · T(-Wmin).
     """
     Wxmin, Wymin, Wxmax, Wymax = janela
     Vxmin, Vymin, Vxmax, Vymax = viewport
-    
+
     sx = (Vxmax - Vxmin) / (Wxmax - Wxmin)
-    sy = (Vymax - Vymin) / (Wymax - Wymin) 
-    
-    m = get_identity_matrix()
-    m = mat_mul(get_translation_matrix(-Wxmin, -Wymin), m)
-    m = mat_mul(get_scale_matrix(sx, sy), m)
-    m = mat_mul(get_translation_matrix(Vxmin, Vymin), m)
-    
-    return m
+    sy = (Vymax - Vymin) / (Wymax - Wymin)
+
+    return Affine(sx, 0, sx * -Wxmin + Vxmin,
+                  0, sy, sy * -Wymin + Vymin)
+
+
+def apply_transform_array(points, matrix):
+    """
+    Versão vetorizada de apply_transform para um array (N, 2).
+    Faz as mesmas operações, na mesma ordem, para todos os pontos de uma
+    vez, então o resultado é idêntico ao da versão ponto a ponto.
+    """
+    m = Affine.from_matrix(matrix)
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    xs = points[:, 0]
+    ys = points[:, 1]
+    out = np.empty_like(points)
+    out[:, 0] = m.a * xs + m.b * ys + m.c
+    out[:, 1] = m.d * xs + m.e * ys + m.f
+    return out
+
+
+def _pack_parts(parts, start=0):
+    """Empilha as partes num array (N, 2) e devolve (array, offsets por nome)."""
+    offsets = {}
+    chunks = []
+    for name, points in parts.items():
+        chunk = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        offsets[name] = (start, start + len(chunk))
+        chunks.append(chunk)
+        start += len(chunk)
+    packed = np.concatenate(chunks) if chunks else np.empty((0, 2))
+    return packed, offsets
+
+
+class GeometryBuffer:
+    """
+    Partes de um modelo num único array contíguo (N, 2) com um índice de
+    offsets por parte. transform() aplica a matriz ao modelo inteiro numa
+    só chamada e devolve uma view (n, 2) por parte.
+    """
+    __slots__ = ('points', 'offsets')
 
+    def __init__(self, parts):
+        """`parts`: dicionário nome -> lista de pontos (x, y)."""
+        self.points, self.offsets = _pack_parts(parts)
+        self.points.setflags(write=False)
 
+    def transform(self, matrix, **dynamic_parts):
+        """
+        Transforma o modelo. Partes que mudam a cada quadro (ex.: hélice)
+        podem ser passadas por nome e entram na mesma chamada.
+        """
+        points = self.points
+        offsets = self.offsets
+        if dynamic_parts:
+            extra, extra_offsets = _pack_parts(dynamic_parts, start=len(points))
+            points = np.concatenate((points, extra))
+            offsets = {**offsets, **extra_offsets}
+        transformed = apply_transform_array(points, matrix)
+        return {name: transformed[start:end] for name, (start, end) in offsets.items()}
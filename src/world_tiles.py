@@ -0,0 +1,98 @@
+"""
+Módulo de Tiles do Mundo
+Superfície do mundo dividida em tiles de tamanho fixo, rasterizados sob
+demanda quando entram na câmera e descartados por LRU quando passam do
+orçamento de memória.
+
+Cada tile é desenhado por `render_region(surface, origin_x, origin_y)`,
+que recebe uma superfície com margem em volta do tile: as primitivas
+truncam coordenadas com int(), então a margem mantém positivos os
+vértices fracionários das formas pequenas (espinhos) que tocam o tile.
+O resultado é o da renderização do mapa inteiro, exceto por pontas de
+span em empates de arredondamento (x.5) nas bordas inclinadas.
+"""
+import math
+from collections import OrderedDict
+
+import pygame
+
+DEFAULT_TILE_SIZE = 256
+DEFAULT_MARGIN = 64
+DEFAULT_MEMORY_BUDGET = 32 * 1024 * 1024
+
+
+class TiledSurface:
+    __slots__ = ('width', 'height', 'tile_size', 'margin', 'max_tiles',
+                 'render_region', '_tiles', '_scratch')
+
+    def __init__(self, width, height, render_region, tile_size=DEFAULT_TILE_SIZE,
+                 margin=DEFAULT_MARGIN, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.margin = margin
+        self.render_region = render_region
+        self.max_tiles = max(1, memory_budget // (tile_size * tile_size * 4))
+        self._tiles = OrderedDict()
+        self._scratch = None
+
+    def __len__(self):
+        return len(self._tiles)
+
+    def _rasterize(self, col, row):
+        size = self.tile_size
+        margin = self.margin
+        if self._scratch is None:
+            self._scratch = pygame.Surface((size + 2 * margin, size + 2 * margin))
+        scratch = self._scratch
+        scratch.fill((0, 0, 0))
+        self.render_region(scratch, col * size - margin, row * size - margin)
+
+        tile = pygame.Surface((size, size))
+        tile.blit(scratch, (0, 0), (margin, margin, size, size))
+        if pygame.display.get_surface() is not None:
+            tile = tile.convert()
+        return tile
+
+    def get_tile(self, col, row):
+        """Tile (col, row), rasterizado na primeira vez e marcado como recente."""
+        key = (col, row)
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            return tile
+
+        tile = self._rasterize(col, row)
+        self._tiles[key] = tile
+        while len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def visible_tiles(self, camera_x, camera_y, view_width, view_height):
+        """(col, row) dos tiles que cobrem a área visível da câmera."""
+        size = self.tile_size
+        ox = math.floor(camera_x)
+        oy = math.floor(camera_y)
+        col_lo = max(0, ox // size)
+        row_lo = max(0, oy // size)
+        col_hi = min((self.width - 1) // size, (ox + view_width - 1) // size)
+        row_hi = min((self.height - 1) // size, (oy + view_height - 1) // size)
+        return [(col, row)
+                for row in range(row_lo, row_hi + 1)
+                for col in range(col_lo, col_hi + 1)]
+
+    def draw(self, screen, camera_x, camera_y):
+        """
+        Equivale a screen.blit(mundo, (-ox, -oy)), só com os tiles visíveis,
+        com a câmera arredondada para baixo uma vez (ox, oy): blit trunca
+        posições fracionárias em direção a zero, o que deslocaria em 1 px
+        os tiles de posição negativa em relação aos de posição positiva.
+        """
+        size = self.tile_size
+        ox = math.floor(camera_x)
+        oy = math.floor(camera_y)
+        view_width, view_height = screen.get_size()
+        for col, row in self.visible_tiles(ox, oy, view_width, view_height):
+            tile = self.get_tile(col, row)
+            area = (0, 0, min(size, self.width - col * size), min(size, self.height - row * size))
+            screen.blit(tile, (col * size - ox, row * size - oy), area)